@@ -77,6 +77,62 @@ CREATE TABLE CoreCourse (
     INDEX idx_dept (Dept)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='核心课程表';
 
+-- 表6：学生成绩汇总表 (StudentAggregate)
+-- 可选的物化汇总：每个学生的已获学分、学分加权绩点和、核心课程不及格数，
+-- 由下方触发器增量维护，结果与 StudentGPAView / CreditsCompletedView 一致，
+-- 可通过 usp_RebuildStudentAggregate 全量重建
+DROP TABLE IF EXISTS StudentAggregate;
+CREATE TABLE StudentAggregate (
+    SNo VARCHAR(20) PRIMARY KEY COMMENT '学号',
+    EarnedCredit DECIMAL(8,1) NOT NULL DEFAULT 0 COMMENT '已获学分',
+    WeightedGradePoints DECIMAL(12,3) NOT NULL DEFAULT 0 COMMENT '学分加权绩点和',
+    CoreFailCount INT NOT NULL DEFAULT 0 COMMENT '核心课程不及格数',
+    FOREIGN KEY (SNo) REFERENCES Student(SNo) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='学生成绩汇总表';
+
+-- 表7：成绩等级表 (GradeScale)
+-- 分数段 [MinScore, MaxScore) 到绩点和是否通过的对应关系，
+-- 函数、视图、触发器以及 Python 端都从这张表读取，分数线只需在此维护一处。
+-- 分数段须覆盖 0-100 且互不重叠；修改后需调用 usp_RebuildStudentAggregate 重建汇总表
+DROP TABLE IF EXISTS GradeScale;
+CREATE TABLE GradeScale (
+    MinScore DECIMAL(5,2) PRIMARY KEY COMMENT '分数下限（含）',
+    MaxScore DECIMAL(5,2) NOT NULL COMMENT '分数上限（不含）',
+    GradePoint DECIMAL(3,2) NOT NULL COMMENT '绩点',
+    IsPassed TINYINT(1) NOT NULL COMMENT '是否通过',
+    UNIQUE KEY uk_max_score (MaxScore),
+    CHECK (MinScore < MaxScore)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='成绩等级表';
+
+-- 表8：数据版本表 (DataVersion)
+-- 表中数据每变化一行，由触发器把该表的一个分片的 Version 加 1，表的版本号为各分片之和；
+-- 客户端的查询结果缓存按依赖表的版本号判断是否过期（多台客户端同时写入也能及时失效）。
+-- 每个连接只写自己的分片（CONNECTION_ID() % 16），并发写入与批量写入不会都排队等同一行的锁
+DROP TABLE IF EXISTS DataVersion;
+CREATE TABLE DataVersion (
+    TableName VARCHAR(64) NOT NULL COMMENT '表名',
+    Shard TINYINT UNSIGNED NOT NULL DEFAULT 0 COMMENT '分片号',
+    Version BIGINT UNSIGNED NOT NULL DEFAULT 0 COMMENT '数据版本号（分片内）',
+    PRIMARY KEY (TableName, Shard)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='数据版本表';
+
+INSERT INTO DataVersion (TableName) VALUES
+('Student'), ('Course'), ('Score'), ('GraduationRequirement'), ('CoreCourse'), ('GradeScale'), ('StudentAggregate');
+
+-- 表9：变更日志表 (ChangeLog)
+-- Student/Course/Score 每变化一行由触发器追加一条记录（单调递增的序号、操作、主键），
+-- 同时打开的客户端定期读取"序号大于 N 的记录"，只把这些变化应用到界面和缓存；
+-- 旧记录由 usp_CompactChangeLog 定期删除。批量导入时写入一条 reload 记录代替逐行记录
+DROP TABLE IF EXISTS ChangeLog;
+CREATE TABLE ChangeLog (
+    Seq BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY COMMENT '变更序号',
+    TableName VARCHAR(64) NOT NULL COMMENT '表名',
+    Operation VARCHAR(10) NOT NULL COMMENT 'insert/update/delete/reload',
+    KeyValue JSON NULL COMMENT '主键值数组，reload 时为空',
+    ChangedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '变更时间',
+    INDEX idx_changed_at (ChangedAt)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='变更日志表';
+
 -- ============================================
 -- 第三部分：创建函数（Function）
 -- ============================================
@@ -86,15 +142,14 @@ DROP FUNCTION IF EXISTS fn_CalculateGPA;
 DELIMITER $$
 CREATE FUNCTION fn_CalculateGPA(score DECIMAL(5,2)) RETURNS DECIMAL(3,2)
 READS SQL DATA
-DETERMINISTIC
 BEGIN
-    RETURN CASE
-        WHEN score >= 90 THEN 4.0
-        WHEN score >= 80 THEN 3.0
-        WHEN score >= 70 THEN 2.0
-        WHEN score >= 60 THEN 1.0
-        ELSE 0.0
-    END;
+    -- 查成绩等级表（按主键 MinScore 倒序取第一段）
+    RETURN COALESCE((
+        SELECT GradePoint FROM GradeScale
+        WHERE MinScore <= score AND MaxScore > score
+        ORDER BY MinScore DESC
+        LIMIT 1
+    ), 0.00);
 END$$
 DELIMITER ;
 
@@ -103,9 +158,13 @@ DROP FUNCTION IF EXISTS fn_IsPassed;
 DELIMITER $$
 CREATE FUNCTION fn_IsPassed(score DECIMAL(5,2)) RETURNS TINYINT(1)
 READS SQL DATA
-DETERMINISTIC
 BEGIN
-    RETURN IF(score >= 60, 1, 0);
+    RETURN COALESCE((
+        SELECT IsPassed FROM GradeScale
+        WHERE MinScore <= score AND MaxScore > score
+        ORDER BY MinScore DESC
+        LIMIT 1
+    ), 0);
 END$$
 DELIMITER ;
 
@@ -113,6 +172,10 @@ DELIMITER ;
 -- 第四部分：创建视图（View）
 -- ============================================
 
+-- 说明：视图中不逐行调用 fn_CalculateGPA / fn_IsPassed，而是按分数段与 GradeScale 做范围连接，
+-- 不及格视图从 GradeScale 的不及格分数段出发，可以用 ScoreValue 上的索引（idx_score）做范围扫描；
+-- 视图本身不带 ORDER BY，由外层查询按需排序。
+
 -- 视图1：StudentGPAView - 学生GPA视图（通过计算获取，无冗余）
 DROP VIEW IF EXISTS StudentGPAView;
 CREATE VIEW StudentGPAView AS
@@ -120,18 +183,19 @@ SELECT
     S.SNo AS 学号,
     S.SName AS 姓名,
     S.Dept AS 院系,
-    COALESCE(SUM(CASE WHEN SC.ScoreValue >= 60 THEN C.Credit ELSE 0 END), 0) AS 已获学分,
+    COALESCE(SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END), 0) AS 已获学分,
     CASE 
-        WHEN SUM(CASE WHEN SC.ScoreValue >= 60 THEN C.Credit ELSE 0 END) > 0 
-        THEN ROUND(SUM(fn_CalculateGPA(SC.ScoreValue) * C.Credit) / SUM(CASE WHEN SC.ScoreValue >= 60 THEN C.Credit ELSE 0 END), 2)
+        WHEN SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END) > 0 
+        THEN ROUND(SUM(GS.GradePoint * C.Credit) / SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END), 2)
         ELSE 0.00
     END AS 平均绩点
 FROM Student S
 LEFT JOIN Score SC ON S.SNo = SC.SNo
 LEFT JOIN Course C ON SC.CNo = C.CNo
+LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
 GROUP BY S.SNo, S.SName, S.Dept;
 
--- 视图2：FailedCoreCoursesView - 核心课程不及格视图（通过函数计算是否通过）
+-- 视图2：FailedCoreCoursesView - 核心课程不及格视图
 DROP VIEW IF EXISTS FailedCoreCoursesView;
 CREATE VIEW FailedCoreCoursesView AS
 SELECT 
@@ -144,8 +208,7 @@ FROM Score SC
 INNER JOIN Student S ON SC.SNo = S.SNo
 INNER JOIN Course C ON SC.CNo = C.CNo
 INNER JOIN CoreCourse CC ON C.CNo = CC.CNo AND S.Dept = CC.Dept
-WHERE fn_IsPassed(SC.ScoreValue) = 0
-ORDER BY S.SNo, SC.Semester;
+INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0;
 
 -- 视图3：CreditsCompletedView - 已获学分统计视图（通过计算获取）
 DROP VIEW IF EXISTS CreditsCompletedView;
@@ -153,10 +216,11 @@ CREATE VIEW CreditsCompletedView AS
 SELECT 
     S.SNo AS 学号,
     S.SName AS 姓名,
-    COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0) AS 已获学分总数
+    COALESCE(SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END), 0) AS 已获学分总数
 FROM Student S
 LEFT JOIN Score SC ON S.SNo = SC.SNo
 LEFT JOIN Course C ON SC.CNo = C.CNo
+LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
 GROUP BY S.SNo, S.SName;
 
 -- 视图4：FailedCoursesView - 未通过课程视图（所有未通过课程，不仅仅是核心课程）
@@ -175,8 +239,7 @@ SELECT
 FROM Score SC
 INNER JOIN Student S ON SC.SNo = S.SNo
 INNER JOIN Course C ON SC.CNo = C.CNo
-WHERE fn_IsPassed(SC.ScoreValue) = 0
-ORDER BY S.SNo, SC.Semester;
+INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0;
 
 -- ============================================
 -- 第五部分：创建触发器（Trigger）
@@ -184,34 +247,333 @@ ORDER BY S.SNo, SC.Semester;
 
 -- 注意：虽然严格遵循三大范式不应该有冗余字段，但根据需求要求，
 -- 需要在成绩录入后自动更新相关信息（通过视图和函数计算，不存储冗余数据）
--- 这里创建触发器用于数据验证和日志记录（可选）
+-- 这里的触发器负责增量维护可选的汇总表 StudentAggregate，
+-- 业务查询仍可随时改回视图计算
+
+-- 辅助存储过程：把一条成绩对汇总表的贡献加上（p_sign=1）或减去（p_sign=-1）
+DROP PROCEDURE IF EXISTS usp_ApplyScoreToAggregate;
+DELIMITER $$
+CREATE PROCEDURE usp_ApplyScoreToAggregate(
+    IN p_sno VARCHAR(20),
+    IN p_cno VARCHAR(20),
+    IN p_score DECIMAL(5,2),
+    IN p_sign INT
+)
+BEGIN
+    DECLARE v_credit DECIMAL(3,1) DEFAULT 0;
+    DECLARE v_is_core INT DEFAULT 0;
+    DECLARE v_passed INT DEFAULT fn_IsPassed(p_score);
+    
+    SELECT Credit INTO v_credit FROM Course WHERE CNo = p_cno;
+    SELECT COUNT(*) INTO v_is_core
+    FROM CoreCourse CC
+    INNER JOIN Student S ON CC.Dept = S.Dept
+    WHERE S.SNo = p_sno AND CC.CNo = p_cno;
+    
+    INSERT INTO StudentAggregate (SNo, EarnedCredit, WeightedGradePoints, CoreFailCount)
+    VALUES (
+        p_sno,
+        p_sign * IF(v_passed = 1, v_credit, 0),
+        p_sign * fn_CalculateGPA(p_score) * v_credit,
+        p_sign * IF(v_passed = 0, v_is_core, 0)
+    )
+    ON DUPLICATE KEY UPDATE
+        EarnedCredit = EarnedCredit + VALUES(EarnedCredit),
+        WeightedGradePoints = WeightedGradePoints + VALUES(WeightedGradePoints),
+        CoreFailCount = CoreFailCount + VALUES(CoreFailCount);
+END$$
+DELIMITER ;
+
+-- 辅助存储过程：递增某张表在当前连接所用分片上的数据版本号（行不存在时补上）
+-- 同一事务逐行调用时一直更新同一行，只有恰好落在同一分片的其他连接需要等待
+DROP PROCEDURE IF EXISTS usp_BumpDataVersion;
+DELIMITER $$
+CREATE PROCEDURE usp_BumpDataVersion(IN p_table VARCHAR(64))
+BEGIN
+    INSERT INTO DataVersion (TableName, Shard, Version) VALUES (p_table, CONNECTION_ID() % 16, 1)
+    ON DUPLICATE KEY UPDATE Version = Version + 1;
+END$$
+DELIMITER ;
+
+-- 辅助存储过程：追加一条变更记录
+-- 会话变量 @SuppressChangeLog = 1 时不记录（批量导入改为写一条 reload 记录）
+DROP PROCEDURE IF EXISTS usp_LogChange;
+DELIMITER $$
+CREATE PROCEDURE usp_LogChange(IN p_table VARCHAR(64), IN p_operation VARCHAR(10), IN p_key JSON)
+BEGIN
+    IF COALESCE(@SuppressChangeLog, 0) = 0 THEN
+        INSERT INTO ChangeLog (TableName, Operation, KeyValue) VALUES (p_table, p_operation, p_key);
+    END IF;
+END$$
+DELIMITER ;
 
--- 触发器：成绩录入后验证数据
 DROP TRIGGER IF EXISTS trg_AfterInsert_Score_Validate;
 DROP TRIGGER IF EXISTS trg_AfterUpdate_Score_Validate;
+DROP TRIGGER IF EXISTS trg_AfterDelete_Score_Validate;
+DROP TRIGGER IF EXISTS trg_AfterInsert_Student_Aggregate;
+DROP TRIGGER IF EXISTS trg_AfterUpdate_Student_Aggregate;
+DROP TRIGGER IF EXISTS trg_BeforeUpdate_Course_Aggregate;
+DROP TRIGGER IF EXISTS trg_BeforeDelete_Course_Aggregate;
+DROP TRIGGER IF EXISTS trg_AfterInsert_CoreCourse_Aggregate;
+DROP TRIGGER IF EXISTS trg_AfterUpdate_CoreCourse_Aggregate;
+DROP TRIGGER IF EXISTS trg_AfterDelete_CoreCourse_Aggregate;
+DROP TRIGGER IF EXISTS trg_AfterDelete_Student_Version;
+DROP TRIGGER IF EXISTS trg_AfterInsert_Course_Version;
+DROP TRIGGER IF EXISTS trg_AfterInsert_GraduationRequirement_Version;
+DROP TRIGGER IF EXISTS trg_AfterUpdate_GraduationRequirement_Version;
+DROP TRIGGER IF EXISTS trg_AfterDelete_GraduationRequirement_Version;
+DROP TRIGGER IF EXISTS trg_AfterInsert_GradeScale_Version;
+DROP TRIGGER IF EXISTS trg_AfterUpdate_GradeScale_Version;
+DROP TRIGGER IF EXISTS trg_AfterDelete_GradeScale_Version;
 
 DELIMITER $$
 
--- 触发器1：插入成绩后验证
+-- 触发器1：插入成绩后累加汇总
 CREATE TRIGGER trg_AfterInsert_Score_Validate
 AFTER INSERT ON Score
 FOR EACH ROW
 BEGIN
-    -- 验证成绩范围（已在CHECK约束中，这里可以添加日志或其他操作）
-    -- 如果需要，可以在这里记录操作日志
-    -- INSERT INTO ScoreLog (SNo, CNo, ScoreValue, Operation, Timestamp) 
-    -- VALUES (NEW.SNo, NEW.CNo, NEW.ScoreValue, 'INSERT', NOW());
+    -- 成绩范围已由CHECK约束保证
+    CALL usp_ApplyScoreToAggregate(NEW.SNo, NEW.CNo, NEW.ScoreValue, 1);
+    CALL usp_BumpDataVersion('Score');
+    CALL usp_LogChange('Score', 'insert', JSON_ARRAY(NEW.SNo, NEW.CNo, NEW.Semester));
 END$$
 
--- 触发器2：更新成绩后验证
+-- 触发器2：更新成绩后先减去旧值再加上新值
 CREATE TRIGGER trg_AfterUpdate_Score_Validate
 AFTER UPDATE ON Score
 FOR EACH ROW
 BEGIN
-    -- 验证成绩范围
-    -- 如果需要，可以在这里记录操作日志
-    -- INSERT INTO ScoreLog (SNo, CNo, ScoreValue, Operation, Timestamp) 
-    -- VALUES (NEW.SNo, NEW.CNo, NEW.ScoreValue, 'UPDATE', NOW());
+    CALL usp_ApplyScoreToAggregate(OLD.SNo, OLD.CNo, OLD.ScoreValue, -1);
+    CALL usp_ApplyScoreToAggregate(NEW.SNo, NEW.CNo, NEW.ScoreValue, 1);
+    CALL usp_BumpDataVersion('Score');
+    IF NEW.SNo = OLD.SNo AND NEW.CNo = OLD.CNo AND NEW.Semester = OLD.Semester THEN
+        CALL usp_LogChange('Score', 'update', JSON_ARRAY(NEW.SNo, NEW.CNo, NEW.Semester));
+    ELSE
+        CALL usp_LogChange('Score', 'delete', JSON_ARRAY(OLD.SNo, OLD.CNo, OLD.Semester));
+        CALL usp_LogChange('Score', 'insert', JSON_ARRAY(NEW.SNo, NEW.CNo, NEW.Semester));
+    END IF;
+END$$
+
+-- 触发器3：删除成绩后扣减汇总
+CREATE TRIGGER trg_AfterDelete_Score_Validate
+AFTER DELETE ON Score
+FOR EACH ROW
+BEGIN
+    CALL usp_ApplyScoreToAggregate(OLD.SNo, OLD.CNo, OLD.ScoreValue, -1);
+    CALL usp_BumpDataVersion('Score');
+    CALL usp_LogChange('Score', 'delete', JSON_ARRAY(OLD.SNo, OLD.CNo, OLD.Semester));
+END$$
+
+-- 注意：外键级联操作不会触发 Score 上的触发器，
+-- 因此学生/课程/核心课程的变更需要各自维护汇总表
+-- （删除学生时汇总行随外键级联删除，无需处理）
+
+-- 触发器4：新增学生时创建空汇总行
+CREATE TRIGGER trg_AfterInsert_Student_Aggregate
+AFTER INSERT ON Student
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO StudentAggregate (SNo) VALUES (NEW.SNo);
+    CALL usp_BumpDataVersion('Student');
+    CALL usp_LogChange('Student', 'insert', JSON_ARRAY(NEW.SNo));
+END$$
+
+-- 触发器5：学生转院系后重新统计核心课程不及格数
+CREATE TRIGGER trg_AfterUpdate_Student_Aggregate
+AFTER UPDATE ON Student
+FOR EACH ROW
+BEGIN
+    IF NEW.Dept <> OLD.Dept THEN
+        UPDATE StudentAggregate
+        SET CoreFailCount = (
+            SELECT COUNT(*)
+            FROM Score SC
+            INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND CC.Dept = NEW.Dept
+            INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0
+            WHERE SC.SNo = NEW.SNo
+        )
+        WHERE SNo = NEW.SNo;
+    END IF;
+    CALL usp_BumpDataVersion('Student');
+    CALL usp_LogChange('Student', 'update', JSON_ARRAY(NEW.SNo));
+END$$
+
+-- 触发器6：课程学分变化时按差值调整（在级联更新成绩之前执行，按旧课程号统计）
+CREATE TRIGGER trg_BeforeUpdate_Course_Aggregate
+BEFORE UPDATE ON Course
+FOR EACH ROW
+BEGIN
+    IF NEW.Credit <> OLD.Credit THEN
+        UPDATE StudentAggregate SA
+        INNER JOIN (
+            SELECT 
+                SC.SNo,
+                SUM(CASE WHEN GS.IsPassed = 1 THEN 1 ELSE 0 END) AS PassedCount,
+                COALESCE(SUM(GS.GradePoint), 0) AS GradePoints
+            FROM Score SC
+            LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
+            WHERE SC.CNo = OLD.CNo
+            GROUP BY SC.SNo
+        ) D ON SA.SNo = D.SNo
+        SET 
+            SA.EarnedCredit = SA.EarnedCredit + (NEW.Credit - OLD.Credit) * D.PassedCount,
+            SA.WeightedGradePoints = SA.WeightedGradePoints + (NEW.Credit - OLD.Credit) * D.GradePoints;
+    END IF;
+    CALL usp_BumpDataVersion('Course');
+    CALL usp_LogChange('Course', 'update', JSON_ARRAY(NEW.CNo));
+END$$
+
+-- 触发器7：删除课程前扣除其成绩的贡献（成绩会随外键级联删除）
+CREATE TRIGGER trg_BeforeDelete_Course_Aggregate
+BEFORE DELETE ON Course
+FOR EACH ROW
+BEGIN
+    UPDATE StudentAggregate SA
+    INNER JOIN (
+        SELECT 
+            SC.SNo,
+            SUM(CASE WHEN GS.IsPassed = 1 THEN OLD.Credit ELSE 0 END) AS EarnedCredit,
+            COALESCE(SUM(GS.GradePoint * OLD.Credit), 0) AS WeightedGradePoints,
+            COUNT(CASE WHEN GS.IsPassed = 0 THEN CC.CNo END) AS CoreFailCount
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        LEFT JOIN CoreCourse CC ON CC.Dept = S.Dept AND CC.CNo = SC.CNo
+        LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
+        WHERE SC.CNo = OLD.CNo
+        GROUP BY SC.SNo
+    ) D ON SA.SNo = D.SNo
+    SET 
+        SA.EarnedCredit = SA.EarnedCredit - D.EarnedCredit,
+        SA.WeightedGradePoints = SA.WeightedGradePoints - D.WeightedGradePoints,
+        SA.CoreFailCount = SA.CoreFailCount - D.CoreFailCount;
+    CALL usp_BumpDataVersion('Course');
+    CALL usp_LogChange('Course', 'delete', JSON_ARRAY(OLD.CNo));
+END$$
+
+-- 触发器8~10：核心课程设置变化时调整对应院系学生的核心课程不及格数
+CREATE TRIGGER trg_AfterInsert_CoreCourse_Aggregate
+AFTER INSERT ON CoreCourse
+FOR EACH ROW
+BEGIN
+    UPDATE StudentAggregate SA
+    INNER JOIN (
+        SELECT SC.SNo, COUNT(*) AS FailCount
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0
+        WHERE S.Dept = NEW.Dept AND SC.CNo = NEW.CNo
+        GROUP BY SC.SNo
+    ) D ON SA.SNo = D.SNo
+    SET SA.CoreFailCount = SA.CoreFailCount + D.FailCount;
+    CALL usp_BumpDataVersion('CoreCourse');
+END$$
+
+CREATE TRIGGER trg_AfterUpdate_CoreCourse_Aggregate
+AFTER UPDATE ON CoreCourse
+FOR EACH ROW
+BEGIN
+    UPDATE StudentAggregate SA
+    INNER JOIN (
+        SELECT SC.SNo, COUNT(*) AS FailCount
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0
+        WHERE S.Dept = OLD.Dept AND SC.CNo = OLD.CNo
+        GROUP BY SC.SNo
+    ) D ON SA.SNo = D.SNo
+    SET SA.CoreFailCount = SA.CoreFailCount - D.FailCount;
+    
+    UPDATE StudentAggregate SA
+    INNER JOIN (
+        SELECT SC.SNo, COUNT(*) AS FailCount
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0
+        WHERE S.Dept = NEW.Dept AND SC.CNo = NEW.CNo
+        GROUP BY SC.SNo
+    ) D ON SA.SNo = D.SNo
+    SET SA.CoreFailCount = SA.CoreFailCount + D.FailCount;
+    CALL usp_BumpDataVersion('CoreCourse');
+END$$
+
+CREATE TRIGGER trg_AfterDelete_CoreCourse_Aggregate
+AFTER DELETE ON CoreCourse
+FOR EACH ROW
+BEGIN
+    UPDATE StudentAggregate SA
+    INNER JOIN (
+        SELECT SC.SNo, COUNT(*) AS FailCount
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0
+        WHERE S.Dept = OLD.Dept AND SC.CNo = OLD.CNo
+        GROUP BY SC.SNo
+    ) D ON SA.SNo = D.SNo
+    SET SA.CoreFailCount = SA.CoreFailCount - D.FailCount;
+    CALL usp_BumpDataVersion('CoreCourse');
+END$$
+
+-- 触发器11~18：其余表变化时递增数据版本号（删除学生、新增课程同时写变更日志）
+-- （上面的触发器已在维护汇总表的同时递增 Score/Student/Course/CoreCourse 的版本号；
+--  外键级联删除的成绩不会触发 Score 的触发器，客户端缓存会同时检查父表版本，
+--  变更日志中也只有父表的 delete 记录）
+CREATE TRIGGER trg_AfterDelete_Student_Version
+AFTER DELETE ON Student
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('Student');
+    CALL usp_LogChange('Student', 'delete', JSON_ARRAY(OLD.SNo));
+END$$
+
+CREATE TRIGGER trg_AfterInsert_Course_Version
+AFTER INSERT ON Course
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('Course');
+    CALL usp_LogChange('Course', 'insert', JSON_ARRAY(NEW.CNo));
+END$$
+
+CREATE TRIGGER trg_AfterInsert_GraduationRequirement_Version
+AFTER INSERT ON GraduationRequirement
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('GraduationRequirement');
+END$$
+
+CREATE TRIGGER trg_AfterUpdate_GraduationRequirement_Version
+AFTER UPDATE ON GraduationRequirement
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('GraduationRequirement');
+END$$
+
+CREATE TRIGGER trg_AfterDelete_GraduationRequirement_Version
+AFTER DELETE ON GraduationRequirement
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('GraduationRequirement');
+END$$
+
+CREATE TRIGGER trg_AfterInsert_GradeScale_Version
+AFTER INSERT ON GradeScale
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('GradeScale');
+END$$
+
+CREATE TRIGGER trg_AfterUpdate_GradeScale_Version
+AFTER UPDATE ON GradeScale
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('GradeScale');
+END$$
+
+CREATE TRIGGER trg_AfterDelete_GradeScale_Version
+AFTER DELETE ON GradeScale
+FOR EACH ROW
+BEGIN
+    CALL usp_BumpDataVersion('GradeScale');
 END$$
 
 DELIMITER ;
@@ -224,6 +586,8 @@ DELIMITER ;
 -- 所有计算值通过视图动态获取
 
 -- 存储过程1：生成预警学生名单（通过计算获取学分，无冗余）
+-- 先在一次分组扫描中算出每个学生的已获学分和核心课程不及格数，
+-- 再与毕业要求表连接判断，避免对每个学生重复执行相关子查询
 DROP PROCEDURE IF EXISTS usp_GenerateWarningList;
 DELIMITER $$
 
@@ -234,61 +598,95 @@ BEGIN
         S.SName AS 姓名,
         S.Dept AS 院系,
         CASE
-            WHEN (
-                SELECT COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0)
-                FROM Score SC
-                INNER JOIN Course C ON SC.CNo = C.CNo
-                WHERE SC.SNo = S.SNo
-            ) < GR.TotalCreditRequired * 0.8 THEN '学分不足（低于要求80%）'
-            WHEN (
-                SELECT COUNT(*) 
-                FROM Score SC
-                INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND S.Dept = CC.Dept
-                WHERE SC.SNo = S.SNo AND fn_IsPassed(SC.ScoreValue) = 0
-            ) >= GR.CoreCourseFailLimit THEN CONCAT('核心课程不及格数量超过限制（', GR.CoreCourseFailLimit, '门）')
+            WHEN COALESCE(A.EarnedCredit, 0) < GR.TotalCreditRequired * 0.8 THEN '学分不足（低于要求80%）'
+            WHEN COALESCE(A.CoreFailCount, 0) >= GR.CoreCourseFailLimit THEN CONCAT('核心课程不及格数量超过限制（', GR.CoreCourseFailLimit, '门）')
             ELSE '其他原因'
         END AS 预警原因,
-        (
-            SELECT COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0)
-            FROM Score SC
-            INNER JOIN Course C ON SC.CNo = C.CNo
-            WHERE SC.SNo = S.SNo
-        ) AS 已获学分,
+        COALESCE(A.EarnedCredit, 0) AS 已获学分,
         GR.TotalCreditRequired AS 要求学分,
-        (
-            SELECT COUNT(*) 
-            FROM Score SC
-            INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND S.Dept = CC.Dept
-            WHERE SC.SNo = S.SNo AND fn_IsPassed(SC.ScoreValue) = 0
-        ) AS 核心课程不及格数,
+        COALESCE(A.CoreFailCount, 0) AS 核心课程不及格数,
         GR.CoreCourseFailLimit AS 不及格上限
     FROM Student S
     INNER JOIN GraduationRequirement GR ON S.Dept = GR.Dept
+    LEFT JOIN (
+        -- 每个学生一行：已获学分（通过的课程学分之和）、本院系核心课程不及格门数
+        SELECT 
+            SC.SNo,
+            SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END) AS EarnedCredit,
+            COUNT(CASE WHEN GS.IsPassed = 0 THEN CC.CNo END) AS CoreFailCount
+        FROM Score SC
+        INNER JOIN Course C ON SC.CNo = C.CNo
+        INNER JOIN Student S2 ON SC.SNo = S2.SNo
+        LEFT JOIN CoreCourse CC ON CC.Dept = S2.Dept AND CC.CNo = SC.CNo
+        LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
+        GROUP BY SC.SNo
+    ) A ON A.SNo = S.SNo
     WHERE 
         -- 条件a：已获学分 < 毕业要求总学分的80%
-        (
-            SELECT COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0)
-            FROM Score SC
-            INNER JOIN Course C ON SC.CNo = C.CNo
-            WHERE SC.SNo = S.SNo
-        ) < GR.TotalCreditRequired * 0.8
+        COALESCE(A.EarnedCredit, 0) < GR.TotalCreditRequired * 0.8
         OR
         -- 条件b：核心课程不及格数量 >= 毕业要求中设定的上限
-        (
-            SELECT COUNT(*) 
-            FROM Score SC
-            INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND S.Dept = CC.Dept
-            WHERE SC.SNo = S.SNo AND fn_IsPassed(SC.ScoreValue) = 0
-        ) >= GR.CoreCourseFailLimit
+        COALESCE(A.CoreFailCount, 0) >= GR.CoreCourseFailLimit
     ORDER BY S.Dept, S.SNo;
 END$$
 
 DELIMITER ;
 
+-- 存储过程2：全量重建学生成绩汇总表（初始化或汇总数据疑似不一致时使用）
+DROP PROCEDURE IF EXISTS usp_RebuildStudentAggregate;
+DELIMITER $$
+
+CREATE PROCEDURE usp_RebuildStudentAggregate()
+BEGIN
+    DELETE FROM StudentAggregate;
+    INSERT INTO StudentAggregate (SNo, EarnedCredit, WeightedGradePoints, CoreFailCount)
+    SELECT 
+        S.SNo,
+        COALESCE(SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END), 0),
+        COALESCE(SUM(GS.GradePoint * C.Credit), 0),
+        COUNT(CASE WHEN GS.IsPassed = 0 THEN CC.CNo END)
+    FROM Student S
+    LEFT JOIN Score SC ON S.SNo = SC.SNo
+    LEFT JOIN Course C ON SC.CNo = C.CNo
+    LEFT JOIN CoreCourse CC ON CC.Dept = S.Dept AND CC.CNo = SC.CNo
+    LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
+    GROUP BY S.SNo;
+    -- 汇总表由触发器增量维护时随业务表版本变化，全量重建需单独递增
+    CALL usp_BumpDataVersion('StudentAggregate');
+END$$
+
+DELIMITER ;
+
+-- 存储过程3：压缩变更日志，删除 p_keep_seconds 秒之前的记录
+-- 始终保留最新一条，客户端据此判断自己读到的位置之后是否有记录已被删除（需要整表刷新）；
+-- 每次最多删除 p_limit 行，避免长时间持有锁
+DROP PROCEDURE IF EXISTS usp_CompactChangeLog;
+DELIMITER $$
+
+CREATE PROCEDURE usp_CompactChangeLog(IN p_keep_seconds INT, IN p_limit INT)
+BEGIN
+    DECLARE v_max_seq BIGINT UNSIGNED;
+    SELECT MAX(Seq) INTO v_max_seq FROM ChangeLog;
+    DELETE FROM ChangeLog
+    WHERE ChangedAt < NOW() - INTERVAL p_keep_seconds SECOND AND Seq < v_max_seq
+    ORDER BY Seq
+    LIMIT p_limit;
+END$$
+
+DELIMITER ;
+
 -- ============================================
 -- 第六部分：插入模拟数据（DML）
 -- ============================================
 
+-- 插入成绩等级（必须先于成绩数据，触发器依赖它计算汇总）
+INSERT INTO GradeScale (MinScore, MaxScore, GradePoint, IsPassed) VALUES
+(90, 999.99, 4.00, 1),
+(80, 90, 3.00, 1),
+(70, 80, 2.00, 1),
+(60, 70, 1.00, 1),
+(0, 60, 0.00, 0);
+
 -- 插入学生数据
 INSERT INTO Student (SNo, SName, Dept, EnrollmentYear) VALUES
 ('2021001', '张三', '计算机科学', 2021),
@@ -477,7 +875,7 @@ CALL usp_GenerateWarningList();
 
 -- 验证视图
 SELECT * FROM StudentGPAView LIMIT 10;
-SELECT * FROM FailedCoreCoursesView;
+SELECT * FROM FailedCoreCoursesView ORDER BY 学号, 学期;
 SELECT * FROM CreditsCompletedView;
 
 -- 验证数据（通过视图查看GPA和学分，无冗余字段）
@@ -0,0 +1,2 @@
+# 基准测试与数据校验工具
+
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+AsyncDatabaseManager 与 DatabaseManager 一致性校验与并发测试
+
+在独立的临时数据库中生成模拟数据，然后：
+1. 以基准测试（benchmark.runner）使用的方法和参数，逐个比较两个管理器的返回值（含值的类型）；
+2. 用 AsyncDatabaseManager 执行一轮增删改（临时学号/课程号，结束后数据恢复原状），
+   每步之后用 DatabaseManager 读取比对；
+3. 同时发出 --concurrency 个混合查询（asyncio.gather），与同步管理器逐个执行相同查询的耗时对比。
+
+用法：
+    python -m benchmark.async_parity --password 123456 --scale 1 --pool-size 20 --concurrency 300
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import datagen
+from benchmark.runner import EXTRA_READ_METHODS, INFRASTRUCTURE_METHODS, make_sample, write_steps
+
+# 并发测试使用的查询：(方法名, 根据样本数据生成参数的函数)
+CONCURRENT_METHODS = [
+    ('get_student_scores', lambda sample, sno: (sno,)),
+    ('get_student_with_gpa', lambda sample, sno: (sno,)),
+    ('get_failed_courses', lambda sample, sno: (sno,)),
+    ('get_students_with_gpa_page', lambda sample, sno: (sno, 50)),
+    ('get_scores_page', lambda sample, sno: (None, 100)),
+    ('get_department_statistics', lambda sample, sno: ()),
+    ('get_core_courses', lambda sample, sno: (sample['dept'],)),
+]
+
+def normalize(value):
+    """转为可直接比较的结构：生成器读成列表，对象比较属性，标量带上类型名"""
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) or hasattr(value, '__next__'):
+        return [normalize(v) for v in value]
+    if hasattr(value, 'tolist'):
+        return normalize(value.tolist())
+    if hasattr(value, '__dict__'):
+        return normalize(vars(value))
+    return (type(value).__name__, value)
+
+async def call_async(func, args):
+    """调用异步管理器的方法：协程等待结果，异步生成器读完"""
+    result = func(*args)
+    if hasattr(result, '__aiter__'):
+        return [row async for row in result]
+    if asyncio.iscoroutine(result):
+        return await result
+    return result
+
+def first_difference(expected, actual):
+    """第一处不一致（用于输出），列表逐行比较"""
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return f"行数 {len(expected)} != {len(actual)}"
+        for index, (a, b) in enumerate(zip(expected, actual)):
+            if a != b:
+                return f"第 {index} 行: {a} != {b}"
+    return f"{expected} != {actual}"
+
+async def check_reads(db, adb, sample, methods):
+    """逐个比较读取方法的返回值，返回不一致的方法数"""
+    failures = 0
+    for name, make_args in methods:
+        method = name.split('#')[0]
+        args = make_args(sample)
+        expected = normalize(getattr(db, method)(*args))
+        actual = normalize(await call_async(getattr(adb, method), args))
+        equal = expected == actual
+        failures += 0 if equal else 1
+        rows = len(expected) if isinstance(expected, list) else 1
+        print(f"  {name:<40} {rows:>8} 行  {'一致' if equal else '不一致: ' + first_difference(expected, actual)}")
+    return failures
+
+async def check_writes(db, adb, sample):
+    """用异步管理器执行一轮增删改，每步后比较两个管理器读到的数据，返回失败的步骤数"""
+    changes = []
+    adb.add_change_listener(changes.append)
+    sno = write_steps(sample, 0)[2][1][0]
+    failures = 0
+    for name, args in write_steps(sample, 0):
+        ok = await getattr(adb, name)(*args)
+        expected = normalize(db.get_student_scores(sno)) + normalize(db.get_graduation_requirements())
+        actual = normalize(await adb.get_student_scores(sno)) + normalize(await adb.get_graduation_requirements())
+        passed = ok is True and expected == actual
+        failures += 0 if passed else 1
+        print(f"  {name:<40} {'通过' if passed else '失败'}")
+    adb.remove_change_listener(changes.append)
+    if len(changes) != len(write_steps(sample, 0)):
+        print(f"  变更通知 {len(changes)} 次，应为 {len(write_steps(sample, 0))} 次")
+        failures += 1
+    return failures
+
+async def run_concurrent(db, adb, sample, count, seed):
+    """同时发出 count 个查询，与同步管理器逐个执行对比耗时，返回结果不一致的查询数"""
+    rng = random.Random(seed)
+    snos = [row['SNo'] for row in db.get_all_students()] or [sample['sno']]
+    calls = []
+    for _ in range(count):
+        name, make_args = rng.choice(CONCURRENT_METHODS)
+        calls.append((name, make_args(sample, rng.choice(snos))))
+
+    start = time.perf_counter()
+    expected = [getattr(db, name)(*args) for name, args in calls]
+    sync_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = await asyncio.gather(*(getattr(adb, name)(*args) for name, args in calls))
+    async_elapsed = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if normalize(a) != normalize(b))
+    print(f"  同步逐个执行: {sync_elapsed:.3f}s（{count / sync_elapsed:.1f} 次/s）")
+    print(f"  异步并发执行: {async_elapsed:.3f}s（{count / async_elapsed:.1f} 次/s），结果不一致 {mismatches} 个")
+    return mismatches
+
+def missing_methods(db, adb):
+    """DatabaseManager 中有、AsyncDatabaseManager 中没有的公开方法（缓存与建库相关的除外）"""
+    public = [n for n in dir(type(db)) if not n.startswith('_') and callable(getattr(type(db), n))]
+    return sorted(n for n in public if n not in INFRASTRUCTURE_METHODS and not hasattr(adb, n))
+
+async def benchmark(db, args):
+    from database.async_db_manager import AsyncDatabaseManager
+    from database.index_advisor import QUERY_METHODS
+
+    adb = AsyncDatabaseManager(pool_size=args.pool_size)
+    adb.config.update(db.config)
+    if not await adb.connect():
+        return 1
+    sample = make_sample(db)
+    failures = 0
+    try:
+        for use_aggregate in (False, True):
+            db.use_aggregate = adb.use_aggregate = use_aggregate
+            print(f"读取方法（{'汇总表' if use_aggregate else '视图'}）:")
+            failures += await check_reads(db, adb, sample, QUERY_METHODS + EXTRA_READ_METHODS)
+        print("增删改:")
+        failures += await check_writes(db, adb, sample)
+        print(f"并发查询（{args.concurrency} 个，连接池 {args.pool_size}）:")
+        failures += await run_concurrent(db, adb, sample, args.concurrency, args.seed)
+    finally:
+        await adb.disconnect()
+
+    missing = missing_methods(db, adb)
+    if missing:
+        print(f"AsyncDatabaseManager 缺少的方法: {', '.join(missing)}")
+        failures += len(missing)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="AsyncDatabaseManager 一致性校验与并发测试")
+    datagen.add_connection_arguments(parser)
+    parser.add_argument('--scale', type=float, default=1.0, help="规模因子（1 约为 1000 名学生）")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-data', action='store_true', help="使用临时数据库中已有的数据")
+    parser.add_argument('--pool-size', type=int, default=20, help="异步连接池大小")
+    parser.add_argument('--concurrency', type=int, default=300, help="同时发出的查询数")
+    args = parser.parse_args()
+
+    # 关闭结果缓存，两边比较的都是实际查询结果
+    db = datagen.connect(args)
+    db.query_cache = None
+    if args.skip_data:
+        if not db.connect():
+            return 2
+    else:
+        datagen.prepare_database(db, args.database)
+        datagen.load_dataset(db, datagen.generate_dataset(scale=args.scale, seed=args.seed))
+
+    try:
+        failures = asyncio.run(benchmark(db, args))
+    finally:
+        db.disconnect()
+    print("全部一致" if not failures else f"{failures} 项不一致")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+按规模因子生成模拟数据
+
+规模因子 1 约为 1000 名学生；院系数、课程数随规模缓慢增长。
+每个学生从入学起按学期选课，成绩由 学生能力 + 课程难度 + 随机波动 决定，
+不及格率约 8%~12%，部分不及格的核心课程会在下一学期重修。
+相同的规模因子和种子总是生成完全相同的数据。
+
+用法：
+    python -m benchmark.datagen --password 123456 --scale 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SQL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AcademicWarningSystem.sql")
+
+MAIN_DATABASE = 'AcademicWarningSystem'
+LAST_YEAR = 2024
+
+# 写入顺序（满足外键），清空时倒序
+TABLE_INSERTS = [
+    ('Student', "INSERT INTO Student (SNo, SName, Dept, EnrollmentYear) VALUES (%s, %s, %s, %s)"),
+    ('Course', "INSERT INTO Course (CNo, CName, Credit, CourseType) VALUES (%s, %s, %s, %s)"),
+    ('GraduationRequirement', "INSERT INTO GraduationRequirement (Dept, TotalCreditRequired, CoreCourseFailLimit, MinGPA) VALUES (%s, %s, %s, %s)"),
+    ('CoreCourse', "INSERT INTO CoreCourse (Dept, CNo) VALUES (%s, %s)"),
+    ('Score', "INSERT INTO Score (SNo, CNo, ScoreValue, Semester) VALUES (%s, %s, %s, %s)"),
+]
+
+def scale_parameters(scale=1.0, students=None):
+    """规模因子对应的各项数量"""
+    n_students = students if students is not None else max(1, int(round(1000 * scale)))
+    factor = n_students / 1000.0
+    return {
+        'students': n_students,
+        'depts': max(3, int(round(6 * factor ** 0.25))),
+        'courses': max(30, int(round(120 * factor ** 0.4))),
+        'core_per_dept': 8,
+        'courses_per_semester': (5, 7),
+    }
+
+def generate_dataset(scale=1.0, seed=42, students=None):
+    """生成确定性的模拟数据，返回 {表名: 行元组列表}
+
+    students 指定时直接使用该学生数，否则为 1000 * scale
+    """
+    params = scale_parameters(scale, students)
+    rng = random.Random(seed)
+    depts = [f"院系{i + 1:02d}" for i in range(params['depts'])]
+    course_types = ['核心', '通识', '选修']
+
+    courses = []
+    difficulty = {}
+    for i in range(params['courses']):
+        cno = f"C{i + 1:04d}"
+        course_type = course_types[i % 3]
+        courses.append((cno, f"课程{i + 1:04d}", float(rng.choice([1, 2, 2, 3, 3, 4])), course_type))
+        difficulty[cno] = rng.gauss(0, 0.6)
+    core_candidates = [c[0] for c in courses if c[3] == '核心']
+
+    core_courses = []
+    core_by_dept = {}
+    requirements = []
+    for dept in depts:
+        core = rng.sample(core_candidates, min(params['core_per_dept'], len(core_candidates)))
+        core_by_dept[dept] = set(core)
+        core_courses.extend((dept, cno) for cno in core)
+        requirements.append((dept, float(rng.choice([100, 110, 120])), rng.randint(1, 3),
+                             rng.choice([2.0, 2.5, 2.8])))
+
+    students_rows = []
+    scores = []
+    low, high = params['courses_per_semester']
+    for i in range(params['students']):
+        sno = f"S{i + 1:07d}"
+        dept = rng.choice(depts)
+        year = rng.randint(LAST_YEAR - 3, LAST_YEAR)
+        students_rows.append((sno, f"学生{i + 1}", dept, year))
+        ability = rng.gauss(0, 1)
+
+        # 先修本院系核心课，再按随机顺序选其他课程
+        core = [c for c in courses if c[0] in core_by_dept[dept]]
+        others = [c for c in courses if c[0] not in core_by_dept[dept]]
+        rng.shuffle(core)
+        rng.shuffle(others)
+        plan = core + others
+
+        semesters = []
+        for y in range(year, LAST_YEAR + 1):
+            semesters.append(f"{y}-秋季")
+            if y < LAST_YEAR:
+                semesters.append(f"{y + 1}-春季")
+        retakes = []
+        taken = 0
+        for semester in semesters:
+            # 上学期不及格的核心课程有一半概率在本学期重修
+            for cno in retakes:
+                score = _score(rng, ability + 0.3, difficulty[cno])
+                scores.append((sno, cno, score, semester))
+            retakes = []
+            count = rng.randint(low, high)
+            for course in plan[taken:taken + count]:
+                score = _score(rng, ability, difficulty[course[0]])
+                scores.append((sno, course[0], score, semester))
+                if score < 60 and course[0] in core_by_dept[dept] and rng.random() < 0.5:
+                    retakes.append(course[0])
+            taken += count
+
+    return {
+        'Student': students_rows,
+        'Course': courses,
+        'CoreCourse': core_courses,
+        'GraduationRequirement': requirements,
+        'Score': scores,
+    }
+
+def _score(rng, ability, difficulty):
+    value = 76 + 9 * ability - 7 * difficulty + rng.gauss(0, 8)
+    return round(min(100.0, max(0.0, value)), 1)
+
+def describe(data):
+    """数据规模摘要"""
+    scores = data['Score']
+    failed = sum(1 for row in scores if row[2] < 60)
+    return {
+        'students': len(data['Student']),
+        'courses': len(data['Course']),
+        'depts': len(data['GraduationRequirement']),
+        'core_courses': len(data['CoreCourse']),
+        'scores': len(scores),
+        'fail_rate': round(failed / len(scores), 4) if scores else 0.0,
+    }
+
+def load_dataset(db, data, batch_size=5000, progress=None):
+    """清空业务表并批量写入模拟数据（写入期间关闭外键与唯一性检查和逐行变更日志）"""
+    with db.session() as (connection, cursor):
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        cursor.execute("SET UNIQUE_CHECKS = 0")
+        cursor.execute("SET @SuppressChangeLog = 1")
+        try:
+            for table, _ in reversed(TABLE_INSERTS):
+                cursor.execute(f"DELETE FROM {table}")
+            cursor.execute("DELETE FROM StudentAggregate")
+            cursor.execute("DELETE FROM ChangeLog")
+            connection.commit()
+            for table, sql in TABLE_INSERTS:
+                rows = data[table]
+                for start in range(0, len(rows), batch_size):
+                    cursor.executemany(sql, rows[start:start + batch_size])
+                    connection.commit()
+                    if progress:
+                        progress(table, min(start + batch_size, len(rows)), len(rows))
+        finally:
+            cursor.execute("SET @SuppressChangeLog = NULL")
+            cursor.execute("SET UNIQUE_CHECKS = 1")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        # 关闭外键检查时触发器照常执行，这里再全量重建一次汇总表，保证与视图一致
+        cursor.execute("CALL usp_RebuildStudentAggregate()")
+        connection.commit()
+        cursor.execute("ANALYZE TABLE Student, Course, Score, CoreCourse, StudentAggregate")
+        cursor.fetchall()
+
+def prepare_database(db, database):
+    """在临时数据库中执行建库脚本（脚本中的库名替换为 database）"""
+    if database == MAIN_DATABASE:
+        raise ValueError("请使用独立的临时数据库，避免覆盖正式数据")
+    with open(SQL_FILE, 'r', encoding='utf-8') as f:
+        script = f.read().replace(MAIN_DATABASE, database)
+    fd, path = tempfile.mkstemp(suffix='.sql')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(script)
+        if not db.initialize_database(path):
+            raise RuntimeError("初始化临时数据库失败")
+    finally:
+        os.remove(path)
+
+def add_connection_arguments(parser, default_database='AcademicWarningSystem_Bench'):
+    """基准脚本共用的连接参数"""
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default=os.environ.get('AWS_DB_PASSWORD', ''))
+    parser.add_argument('--database', default=default_database,
+                        help="临时数据库名（会被清空重建，不要指向正式库）")
+
+def connect(args):
+    """按命令行参数创建 DatabaseManager（未连接）"""
+    if args.database == MAIN_DATABASE:
+        raise SystemExit("请使用独立的临时数据库，避免覆盖正式数据")
+    # 只生成数据时不需要 mysql-connector，延迟导入
+    from database.db_manager import DatabaseManager
+    db = DatabaseManager()
+    db.set_config(args.host, args.port, args.user, args.password, args.database)
+    return db
+
+def main():
+    parser = argparse.ArgumentParser(description="按规模因子生成模拟数据并导入临时数据库")
+    add_connection_arguments(parser)
+    parser.add_argument('--scale', type=float, default=1.0, help="规模因子（1 约为 1000 名学生）")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-schema', action='store_true', help="不重新执行建库脚本，只替换数据")
+    args = parser.parse_args()
+
+    db = connect(args)
+    if args.skip_schema:
+        if not db.connect():
+            print("数据库连接失败")
+            return 2
+    else:
+        prepare_database(db, args.database)
+
+    start = time.perf_counter()
+    data = generate_dataset(args.scale, seed=args.seed)
+    print(f"生成完成（{time.perf_counter() - start:.1f}s）: {describe(data)}")
+
+    start = time.perf_counter()
+    load_dataset(db, data, progress=lambda table, done, total: print(f"\r{table}: {done}/{total}", end=""))
+    print(f"\n导入完成（{time.perf_counter() - start:.1f}s）")
+    db.disconnect()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DatabaseManager 基准测试
+
+对每个规模因子：用 datagen 生成并导入数据，依次计时 DatabaseManager 的全部
+查询方法、增删改方法（每轮用临时学号/课程号新增后再删除，不改变数据）、
+流式读取方法和预警存储过程，结果保存为 JSON，可用 --compare 与之前的结果对比。
+
+用法：
+    python -m benchmark.runner --password 123456 --scales 1 5 20
+    python -m benchmark.runner --password 123456 --scales 1 5 20 --compare benchmark/results/old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import datagen
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 查询诊断之外额外计时的方法：(方法名, 根据样本数据生成参数的函数)
+# 同一方法的不同参数组合用 "方法名#说明" 区分
+EXTRA_READ_METHODS = [
+    ('get_failed_core_courses#student', lambda sample: (sample['sno'],)),
+    ('get_failed_courses#student', lambda sample: (sample['sno'],)),
+    ('get_core_courses#all', lambda sample: ()),
+    ('get_students_page#first_with_total', lambda sample: (None, 200, True)),
+    ('get_scores_page#first_with_total', lambda sample: (None, 200, True)),
+    ('estimate_row_count', lambda sample: ('Score',)),
+    ('get_score', lambda sample: sample['score_key'] or ('', '', '')),
+    ('get_student_with_gpa', lambda sample: (sample['sno'],)),
+    ('get_changes_since', lambda sample: (0, 500)),
+    ('get_change_log_bounds', lambda sample: ()),
+    ('get_grade_scale', lambda sample: ()),
+    ('reload_grade_scale', lambda sample: ()),
+    ('calculate_gpa', lambda sample: (85,)),
+    ('derive_grades', lambda sample: (sample['score_values'],)),
+    ('iter_all_scores', lambda sample: ()),
+    ('iter_warning_list', lambda sample: ()),
+    ('iter_failed_courses', lambda sample: ()),
+    ('iter_failed_core_courses', lambda sample: ()),
+    ('iter_student_gpa_view', lambda sample: ()),
+    ('iter_credits_completed', lambda sample: ()),
+    ('iter_all_students_with_gpa', lambda sample: ()),
+    ('verify_student_aggregate', lambda sample: ()),
+    ('rebuild_student_aggregate', lambda sample: ()),
+]
+
+# 连接管理和通用执行方法由其他方法间接覆盖，不单独计时
+INFRASTRUCTURE_METHODS = {
+    'set_config', 'connect', 'disconnect', 'create_pool', 'session', 'stream_connection',
+    'execute_query', 'execute_update', 'call_procedure', 'iter_query', 'iter_procedure',
+    'execute_sql_file', 'initialize_database',
+    'cached_query', 'cached_procedure', 'clear_query_cache', 'raising_errors',
+    'add_change_listener', 'remove_change_listener', 'compact_change_log', 'log_bulk_change',
+}
+
+PROCEDURES = ['usp_GenerateWarningList']
+
+def write_steps(sample, round_no):
+    """一轮增删改：先建后删，结束后数据库恢复原状"""
+    sno = f"BENCH{round_no:05d}"
+    cno = f"BC{round_no:05d}"
+    dept = f"基准院系{round_no:05d}"
+    semester = '2099-秋季'
+    return [
+        ('add_course', (cno, '基准课程', 3.0, '核心')),
+        ('update_course', (cno, '基准课程', 4.0, '核心')),
+        ('add_student', (sno, '基准学生', sample['dept'], 2024)),
+        ('update_student', (sno, '基准学生', sample['dept'], 2023)),
+        ('add_score', (sno, cno, 55.0, semester)),
+        ('update_score', (sno, cno, semester, 75.0)),
+        ('add_core_course', (sample['dept'], cno)),
+        ('delete_core_course', (sample['dept'], cno)),
+        ('delete_score', (sno, cno, semester)),
+        ('add_graduation_requirement', (dept, 120.0, 2, 2.0)),
+        ('update_graduation_requirement', (dept, 110.0, 3, 2.5)),
+        ('delete_graduation_requirement', (dept,)),
+        ('delete_student', (sno,)),
+        ('delete_course', (cno,)),
+    ]
+
+def count_result(result):
+    """结果行数；生成器会被完整读取"""
+    if isinstance(result, dict) and 'rows' in result:
+        return len(result['rows'])
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if hasattr(result, '__next__'):
+        return sum(1 for _ in result)
+    return 1
+
+def summarize(name, timings, rows, **extra):
+    entry = {
+        'method': name,
+        'runs': [round(t, 6) for t in timings],
+        'best': round(min(timings), 6) if timings else None,
+        'mean': round(sum(timings) / len(timings), 6) if timings else None,
+        'rows': rows,
+    }
+    entry.update(extra)
+    return entry
+
+def time_call(func, args):
+    """执行一次并计时（包括读取完生成器），返回 (秒, 行数)"""
+    start = time.perf_counter()
+    rows = count_result(func(*args))
+    return time.perf_counter() - start, rows
+
+def bench_reads(db, sample, repeat, methods):
+    results = []
+    for name, make_args in methods:
+        func = getattr(db, name.split('#')[0], None)
+        if func is None:
+            continue
+        args = make_args(sample)
+        timings = []
+        rows = None
+        for _ in range(repeat):
+            # 每次计时前清空结果缓存，测量的是实际查询耗时
+            db.clear_query_cache()
+            elapsed, rows = time_call(func, args)
+            timings.append(elapsed)
+        # 再调用一次不清缓存，记录缓存命中时的耗时
+        warm, _ = time_call(func, args)
+        results.append(summarize(name, timings, rows, kind='read', warm=round(warm, 6)))
+    return results
+
+def bench_writes(db, sample, repeat):
+    timings = {}
+    failed = set()
+    for round_no in range(repeat):
+        for name, args in write_steps(sample, round_no):
+            func = getattr(db, name, None)
+            if func is None:
+                continue
+            start = time.perf_counter()
+            ok = func(*args)
+            timings.setdefault(name, []).append(time.perf_counter() - start)
+            if not ok:
+                failed.add(name)
+    return [summarize(name, values, 1, kind='write', ok=name not in failed) for name, values in timings.items()]
+
+def bench_procedures(db, repeat):
+    results = []
+    for name in PROCEDURES:
+        timings = []
+        rows = None
+        for _ in range(repeat):
+            elapsed, rows = time_call(db.call_procedure, (name,))
+            timings.append(elapsed)
+        results.append(summarize(f"procedure:{name}", timings, rows, kind='procedure'))
+    return results
+
+def make_sample(db):
+    """带参数方法使用的样本数据"""
+    from database.index_advisor import IndexAdvisor
+    sample = IndexAdvisor(db).sample()
+    rows = db.execute_query("SELECT ScoreValue FROM Score LIMIT 10000")
+    sample['score_values'] = [row['ScoreValue'] for row in rows]
+    return sample
+
+def uncovered_methods(db, names):
+    """未被计时的公开方法（新增方法时提醒补充到基准中）"""
+    public = [n for n in dir(type(db)) if not n.startswith('_') and callable(getattr(type(db), n))]
+    return sorted(set(public) - set(names) - INFRASTRUCTURE_METHODS)
+
+def server_info(db):
+    rows = db.execute_query("SELECT VERSION() AS version")
+    return rows[0]['version'] if rows else None
+
+def compare(current, baseline_path):
+    """按 (规模因子, 模式, 方法) 对比两次结果的最短耗时"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    old = {}
+    for run in baseline['runs']:
+        for entry in run['results']:
+            old[(run['scale'], run['mode'], entry['method'])] = entry['best']
+    print()
+    print(f"{'规模':>6} {'模式':<10} {'方法':<36} {'基线(s)':>10} {'本次(s)':>10} {'比值':>7}")
+    for run in current['runs']:
+        for entry in run['results']:
+            before = old.get((run['scale'], run['mode'], entry['method']))
+            if before is None or entry['best'] is None:
+                continue
+            ratio = entry['best'] / before if before > 0 else float('inf')
+            mark = "  <- 变慢" if ratio > 1.2 else ""
+            print(f"{run['scale']:>6} {run['mode']:<10} {entry['method']:<36} "
+                  f"{before:>10.4f} {entry['best']:>10.4f} {ratio:>6.2f}x{mark}")
+
+def main():
+    parser = argparse.ArgumentParser(description="DatabaseManager 各方法与预警存储过程的规模基准")
+    datagen.add_connection_arguments(parser)
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 5, 20],
+                        help="规模因子（1 约为 1000 名学生）")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', choices=['view', 'aggregate'], default=['view'],
+                        help="view: 通过视图计算 GPA；aggregate: 读取 StudentAggregate 汇总表")
+    parser.add_argument('--output', default=None, help="结果 JSON 路径（默认 benchmark/results/时间戳.json）")
+    parser.add_argument('--compare', default=None, help="与之前保存的结果 JSON 对比")
+    args = parser.parse_args()
+
+    from database.index_advisor import QUERY_METHODS
+    read_methods = QUERY_METHODS + EXTRA_READ_METHODS
+
+    db = datagen.connect(args)
+    datagen.prepare_database(db, args.database)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mysql': server_info(db),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'runs': [],
+    }
+
+    for scale in args.scales:
+        data = datagen.generate_dataset(scale, seed=args.seed)
+        dataset = datagen.describe(data)
+        start = time.perf_counter()
+        datagen.load_dataset(db, data)
+        dataset['load_seconds'] = round(time.perf_counter() - start, 3)
+        print(f"规模 {scale}: {dataset}")
+        sample = make_sample(db)
+
+        for mode in args.modes:
+            db.use_aggregate = mode == 'aggregate'
+            results = bench_reads(db, sample, args.repeat, read_methods)
+            results += bench_writes(db, sample, args.repeat)
+            results += bench_procedures(db, args.repeat)
+            report['runs'].append({'scale': scale, 'mode': mode, 'dataset': dataset, 'results': results})
+            for entry in results:
+                flag = "" if entry.get('ok', True) else "  (执行失败)"
+                print(f"  [{mode}] {entry['method']:<36} {entry['best']:>9.4f}s  {entry['rows']:>8} 行{flag}")
+
+    covered = [name.split('#')[0] for name, _ in read_methods] + [name for name, _ in write_steps({'dept': ''}, 0)]
+    skipped = uncovered_methods(db, covered)
+    if skipped:
+        print(f"未计时的公开方法: {', '.join(skipped)}")
+    report['uncovered'] = skipped
+    db.disconnect()
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+查询服务（server.py）一致性校验与并发压测
+
+在独立的临时数据库中生成模拟数据，在本进程内启动 QueryService：
+先逐个接口比较 HTTP 返回的 JSON 与直接调用 DatabaseManager 的结果，
+再以指定并发数发送混合请求，分别打印关闭和开启响应缓存时的吞吐量与延迟分位数。
+
+用法：
+    python -m benchmark.service_load --password 123456 --scale 1 --concurrency 200 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import datagen
+from server import QueryService, encode_json
+
+async def fetch(host, port, path):
+    """发送一个 GET 请求，返回 (状态码, 解析后的 JSON)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('utf-8'))
+        await writer.drain()
+        data = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    return status, json.loads(body) if body else None
+
+def sample_paths(db, count, seed):
+    """混合请求：名单、排名、统计、分页与学生成绩单"""
+    rng = random.Random(seed)
+    snos = [row['SNo'] for row in db.get_all_students()]
+    fixed = ['/warnings', '/warnings?limit=20&offset=20', '/gpa-ranking?limit=50', '/credits',
+             '/stats/departments', '/stats/semesters', '/courses', '/students?page_size=100',
+             '/scores?page_size=200', '/failed-courses?page_size=100']
+    paths = []
+    for _ in range(count):
+        if snos and rng.random() < 0.5:
+            paths.append(f"/students/{rng.choice(snos)}/transcript")
+        else:
+            paths.append(rng.choice(fixed))
+    return paths
+
+async def check_parity(db, host, port, sno):
+    """逐个接口比较 HTTP 结果与直接调用的结果，返回不一致的接口数"""
+    def expected(data):
+        return json.loads(encode_json(data))
+
+    checks = [
+        ('/warnings?limit=1000', lambda: db.get_warning_list()[:1000]),
+        ('/gpa-ranking?limit=1000', lambda: db.get_student_gpa_view()[:1000]),
+        ('/stats/departments', db.get_department_statistics),
+        ('/stats/semesters', db.get_semester_statistics),
+        ('/students?page_size=50', lambda: db.get_students_with_gpa_page(None, 50)),
+        ('/scores?page_size=50', lambda: db.get_scores_page(None, 50)),
+        (f'/students/{sno}', lambda: db.get_student_with_gpa(sno)),
+    ]
+    failures = 0
+    for path, direct in checks:
+        status, body = await fetch(host, port, path)
+        if isinstance(body, dict) and 'offset' in body:
+            body = body['rows']
+        equal = status == 200 and body == expected(direct())
+        failures += 0 if equal else 1
+        print(f"  {path:<32} {'一致' if equal else '不一致'}")
+    return failures
+
+async def run_load(host, port, paths, concurrency):
+    """并发发送请求，返回 (总耗时, 每个请求的延迟列表, 非 200 的请求数)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(path):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            status, _ = await fetch(host, port, path)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(path) for path in paths))
+    return time.perf_counter() - start, latencies, errors
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+async def benchmark(db, args):
+    paths = sample_paths(db, args.requests, args.seed)
+    failures = 0
+    print(f"{'缓存(s)':>8} {'请求数':>8} {'吞吐(次/s)':>12} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'失败':>6}")
+    for ttl in (0.0, args.cache_ttl):
+        service = QueryService(db, workers=args.pool_size, cache_ttl=ttl)
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            if ttl == 0:
+                print("接口一致性:")
+                failures += await check_parity(db, '127.0.0.1', port, paths_sno(paths))
+            elapsed, latencies, errors = await run_load('127.0.0.1', port, paths, args.concurrency)
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+        failures += errors
+        print(f"{ttl:>8.1f} {len(latencies):>8} {len(latencies) / elapsed:>12.1f} "
+              f"{percentile(latencies, 0.5) * 1000:>9.1f} {percentile(latencies, 0.95) * 1000:>9.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>9.1f} {errors:>6}")
+    return failures
+
+def paths_sno(paths):
+    for path in paths:
+        if path.endswith('/transcript'):
+            return path.split('/')[2]
+    return ''
+
+def main():
+    parser = argparse.ArgumentParser(description="查询服务一致性校验与并发压测")
+    datagen.add_connection_arguments(parser)
+    parser.add_argument('--scale', type=float, default=1.0, help="规模因子（1 约为 1000 名学生）")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-data', action='store_true', help="使用临时数据库中已有的数据")
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=200, help="同时进行的请求数")
+    parser.add_argument('--requests', type=int, default=2000, help="总请求数")
+    parser.add_argument('--cache-ttl', type=float, default=2.0, help="第二轮压测使用的响应缓存有效期（秒）")
+    args = parser.parse_args()
+
+    db = datagen.connect(args)
+    db.pool_size = args.pool_size
+    if args.skip_data:
+        if not db.connect():
+            return 2
+    else:
+        datagen.prepare_database(db, args.database)
+        datagen.load_dataset(db, datagen.generate_dataset(scale=args.scale, seed=args.seed))
+    if db.pool is None:
+        db.create_pool()
+
+    try:
+        failures = asyncio.run(benchmark(db, args))
+    finally:
+        db.disconnect()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
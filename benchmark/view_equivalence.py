@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+视图等价性校验
+
+在独立的临时数据库中创建旧版视图（逐行调用 fn_IsPassed / fn_CalculateGPA、带 ORDER BY），
+用多组随机数据（含 59.99、60、89.99、90 等分数线边界值）比较旧版与当前视图的输出，
+要求逐行完全一致；同时打印两者的执行计划所用索引，便于确认新视图可以走 idx_score。
+
+用法：
+    python -m benchmark.view_equivalence --password 123456 --sizes 200 2000 --seeds 1 2 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import datagen
+
+# 旧版视图定义（仅用于对照）
+LEGACY_VIEWS = {
+    'StudentGPAView': """
+        SELECT
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            S.Dept AS 院系,
+            COALESCE(SUM(CASE WHEN SC.ScoreValue >= 60 THEN C.Credit ELSE 0 END), 0) AS 已获学分,
+            CASE
+                WHEN SUM(CASE WHEN SC.ScoreValue >= 60 THEN C.Credit ELSE 0 END) > 0
+                THEN ROUND(SUM(fn_CalculateGPA(SC.ScoreValue) * C.Credit) / SUM(CASE WHEN SC.ScoreValue >= 60 THEN C.Credit ELSE 0 END), 2)
+                ELSE 0.00
+            END AS 平均绩点
+        FROM Student S
+        LEFT JOIN Score SC ON S.SNo = SC.SNo
+        LEFT JOIN Course C ON SC.CNo = C.CNo
+        GROUP BY S.SNo, S.SName, S.Dept
+    """,
+    'FailedCoreCoursesView': """
+        SELECT
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            C.CName AS 课程名,
+            SC.ScoreValue AS 成绩,
+            SC.Semester AS 学期
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN Course C ON SC.CNo = C.CNo
+        INNER JOIN CoreCourse CC ON C.CNo = CC.CNo AND S.Dept = CC.Dept
+        WHERE fn_IsPassed(SC.ScoreValue) = 0
+        ORDER BY S.SNo, SC.Semester
+    """,
+    'CreditsCompletedView': """
+        SELECT
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0) AS 已获学分总数
+        FROM Student S
+        LEFT JOIN Score SC ON S.SNo = SC.SNo
+        LEFT JOIN Course C ON SC.CNo = C.CNo
+        GROUP BY S.SNo, S.SName
+    """,
+    'FailedCoursesView': """
+        SELECT
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            S.Dept AS 院系,
+            C.CNo AS 课程号,
+            C.CName AS 课程名,
+            C.Credit AS 学分,
+            C.CourseType AS 课程类型,
+            SC.ScoreValue AS 成绩,
+            SC.Semester AS 学期
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN Course C ON SC.CNo = C.CNo
+        WHERE fn_IsPassed(SC.ScoreValue) = 0
+        ORDER BY S.SNo, SC.Semester
+    """,
+}
+
+# 分数线边界值，随机替换进部分成绩，覆盖 >= / < 的边界
+BOUNDARY_SCORES = [0, 59.99, 60, 60.01, 69.99, 70, 79.99, 80, 89.99, 90, 100]
+
+def legacy_name(view):
+    return f"{view}_Legacy"
+
+def create_legacy_views(db):
+    for view, definition in LEGACY_VIEWS.items():
+        db.execute_update(f"DROP VIEW IF EXISTS {legacy_name(view)}")
+        if not db.execute_update(f"CREATE VIEW {legacy_name(view)} AS {definition}"):
+            raise RuntimeError(f"创建旧版视图失败: {view}")
+
+def drop_legacy_views(db):
+    for view in LEGACY_VIEWS:
+        db.execute_update(f"DROP VIEW IF EXISTS {legacy_name(view)}")
+
+def with_boundary_scores(data, seed, ratio=0.05):
+    """把一部分成绩替换为分数线边界值"""
+    rng = random.Random(seed)
+    scores = []
+    for sno, cno, score, semester in data['Score']:
+        if rng.random() < ratio:
+            score = rng.choice(BOUNDARY_SCORES)
+        scores.append((sno, cno, score, semester))
+    data = dict(data)
+    data['Score'] = scores
+    return data
+
+def fetch_sorted(db, view):
+    """取出视图的全部行，按所有列排序后比较（视图不再保证顺序）；查询出错时抛出异常"""
+    rows = db.execute_query(f"SELECT * FROM {view}", raise_errors=True)
+    return sorted((tuple(row.values()) for row in rows), key=repr)
+
+def time_query(db, view):
+    start = time.perf_counter()
+    db.execute_query(f"SELECT * FROM {view}")
+    return time.perf_counter() - start
+
+def plan_keys(db, query):
+    """EXPLAIN 中各表使用的索引，形如 SC:idx_score"""
+    rows = db.execute_query(f"EXPLAIN {query}")
+    return ", ".join(f"{row.get('table')}:{row.get('key') or row.get('type')}" for row in rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="视图等价性校验（旧版函数视图 vs 当前视图）")
+    datagen.add_connection_arguments(parser)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    args = parser.parse_args()
+
+    db = datagen.connect(args)
+    datagen.prepare_database(db, args.database)
+    create_legacy_views(db)
+
+    failures = 0
+    for size in args.sizes:
+        for seed in args.seeds:
+            data = datagen.generate_dataset(seed=seed, students=size)
+            datagen.load_dataset(db, with_boundary_scores(data, seed))
+            for view in LEGACY_VIEWS:
+                try:
+                    legacy_rows = fetch_sorted(db, legacy_name(view))
+                    new_rows = fetch_sorted(db, view)
+                except Exception as e:
+                    failures += 1
+                    print(f"学生 {size:>6} 种子 {seed:>3} {view:<24} 查询失败: {e}")
+                    continue
+                # 任一侧没有行时无法说明等价，按失败处理
+                equal = bool(legacy_rows) and bool(new_rows) and legacy_rows == new_rows
+                failures += 0 if equal else 1
+                if not legacy_rows or not new_rows:
+                    outcome = "无结果"
+                else:
+                    outcome = '一致' if equal else '不一致'
+                print(f"学生 {size:>6} 种子 {seed:>3} {view:<24} "
+                      f"{outcome}（旧 {len(legacy_rows)} 行 / 新 {len(new_rows)} 行）")
+                if not equal:
+                    missing = set(legacy_rows) - set(new_rows)
+                    extra = set(new_rows) - set(legacy_rows)
+                    for row in list(missing)[:5]:
+                        print(f"    仅旧版: {row}")
+                    for row in list(extra)[:5]:
+                        print(f"    仅新版: {row}")
+
+    # 最后一组数据上的耗时与执行计划
+    print()
+    for view in LEGACY_VIEWS:
+        legacy_time = time_query(db, legacy_name(view))
+        new_time = time_query(db, view)
+        print(f"{view:<24} 旧版 {legacy_time:.3f}s  新版 {new_time:.3f}s")
+    for view in ('FailedCoursesView', 'FailedCoreCoursesView'):
+        print(f"{view} 执行计划  旧版: {plan_keys(db, f'SELECT * FROM {legacy_name(view)}')}")
+        print(f"{view} 执行计划  新版: {plan_keys(db, f'SELECT * FROM {view}')}")
+
+    drop_legacy_views(db)
+    db.disconnect()
+    print()
+    print("全部一致" if failures == 0 else f"{failures} 组结果不一致")
+    return 0 if failures == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
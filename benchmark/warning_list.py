@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+预警名单存储过程：等价性校验与规模基准
+
+在独立的临时数据库中按不同学生规模生成模拟数据，分别调用
+旧版（相关子查询）与新版（分组聚合）usp_GenerateWarningList，
+校验两者输出完全一致，并打印运行时间随学生数的变化。
+
+用法：
+    python -m benchmark.warning_list --password 123456 --sizes 1000 5000 30000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import datagen
+
+# 旧版存储过程（逐学生执行相关子查询），仅用于对照
+LEGACY_PROCEDURE = "usp_GenerateWarningList_Legacy"
+LEGACY_PROCEDURE_SQL = """
+CREATE PROCEDURE usp_GenerateWarningList_Legacy()
+BEGIN
+    SELECT
+        S.SNo AS 学号,
+        S.SName AS 姓名,
+        S.Dept AS 院系,
+        CASE
+            WHEN (
+                SELECT COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0)
+                FROM Score SC
+                INNER JOIN Course C ON SC.CNo = C.CNo
+                WHERE SC.SNo = S.SNo
+            ) < GR.TotalCreditRequired * 0.8 THEN '学分不足（低于要求80%）'
+            WHEN (
+                SELECT COUNT(*)
+                FROM Score SC
+                INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND S.Dept = CC.Dept
+                WHERE SC.SNo = S.SNo AND fn_IsPassed(SC.ScoreValue) = 0
+            ) >= GR.CoreCourseFailLimit THEN CONCAT('核心课程不及格数量超过限制（', GR.CoreCourseFailLimit, '门）')
+            ELSE '其他原因'
+        END AS 预警原因,
+        (
+            SELECT COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0)
+            FROM Score SC
+            INNER JOIN Course C ON SC.CNo = C.CNo
+            WHERE SC.SNo = S.SNo
+        ) AS 已获学分,
+        GR.TotalCreditRequired AS 要求学分,
+        (
+            SELECT COUNT(*)
+            FROM Score SC
+            INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND S.Dept = CC.Dept
+            WHERE SC.SNo = S.SNo AND fn_IsPassed(SC.ScoreValue) = 0
+        ) AS 核心课程不及格数,
+        GR.CoreCourseFailLimit AS 不及格上限
+    FROM Student S
+    INNER JOIN GraduationRequirement GR ON S.Dept = GR.Dept
+    WHERE
+        (
+            SELECT COALESCE(SUM(CASE WHEN fn_IsPassed(SC.ScoreValue) = 1 THEN C.Credit ELSE 0 END), 0)
+            FROM Score SC
+            INNER JOIN Course C ON SC.CNo = C.CNo
+            WHERE SC.SNo = S.SNo
+        ) < GR.TotalCreditRequired * 0.8
+        OR
+        (
+            SELECT COUNT(*)
+            FROM Score SC
+            INNER JOIN CoreCourse CC ON SC.CNo = CC.CNo AND S.Dept = CC.Dept
+            WHERE SC.SNo = S.SNo AND fn_IsPassed(SC.ScoreValue) = 0
+        ) >= GR.CoreCourseFailLimit
+    ORDER BY S.Dept, S.SNo;
+END
+"""
+
+def prepare_database(db, database):
+    """在临时数据库中执行建库脚本，并创建旧版存储过程"""
+    datagen.prepare_database(db, database)
+    db.execute_update(f"DROP PROCEDURE IF EXISTS {LEGACY_PROCEDURE}")
+    db.execute_update(LEGACY_PROCEDURE_SQL)
+
+def time_procedure(db, name, repeat):
+    """多次调用存储过程，返回 (最短耗时秒, 结果)；调用出错时抛出异常"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = db.call_procedure(name, raise_errors=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="usp_GenerateWarningList 等价性校验与规模基准")
+    datagen.add_connection_arguments(parser)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-legacy-above', type=int, default=None,
+                        help="学生数超过该值时不再运行旧版存储过程（旧版耗时过长）")
+    args = parser.parse_args()
+
+    db = datagen.connect(args)
+    prepare_database(db, args.database)
+
+    print(f"{'学生数':>8} {'成绩数':>10} {'旧版(s)':>10} {'新版(s)':>10} {'加速比':>8}  结果")
+    all_equal = True
+    for size in args.sizes:
+        data = datagen.generate_dataset(seed=args.seed, students=size)
+        datagen.load_dataset(db, data)
+
+        try:
+            new_time, new_rows = time_procedure(db, 'usp_GenerateWarningList', args.repeat)
+            if args.skip_legacy_above is not None and size > args.skip_legacy_above:
+                print(f"{size:>8} {len(data['Score']):>10} {'-':>10} {new_time:>10.3f} {'-':>8}  未对照")
+                continue
+            legacy_time, legacy_rows = time_procedure(db, LEGACY_PROCEDURE, args.repeat)
+        except Exception as e:
+            print(f"{size:>8} {len(data['Score']):>10}  存储过程执行失败: {e}")
+            all_equal = False
+            continue
+
+        # 两边都没有结果时无法说明等价，按失败处理
+        equal = bool(new_rows) and legacy_rows == new_rows
+        all_equal = all_equal and equal
+        speedup = legacy_time / new_time if new_time > 0 else float('inf')
+        if not new_rows:
+            outcome = "无结果"
+        else:
+            outcome = '一致' if equal else '不一致'
+        print(f"{size:>8} {len(data['Score']):>10} {legacy_time:>10.3f} {new_time:>10.3f} {speedup:>7.1f}x  "
+              f"{outcome}（{len(new_rows)} 行）")
+
+    db.execute_update(f"DROP PROCEDURE IF EXISTS {LEGACY_PROCEDURE}")
+    db.disconnect()
+    return 0 if all_equal else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+大学生学业预警与成绩分析系统 - 命令行批处理
+不导入 tkinter，适合定时任务（cron / 计划任务）生成报表
+
+    python cli.py warnings                                  # 预警名单输出到终端
+    python cli.py warnings --dept 计算机学院 -o 预警.xlsx     # 只看某个院系，写入文件
+    python cli.py warnings --split-by-dept reports/ --format csv
+                                                            # 一次查询，每个院系一个文件
+    python cli.py gpa --min-gpa 3.5 --format jsonl
+    python cli.py dept-stats
+    python cli.py semester-stats --semester 2024-秋季
+    python cli.py report failed_courses --sno 2021001       # 任意导出内容（见 database/exporter.py）
+    python cli.py export scores 成绩.parquet                 # 流式导出整表
+    python cli.py import scores 成绩.csv --chunk-size 5000   # 批量导入
+
+连接参数：--host --port --user --password --database，密码默认取环境变量 AWS_DB_PASSWORD。
+退出码：0 成功；1 warnings --fail-on-warnings 时存在预警学生，或导入有被拒绝的行；2 参数或连接错误。
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from decimal import Decimal
+
+# 添加当前目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.exporter import EXPORT_SOURCES, FORMATS, export_partitioned, export_rows, format_for_path
+
+# 报表快捷命令 -> 导出内容
+REPORT_COMMANDS = {
+    'warnings': ('warning_list', "预警学生名单"),
+    'gpa': ('gpa_ranking', "学生GPA排名"),
+    'dept-stats': ('department_stats', "各院系统计"),
+    'semester-stats': ('semester_stats', "学期统计"),
+}
+
+# 筛选条件对应的列（视图中为中文列名，基础表中为英文列名）
+DEPT_KEYS = ('院系', 'Dept')
+SEMESTER_KEYS = ('学期', 'Semester')
+SNO_KEYS = ('学号', 'SNo')
+GPA_KEYS = ('平均绩点', 'GPA')
+
+STDOUT_FORMATS = ('tsv', 'csv', 'jsonl')
+
+def _find_key(row, candidates, option):
+    for key in candidates:
+        if key in row:
+            return key
+    raise ValueError(f"该报表没有可用于 {option} 的列")
+
+def filter_rows(rows, depts=None, semester=None, sno=None, min_gpa=None, limit=None):
+    """按条件逐行筛选（流式，不缓存结果）"""
+    conditions = []
+    if depts:
+        conditions.append((DEPT_KEYS, '--dept', lambda v: v in depts))
+    if semester:
+        conditions.append((SEMESTER_KEYS, '--semester', lambda v: v == semester))
+    if sno:
+        conditions.append((SNO_KEYS, '--sno', lambda v: str(v) == sno))
+    if min_gpa is not None:
+        conditions.append((GPA_KEYS, '--min-gpa', lambda v: v is not None and float(v) >= min_gpa))
+    checks = None
+    count = 0
+    for row in rows:
+        if limit is not None and count >= limit:
+            break
+        if checks is None:
+            checks = [(_find_key(row, keys, option), test) for keys, option, test in conditions]
+        if all(test(row[key]) for key, test in checks):
+            count += 1
+            yield row
+
+def _json_default(value):
+    return float(value) if isinstance(value, Decimal) else str(value)
+
+def write_stdout(rows, columns, fmt, out=None):
+    """逐行写到标准输出，返回行数"""
+    from database.exporter import resolve_columns
+
+    out = out or sys.stdout
+    keys = None
+    count = 0
+    writer = csv.writer(out, delimiter='\t' if fmt == 'tsv' else ',', lineterminator='\n')
+    for row in rows:
+        if keys is None:
+            keys, headers = resolve_columns(row, columns)
+            if fmt != 'jsonl':
+                writer.writerow(headers)
+        values = [row.get(k) if isinstance(row, dict) else row[k] for k in keys]
+        if fmt == 'jsonl':
+            out.write(json.dumps(dict(zip(headers, values)), ensure_ascii=False, default=_json_default) + "\n")
+        else:
+            writer.writerow(['' if v is None else v for v in values])
+        count += 1
+    return count
+
+def connect(args):
+    """按命令行参数连接数据库，失败返回 None"""
+    from database.db_manager import DatabaseManager
+
+    db = DatabaseManager()
+    db.set_config(args.host, args.port, args.user, args.password, args.database)
+    if not db.connect():
+        print("数据库连接失败", file=sys.stderr)
+        return None
+    return db
+
+def run_report(db, source, args):
+    """运行一个报表（或导出），返回退出码"""
+    spec = EXPORT_SOURCES[source]
+    rows = spec['loader'](db, args.batch_size)
+    rows = filter_rows(rows, args.dept, args.semester, args.sno, args.min_gpa, args.limit)
+
+    def progress(written):
+        if args.progress:
+            print(f"已导出 {written} 行", file=sys.stderr)
+
+    if args.split_by_dept:
+        fmt = args.format if args.format in FORMATS.values() else 'csv'
+        if fmt != args.format:
+            print(f"--split-by-dept 不支持 {args.format} 格式，改为写出 csv", file=sys.stderr)
+        result = export_partitioned(rows, args.split_by_dept, source,
+                                    lambda row: row[_find_key(row, DEPT_KEYS, '--split-by-dept')],
+                                    spec['columns'], fmt, args.batch_size, progress)
+        for dept, path in sorted(result['files'].items(), key=lambda item: str(item[0])):
+            print(f"{dept}: {path}", file=sys.stderr)
+        count = result['rows']
+    elif args.output:
+        result = export_rows(rows, args.output, spec['columns'], None, args.batch_size, progress)
+        print(f"{spec['label']}：共 {result['rows']} 行，已写入 {result['path']}", file=sys.stderr)
+        count = result['rows']
+    else:
+        count = write_stdout(rows, spec['columns'], args.format)
+
+    if getattr(args, 'fail_on_warnings', False) and count > 0:
+        return 1
+    return 0
+
+def run_import(db, args):
+    """批量导入，返回退出码"""
+    from database.bulk_import import BulkImporter
+
+    def progress(processed, imported, rejected):
+        if args.progress:
+            print(f"已处理 {processed} 行，导入 {imported} 行，拒绝 {rejected} 行", file=sys.stderr)
+
+    importer = BulkImporter(db, args.kind, chunk_size=args.chunk_size, progress_callback=progress)
+    result = importer.run(args.file, args.reject_file)
+    print(f"导入完成：共 {result['processed']} 行，成功 {result['imported']} 行，拒绝 {result['rejected']} 行")
+    if result['reject_file']:
+        print(f"拒绝明细已写入: {result['reject_file']}")
+    return 0 if result['rejected'] == 0 else 1
+
+def add_report_arguments(parser, output_option=True):
+    """报表/导出共用的筛选与输出参数"""
+    parser.add_argument('--dept', action='append', help="只输出该院系（可重复指定）")
+    parser.add_argument('--semester', help="只输出该学期")
+    parser.add_argument('--sno', help="只输出该学号")
+    parser.add_argument('--min-gpa', type=float, help="只输出平均绩点不低于该值的学生")
+    parser.add_argument('--limit', type=int, help="最多输出的行数")
+    if output_option:
+        parser.add_argument('-o', '--output', help="输出文件，格式由扩展名决定（.csv / .xlsx / .parquet）")
+    parser.add_argument('--split-by-dept', metavar='DIR', help="一次查询，按院系分别写入 DIR 下的文件")
+    parser.add_argument('--format', default='tsv', choices=STDOUT_FORMATS + ('xlsx', 'parquet'),
+                        help="输出到终端时的格式（tsv / csv / jsonl），或 --split-by-dept 的文件格式")
+    parser.add_argument('--batch-size', type=int, default=5000, help="每批读取和写出的行数")
+    parser.add_argument('--progress', action='store_true', help="在标准错误输出打印进度")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="大学生学业预警与成绩分析系统 - 命令行批处理")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default=os.environ.get('AWS_DB_PASSWORD', ''))
+    parser.add_argument('--database', default='AcademicWarningSystem')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name, (source, label) in REPORT_COMMANDS.items():
+        sub = commands.add_parser(name, help=label)
+        add_report_arguments(sub)
+        if name == 'warnings':
+            sub.add_argument('--fail-on-warnings', action='store_true', help="存在预警学生时退出码为 1")
+
+    sub = commands.add_parser('report', help="任意报表")
+    sub.add_argument('source', choices=sorted(EXPORT_SOURCES))
+    add_report_arguments(sub)
+
+    sub = commands.add_parser('export', help="流式导出到文件")
+    sub.add_argument('source', choices=sorted(EXPORT_SOURCES))
+    sub.add_argument('output', help="输出文件（.csv / .xlsx / .parquet）")
+    add_report_arguments(sub, output_option=False)
+
+    sub = commands.add_parser('import', help="批量导入 CSV / XLSX")
+    sub.add_argument('kind', choices=('courses', 'scores', 'students'))
+    sub.add_argument('file')
+    sub.add_argument('--chunk-size', type=int, default=5000, help="每批提交的行数")
+    sub.add_argument('--reject-file', default=None, help="拒绝文件路径（默认与输入文件同名 .rejects.csv）")
+    sub.add_argument('--progress', action='store_true', help="在标准错误输出打印进度")
+    return parser
+
+def main(argv=None):
+    """命令行入口"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command != 'import':
+        if args.output and args.split_by_dept:
+            parser.error("--output 与 --split-by-dept 不能同时使用")
+        if not args.output and not args.split_by_dept and args.format not in STDOUT_FORMATS:
+            parser.error(f"{args.format} 格式需要用 --output 或 --split-by-dept 指定输出位置")
+        if args.output:
+            try:
+                format_for_path(args.output)
+            except ValueError as e:
+                parser.error(str(e))
+        if args.batch_size <= 0:
+            parser.error("--batch-size 必须是正整数")
+
+    db = connect(args)
+    if db is None:
+        return 2
+    try:
+        if args.command == 'import':
+            return run_import(db, args)
+        source = REPORT_COMMANDS[args.command][0] if args.command in REPORT_COMMANDS else args.source
+        return run_report(db, source, args)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # 输出被 head 等截断
+        return 0
+    finally:
+        db.disconnect()
+
+if __name__ == "__main__":
+    sys.exit(main())
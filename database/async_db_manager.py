@@ -0,0 +1,638 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+异步数据库管理模块
+方法名、参数和返回值与 DatabaseManager 相同，但都是协程，基于 aiomysql 连接池；
+一个事件循环中可以同时发出数百个查询，超过 pool_size 的查询排队等待空闲连接。
+
+    db = AsyncDatabaseManager(pool_size=20)
+    db.set_config('localhost', 3306, 'root', '123456', 'AcademicWarningSystem')
+    if await db.connect():
+        warnings, ranking = await asyncio.gather(db.get_warning_list(), db.get_student_gpa_view())
+        await db.disconnect()
+
+SQL 语句与 DatabaseManager 共用（见 db_manager 中的“共用 SQL”）。
+与同步版的区别：不缓存统计查询结果，没有 dimensions 维度缓存，
+不负责建库和执行 SQL 脚本（仍用 DatabaseManager.initialize_database）。
+"""
+
+from database.db_manager import (
+    ALL_SCORES_SQL, CHANGES_SINCE_SQL, ESTIMATE_ROW_COUNT_SQL, FAILED_CORE_COURSES_BY_STUDENT_SQL,
+    FAILED_CORE_COURSES_SQL, FAILED_COURSES_BY_STUDENT_SQL, FAILED_COURSES_COUNT_SQL, FAILED_COURSES_SQL,
+    SCORE_KEY_SQL, SCORES_AFTER_KEY_SQL, SCORES_FIRST_KEY_SQL, SCORES_RANGE_SQL, SEMESTER_STATISTICS_SQL,
+    STUDENT_KEY_SQL, STUDENT_SCORES_SQL, STUDENTS_AFTER_KEY_SQL, STUDENTS_FIRST_KEY_SQL, STUDENTS_RANGE_KEY_SQL,
+    VERIFY_AGGREGATE_SQL, credits_completed_sql, department_statistics_sql, failed_courses_page_sql,
+    page_result, scores_for_sql, student_gpa_view_sql, students_with_gpa_for_sql, students_with_gpa_sql,
+)
+from database.grading import DEFAULT_SCALE, GradeScale
+
+# aiomysql 是可选依赖，第一次连接时才导入；导入之前 Error 是一个不会被抛出的占位类型
+class Error(Exception):
+    """aiomysql 导入前的占位异常类型"""
+
+aiomysql = None
+
+def _load_driver():
+    """导入 aiomysql（只在第一次调用时导入）"""
+    global aiomysql, Error
+    if aiomysql is not None:
+        return
+    try:
+        import aiomysql as driver
+    except ImportError:
+        raise ImportError("异步数据库访问需要安装 aiomysql：pip install aiomysql")
+    aiomysql = driver
+    Error = driver.Error
+
+class AsyncDatabaseManager:
+    """异步数据库管理器
+    
+    每个查询从连接池借出一个连接，执行完立即归还，因此并发的协程互不等待游标；
+    连接池开启 autocommit，每次查询都能看到其他连接已提交的数据。
+    
+    流式方法（iter_*）是异步生成器，用 async for 读取；提前停止时请用
+    contextlib.aclosing 包裹，使连接及时归还连接池。
+    """
+    
+    def __init__(self, pool_size=10, use_aggregate=False):
+        self.pool = None
+        self.pool_size = pool_size
+        self.use_aggregate = use_aggregate
+        self._grade_scale = None
+        # 写入成功后的变更回调，见 add_change_listener
+        self._change_listeners = []
+        self.config = {
+            'host': 'localhost',
+            'port': 3306,
+            'user': 'root',
+            'password': '',
+            'database': 'AcademicWarningSystem',
+            'charset': 'utf8mb4'
+        }
+    
+    def set_config(self, host, port, user, password, database, pool_size=None):
+        """设置数据库连接配置"""
+        self.config['host'] = host
+        self.config['port'] = port
+        self.config['user'] = user
+        self.config['password'] = password
+        self.config['database'] = database
+        if pool_size is not None:
+            self.pool_size = pool_size
+    
+    async def connect(self):
+        """创建连接池（数据库需已存在）"""
+        _load_driver()
+        if self.pool is not None:
+            await self.disconnect()
+        config = dict(self.config)
+        config['db'] = config.pop('database')
+        try:
+            self.pool = await aiomysql.create_pool(
+                minsize=1,
+                maxsize=max(1, self.pool_size),
+                autocommit=True,
+                cursorclass=aiomysql.DictCursor,
+                **config
+            )
+        except Error as e:
+            print(f"数据库连接错误: {e}")
+            self.pool = None
+            return False
+        self._grade_scale = None
+        return True
+    
+    async def disconnect(self):
+        """关闭连接池（等待借出的连接归还）"""
+        pool = self.pool
+        self.pool = None
+        self._grade_scale = None
+        if pool is not None:
+            pool.close()
+            await pool.wait_closed()
+    
+    async def execute_query(self, query, params=None, raise_errors=False):
+        """执行查询（SELECT），出错时默认打印并返回 []；raise_errors=True 时抛出异常"""
+        if self.pool is None:
+            return []
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(query, params or None)
+                    return list(await cursor.fetchall())
+        except Error as e:
+            print(f"查询错误: {e}")
+            if raise_errors:
+                raise
+            return []
+    
+    async def execute_update(self, query, params=None):
+        """执行更新（INSERT, UPDATE, DELETE）"""
+        return await self._execute_write(query, params) is not None
+    
+    async def _execute_write(self, query, params=None):
+        """执行更新，返回受影响的行数，失败返回 None（没有影响到行时不发变更通知，与同步版相同）"""
+        if self.pool is None:
+            return None
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    try:
+                        await connection.begin()
+                        await cursor.execute(query, params or None)
+                        await connection.commit()
+                        return max(cursor.rowcount, 0)
+                    except Error:
+                        await connection.rollback()
+                        raise
+        except Error as e:
+            print(f"更新错误: {e}")
+            return None
+    
+    async def call_procedure(self, procedure_name, params=None, raise_errors=False):
+        """调用存储过程，返回其所有结果集中的行；raise_errors=True 时出错抛出异常"""
+        if self.pool is None:
+            return []
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.callproc(procedure_name, params or ())
+                    results = []
+                    while True:
+                        # 最后一个结果集是 CALL 的执行状态，没有列
+                        if cursor.description:
+                            results.extend(await cursor.fetchall())
+                        if not await cursor.nextset():
+                            break
+                    return results
+        except Error as e:
+            print(f"调用存储过程错误: {e}")
+            if raise_errors:
+                raise
+            return []
+    
+    # ========== 变更通知 ==========
+    def add_change_listener(self, callback):
+        """注册写入成功后的回调 callback(change)，change 的格式与 DatabaseManager 相同
+        
+        回调在事件循环中同步调用，不能阻塞。
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change(self, table, action, key, values=None):
+        change = {'table': table, 'action': action, 'key': key, 'values': values}
+        for callback in list(self._change_listeners):
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"变更回调出错: {e}")
+    
+    # ========== 变更日志（其他客户端的写入） ==========
+    async def get_changes_since(self, seq, limit=500):
+        """变更日志中序号大于 seq 的记录，按序号排序，最多 limit 条"""
+        return await self.execute_query(CHANGES_SINCE_SQL, (seq, limit))
+    
+    async def get_change_log_bounds(self):
+        """变更日志当前的 (最小序号, 最大序号)，日志为空时为 (None, None)，查询失败返回 None"""
+        rows = await self.execute_query("SELECT MIN(Seq) AS min_seq, MAX(Seq) AS max_seq FROM ChangeLog")
+        if not rows:
+            return None
+        return rows[0]['min_seq'], rows[0]['max_seq']
+    
+    async def compact_change_log(self, keep_seconds=3600, limit=10000):
+        """删除 keep_seconds 秒之前的变更记录（保留最新一条）"""
+        return await self.execute_update("CALL usp_CompactChangeLog(%s, %s)", (keep_seconds, limit))
+    
+    async def log_bulk_change(self, table):
+        """批量写入（关闭了逐行记录）后记一条 reload 变更，其他客户端收到后整表刷新"""
+        if not await self.execute_update("CALL usp_LogChange(%s, 'reload', NULL)", (table,)):
+            return False
+        self._notify_change(table, 'reload', None)
+        return True
+    
+    # ========== 流式查询 ==========
+    async def iter_query(self, query, params=None, batch_size=1000, raise_errors=False):
+        """流式执行查询（SELECT），逐行产出字典
+        
+        使用未缓冲游标按 batch_size 批量读取，读完（或生成器关闭）后连接归还连接池。
+        出错时默认打印并结束迭代；raise_errors=True 时抛出异常。
+        """
+        if self.pool is None:
+            return
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+                    await cursor.execute(query, params or None)
+                    while True:
+                        rows = await cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield row
+        except Error as e:
+            print(f"流式查询错误: {e}")
+            if raise_errors:
+                raise
+    
+    async def iter_procedure(self, procedure_name, batch_size=1000, raise_errors=False):
+        """流式调用（无参数）存储过程，逐行产出其所有结果集中的行"""
+        if self.pool is None:
+            return
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+                    await cursor.execute(f"CALL {procedure_name}()")
+                    while True:
+                        while cursor.description:
+                            rows = await cursor.fetchmany(batch_size)
+                            if not rows:
+                                break
+                            for row in rows:
+                                yield row
+                        if not await cursor.nextset():
+                            break
+        except Error as e:
+            print(f"流式调用存储过程错误: {e}")
+            if raise_errors:
+                raise
+    
+    # ========== 学生管理 ==========
+    async def get_all_students(self):
+        """获取所有学生（基础信息）"""
+        query = "SELECT * FROM Student ORDER BY SNo"
+        return await self.execute_query(query)
+    
+    async def get_all_students_with_gpa(self):
+        """获取所有学生（包含GPA和学分，通过视图或汇总表计算）"""
+        return await self.execute_query(students_with_gpa_sql(self.use_aggregate))
+    
+    def iter_all_students_with_gpa(self, batch_size=1000, raise_errors=False):
+        """流式获取所有学生（包含GPA和学分）"""
+        return self.iter_query(students_with_gpa_sql(self.use_aggregate), batch_size=batch_size, raise_errors=raise_errors)
+    
+    async def count_students(self):
+        """学生总数"""
+        rows = await self.execute_query("SELECT COUNT(*) AS total FROM Student")
+        return rows[0]['total'] if rows else 0
+    
+    async def get_students_with_gpa_range(self, offset, limit):
+        """按学号顺序获取一段学生（包含GPA和学分）"""
+        return await self._get_students_with_gpa_for(STUDENTS_RANGE_KEY_SQL, (limit, offset))
+    
+    async def _get_students_with_gpa_for(self, key_query, params):
+        """获取 key_query 选出的学生（包含GPA和学分）"""
+        return await self.execute_query(students_with_gpa_for_sql(key_query, self.use_aggregate), params)
+    
+    async def add_student(self, sno, sname, dept, year):
+        """添加学生"""
+        query = "INSERT INTO Student (SNo, SName, Dept, EnrollmentYear) VALUES (%s, %s, %s, %s)"
+        if not await self.execute_update(query, (sno, sname, dept, year)):
+            return False
+        self._notify_change('Student', 'insert', sno)
+        return True
+    
+    async def update_student(self, sno, sname, dept, year):
+        """更新学生信息"""
+        query = "UPDATE Student SET SName=%s, Dept=%s, EnrollmentYear=%s WHERE SNo=%s"
+        affected = await self._execute_write(query, (sname, dept, year, sno))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Student', 'update', sno)
+        return True
+    
+    async def delete_student(self, sno):
+        """删除学生（级联删除成绩）"""
+        query = "DELETE FROM Student WHERE SNo=%s"
+        affected = await self._execute_write(query, (sno,))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Student', 'delete', sno)
+        return True
+    
+    # ========== 课程管理 ==========
+    async def get_all_courses(self):
+        """获取所有课程"""
+        query = "SELECT * FROM Course ORDER BY CNo"
+        return await self.execute_query(query)
+    
+    async def add_course(self, cno, cname, credit, course_type):
+        """添加课程"""
+        query = "INSERT INTO Course (CNo, CName, Credit, CourseType) VALUES (%s, %s, %s, %s)"
+        if not await self.execute_update(query, (cno, cname, credit, course_type)):
+            return False
+        self._notify_change('Course', 'insert', cno, {'CNo': cno, 'CName': cname, 'Credit': credit, 'CourseType': course_type})
+        return True
+    
+    async def update_course(self, cno, cname, credit, course_type):
+        """更新课程"""
+        query = "UPDATE Course SET CName=%s, Credit=%s, CourseType=%s WHERE CNo=%s"
+        affected = await self._execute_write(query, (cname, credit, course_type, cno))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Course', 'update', cno, {'CNo': cno, 'CName': cname, 'Credit': credit, 'CourseType': course_type})
+        return True
+    
+    async def delete_course(self, cno):
+        """删除课程"""
+        query = "DELETE FROM Course WHERE CNo=%s"
+        affected = await self._execute_write(query, (cno,))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Course', 'delete', cno)
+        return True
+    
+    # ========== 成绩管理 ==========
+    async def get_grade_scale(self):
+        """成绩等级表（GradeScale），每次连接只读取一次
+        
+        未连接、表不存在或为空时返回默认分数线
+        """
+        scale = self._grade_scale
+        if scale is None:
+            rows = await self.execute_query("SELECT MinScore, GradePoint, IsPassed FROM GradeScale ORDER BY MinScore")
+            scale = GradeScale.from_rows(rows) if rows else DEFAULT_SCALE
+            if rows:
+                self._grade_scale = scale
+        return scale
+    
+    def reload_grade_scale(self):
+        """修改 GradeScale 后调用：丢弃缓存的分数线"""
+        self._grade_scale = None
+    
+    async def calculate_gpa(self, score_value):
+        """计算绩点（Python端计算，与数据库函数fn_CalculateGPA一致）"""
+        return (await self.get_grade_scale()).grade_point(score_value)
+    
+    async def derive_grades(self, score_values):
+        """批量计算一整列成绩的绩点和是否通过，返回 (绩点列表, 是否通过列表)"""
+        return (await self.get_grade_scale()).derive(score_values)
+    
+    async def get_all_scores(self):
+        """获取所有成绩（不包含冗余字段）"""
+        return await self.execute_query(ALL_SCORES_SQL)
+    
+    def iter_all_scores(self, batch_size=1000, raise_errors=False):
+        """流式获取所有成绩（内存占用与总行数无关）"""
+        return self.iter_query(ALL_SCORES_SQL, batch_size=batch_size, raise_errors=raise_errors)
+    
+    async def count_scores(self):
+        """成绩总数"""
+        rows = await self.execute_query("SELECT COUNT(*) AS total FROM Score")
+        return rows[0]['total'] if rows else 0
+    
+    async def get_scores_range(self, offset, limit):
+        """按主键顺序 (SNo, CNo, Semester) 获取一段成绩"""
+        return await self.execute_query(SCORES_RANGE_SQL, (limit, offset))
+    
+    async def get_student_scores(self, sno):
+        """获取指定学生的成绩（不包含冗余字段）"""
+        return await self.execute_query(STUDENT_SCORES_SQL, (sno,))
+    
+    async def add_score(self, sno, cno, score_value, semester):
+        """添加成绩（触发器会自动计算GPA和是否通过）"""
+        query = "INSERT INTO Score (SNo, CNo, ScoreValue, Semester) VALUES (%s, %s, %s, %s)"
+        if not await self.execute_update(query, (sno, cno, score_value, semester)):
+            return False
+        self._notify_change('Score', 'insert', (sno, cno, semester))
+        return True
+    
+    async def update_score(self, sno, cno, semester, score_value):
+        """更新成绩"""
+        query = "UPDATE Score SET ScoreValue=%s WHERE SNo=%s AND CNo=%s AND Semester=%s"
+        affected = await self._execute_write(query, (score_value, sno, cno, semester))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Score', 'update', (sno, cno, semester))
+        return True
+    
+    async def delete_score(self, sno, cno, semester):
+        """删除成绩"""
+        query = "DELETE FROM Score WHERE SNo=%s AND CNo=%s AND Semester=%s"
+        affected = await self._execute_write(query, (sno, cno, semester))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Score', 'delete', (sno, cno, semester))
+        return True
+    
+    # ========== 查询功能 ==========
+    async def get_warning_list(self):
+        """获取预警学生名单"""
+        return await self.call_procedure('usp_GenerateWarningList')
+    
+    def iter_warning_list(self, batch_size=1000, raise_errors=False):
+        """流式获取预警学生名单"""
+        return self.iter_procedure('usp_GenerateWarningList', batch_size=batch_size, raise_errors=raise_errors)
+    
+    async def get_failed_core_courses(self, sno=None):
+        """获取核心课程不及格"""
+        if sno:
+            return await self.execute_query(FAILED_CORE_COURSES_BY_STUDENT_SQL, (sno,))
+        else:
+            return await self.execute_query(FAILED_CORE_COURSES_SQL)
+    
+    def iter_failed_core_courses(self, batch_size=1000, raise_errors=False):
+        """流式获取所有核心课程不及格记录"""
+        return self.iter_query(FAILED_CORE_COURSES_SQL, batch_size=batch_size, raise_errors=raise_errors)
+    
+    async def get_student_gpa_view(self):
+        """获取学生GPA视图"""
+        return await self.execute_query(student_gpa_view_sql(self.use_aggregate))
+    
+    def iter_student_gpa_view(self, batch_size=1000, raise_errors=False):
+        """流式获取学生GPA排名"""
+        return self.iter_query(student_gpa_view_sql(self.use_aggregate), batch_size=batch_size, raise_errors=raise_errors)
+    
+    async def get_credits_completed(self):
+        """获取学分完成情况"""
+        return await self.execute_query(credits_completed_sql(self.use_aggregate))
+    
+    def iter_credits_completed(self, batch_size=1000, raise_errors=False):
+        """流式获取学分完成情况"""
+        return self.iter_query(credits_completed_sql(self.use_aggregate), batch_size=batch_size, raise_errors=raise_errors)
+    
+    async def get_department_statistics(self):
+        """获取各院系统计"""
+        return await self.execute_query(department_statistics_sql(self.use_aggregate))
+    
+    async def get_semester_statistics(self):
+        """获取学期统计"""
+        return await self.execute_query(SEMESTER_STATISTICS_SQL)
+    
+    # ========== 毕业要求管理 ==========
+    async def get_graduation_requirements(self):
+        """获取毕业要求"""
+        query = "SELECT * FROM GraduationRequirement ORDER BY Dept"
+        return await self.execute_query(query)
+    
+    async def add_graduation_requirement(self, dept, total_credit, fail_limit, min_gpa):
+        """添加毕业要求"""
+        query = "INSERT INTO GraduationRequirement (Dept, TotalCreditRequired, CoreCourseFailLimit, MinGPA) VALUES (%s, %s, %s, %s)"
+        if not await self.execute_update(query, (dept, total_credit, fail_limit, min_gpa)):
+            return False
+        self._notify_change('GraduationRequirement', 'insert', dept)
+        return True
+    
+    async def update_graduation_requirement(self, dept, total_credit, fail_limit, min_gpa):
+        """更新毕业要求"""
+        query = "UPDATE GraduationRequirement SET TotalCreditRequired=%s, CoreCourseFailLimit=%s, MinGPA=%s WHERE Dept=%s"
+        affected = await self._execute_write(query, (total_credit, fail_limit, min_gpa, dept))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('GraduationRequirement', 'update', dept)
+        return True
+    
+    async def delete_graduation_requirement(self, dept):
+        """删除毕业要求"""
+        query = "DELETE FROM GraduationRequirement WHERE Dept=%s"
+        affected = await self._execute_write(query, (dept,))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('GraduationRequirement', 'delete', dept)
+        return True
+    
+    # ========== 核心课程管理 ==========
+    async def get_core_courses(self, dept=None):
+        """获取核心课程"""
+        if dept:
+            query = "SELECT * FROM CoreCourse WHERE Dept = %s"
+            return await self.execute_query(query, (dept,))
+        else:
+            query = "SELECT * FROM CoreCourse ORDER BY Dept, CNo"
+            return await self.execute_query(query)
+    
+    async def add_core_course(self, dept, cno):
+        """添加核心课程"""
+        query = "INSERT INTO CoreCourse (Dept, CNo) VALUES (%s, %s)"
+        if not await self.execute_update(query, (dept, cno)):
+            return False
+        self._notify_change('CoreCourse', 'insert', (dept, cno))
+        return True
+    
+    async def delete_core_course(self, dept, cno):
+        """删除核心课程"""
+        query = "DELETE FROM CoreCourse WHERE Dept=%s AND CNo=%s"
+        affected = await self._execute_write(query, (dept, cno))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('CoreCourse', 'delete', (dept, cno))
+        return True
+    
+    # ========== 未通过课程查询 ==========
+    async def get_failed_courses(self, sno=None):
+        """获取未通过课程（所有课程，不仅仅是核心课程）"""
+        if sno:
+            return await self.execute_query(FAILED_COURSES_BY_STUDENT_SQL, (sno,))
+        else:
+            return await self.execute_query(FAILED_COURSES_SQL)
+    
+    def iter_failed_courses(self, sno=None, batch_size=1000, raise_errors=False):
+        """流式获取未通过课程"""
+        if sno:
+            return self.iter_query(FAILED_COURSES_BY_STUDENT_SQL, (sno,), batch_size, raise_errors)
+        return self.iter_query(FAILED_COURSES_SQL, batch_size=batch_size, raise_errors=raise_errors)
+    
+    # ========== 分页查询（键集分页，返回格式与 DatabaseManager 相同） ==========
+    async def _get_scores_for(self, key_query, params):
+        """获取 key_query 选出的成绩（含学生姓名、课程名、绩点），按主键排序"""
+        return await self.execute_query(scores_for_sql(key_query), params)
+    
+    async def get_score(self, sno, cno, semester):
+        """获取单条成绩（列与 get_scores_page 相同），不存在时返回 None"""
+        rows = await self._get_scores_for(SCORE_KEY_SQL, (sno, cno, semester))
+        return rows[0] if rows else None
+    
+    async def get_scores_page(self, after=None, page_size=100, with_total=False):
+        """按 (SNo, CNo, Semester) 分页获取成绩，after 为上一页返回的 next_after"""
+        if after:
+            key_query = SCORES_AFTER_KEY_SQL
+            params = (after[0], after[1], after[2], page_size)
+        else:
+            key_query = SCORES_FIRST_KEY_SQL
+            params = (page_size,)
+        rows = await self._get_scores_for(key_query, params)
+        total = await self.estimate_row_count('Score') if with_total else None
+        return page_result(rows, page_size, ('SNo', 'CNo', 'Semester'), total)
+    
+    async def get_students_page(self, after=None, page_size=100, with_total=False):
+        """按学号分页获取学生（基础信息），after 为上一页最后一个学号"""
+        if after:
+            query = "SELECT * FROM Student WHERE SNo > %s ORDER BY SNo LIMIT %s"
+            params = (after, page_size)
+        else:
+            query = "SELECT * FROM Student ORDER BY SNo LIMIT %s"
+            params = (page_size,)
+        rows = await self.execute_query(query, params)
+        total = await self.estimate_row_count('Student') if with_total else None
+        return page_result(rows, page_size, ('SNo',), total)
+    
+    async def get_student_with_gpa(self, sno):
+        """获取单个学生（列与 get_students_with_gpa_page 相同），不存在时返回 None"""
+        rows = await self._get_students_with_gpa_for(STUDENT_KEY_SQL, (sno,))
+        return rows[0] if rows else None
+    
+    async def get_students_with_gpa_page(self, after=None, page_size=100, with_total=False):
+        """按学号分页获取学生（包含GPA和学分）"""
+        if after:
+            key_query = STUDENTS_AFTER_KEY_SQL
+            params = (after, page_size)
+        else:
+            key_query = STUDENTS_FIRST_KEY_SQL
+            params = (page_size,)
+        rows = await self._get_students_with_gpa_for(key_query, params)
+        total = await self.estimate_row_count('Student') if with_total else None
+        return page_result(rows, page_size, ('学号',), total)
+    
+    async def get_failed_courses_page(self, after=None, page_size=100, with_total=False):
+        """按 (学号, 课程号, 学期) 分页获取未通过课程，列与 FailedCoursesView 相同"""
+        if after:
+            key_filter = "WHERE (SC.SNo, SC.CNo, SC.Semester) > (%s, %s, %s)"
+            params = (after[0], after[1], after[2], page_size)
+        else:
+            key_filter = ""
+            params = (page_size,)
+        rows = await self.execute_query(failed_courses_page_sql(key_filter), params)
+        total = None
+        if with_total:
+            count_rows = await self.execute_query(FAILED_COURSES_COUNT_SQL)
+            total = count_rows[0]['total'] if count_rows else 0
+        return page_result(rows, page_size, ('学号', '课程号', '学期'), total)
+    
+    async def estimate_row_count(self, table):
+        """表行数估计（来自 information_schema 统计信息，不扫描表）"""
+        rows = await self.execute_query(ESTIMATE_ROW_COUNT_SQL, (table,))
+        return int(rows[0]['total'] or 0) if rows else 0
+    
+    # ========== 学生成绩汇总表 ==========
+    async def rebuild_student_aggregate(self):
+        """全量重建学生成绩汇总表"""
+        return await self.execute_update("CALL usp_RebuildStudentAggregate()")
+    
+    async def verify_student_aggregate(self):
+        """将汇总表与视图计算结果逐个学生比对，返回不一致的记录（空列表表示一致）
+        
+        未连接或查询失败时返回 None
+        """
+        if self.pool is None:
+            return None
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(VERIFY_AGGREGATE_SQL)
+                    return list(await cursor.fetchall())
+        except Error as e:
+            print(f"校验汇总表错误: {e}")
+            return None
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量导入模块
+从 CSV / XLSX 文件批量导入成绩、学生名册和课程表：
+按批校验、executemany 批量写入、INSERT ... ON DUPLICATE KEY UPDATE 保证重复导入幂等，
+每 chunk_size 行提交一次，不合格的行写入拒绝文件并注明原因。
+导入期间不逐行写变更日志，结束后记一条 reload，其他客户端据此整表刷新。
+
+命令行用法：
+    python -m database.bulk_import scores 成绩.csv --password 123456 --chunk-size 5000
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from mysql.connector import Error
+
+# 各类导入的定义：目标列、可识别的表头（中英文均可）、写入语句
+IMPORT_SPECS = {
+    'scores': {
+        'name': '成绩',
+        'table': 'Score',
+        'columns': ['SNo', 'CNo', 'ScoreValue', 'Semester'],
+        'headers': {'学号': 'SNo', '课程号': 'CNo', '成绩': 'ScoreValue', '学期': 'Semester'},
+        'sql': """
+            INSERT INTO Score (SNo, CNo, ScoreValue, Semester) VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE ScoreValue = VALUES(ScoreValue)
+        """,
+    },
+    'students': {
+        'name': '学生',
+        'table': 'Student',
+        'columns': ['SNo', 'SName', 'Dept', 'EnrollmentYear'],
+        'headers': {'学号': 'SNo', '姓名': 'SName', '院系': 'Dept', '入学年份': 'EnrollmentYear'},
+        'sql': """
+            INSERT INTO Student (SNo, SName, Dept, EnrollmentYear) VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE SName = VALUES(SName), Dept = VALUES(Dept), EnrollmentYear = VALUES(EnrollmentYear)
+        """,
+    },
+    'courses': {
+        'name': '课程',
+        'table': 'Course',
+        'columns': ['CNo', 'CName', 'Credit', 'CourseType'],
+        'headers': {'课程号': 'CNo', '课程名': 'CName', '学分': 'Credit', '课程类型': 'CourseType'},
+        'sql': """
+            INSERT INTO Course (CNo, CName, Credit, CourseType) VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE CName = VALUES(CName), Credit = VALUES(Credit), CourseType = VALUES(CourseType)
+        """,
+    },
+}
+
+COURSE_TYPES = ('核心', '通识', '选修')
+
+def read_rows(file_path):
+    """逐行读取 CSV/XLSX 文件，产出 (行号, 原始字典)；第一行为表头"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("读取 xlsx 文件需要安装 openpyxl：pip install openpyxl")
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else '' for h in next(rows, [])]
+            for line_no, values in enumerate(rows, start=2):
+                if values is None or all(v is None for v in values):
+                    continue
+                yield line_no, dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        # utf-8-sig 兼容 Excel 导出的带 BOM 的 CSV
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            for line_no, row in enumerate(reader, start=2):
+                if not any((v or '').strip() for v in row.values() if isinstance(v, str)):
+                    continue
+                yield line_no, row
+
+class BulkImporter:
+    """批量导入器
+
+    kind: 'scores' / 'students' / 'courses'
+    progress_callback(processed, imported, rejected) 每提交一批调用一次（在执行导入的线程中）
+    cancel_event: threading.Event，置位后在当前批次提交后停止
+    """
+
+    def __init__(self, db_manager, kind, chunk_size=5000, progress_callback=None, cancel_event=None):
+        if kind not in IMPORT_SPECS:
+            raise ValueError(f"不支持的导入类型: {kind}")
+        self.db_manager = db_manager
+        self.kind = kind
+        self.spec = IMPORT_SPECS[kind]
+        self.chunk_size = max(1, chunk_size)
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        # 已确认存在的学号/课程号，避免每批重复查询
+        self._known_students = set()
+        self._known_courses = set()
+
+    def run(self, file_path, reject_path=None):
+        """执行导入，返回统计结果字典"""
+        if reject_path is None:
+            reject_path = os.path.splitext(file_path)[0] + ".rejects.csv"
+
+        result = {'processed': 0, 'imported': 0, 'rejected': 0, 'reject_file': None, 'cancelled': False}
+        rejects = []
+        batch = []
+
+        for line_no, raw in read_rows(file_path):
+            batch.append((line_no, raw))
+            if len(batch) >= self.chunk_size:
+                self._process_batch(batch, result, rejects)
+                batch = []
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    result['cancelled'] = True
+                    break
+        if batch and not result['cancelled']:
+            self._process_batch(batch, result, rejects)
+        if result['imported']:
+            if self.kind != 'scores':
+                # 批量写入绕过了 add_student / add_course，维度缓存需要重新加载
+                self.db_manager.dimensions.invalidate()
+            self.db_manager.log_bulk_change(self.spec['table'])
+
+        if rejects:
+            self._write_rejects(reject_path, rejects)
+            result['reject_file'] = reject_path
+        return result
+
+    def _process_batch(self, batch, result, rejects):
+        """校验并写入一批数据，然后提交"""
+        valid = []
+        for line_no, raw in batch:
+            values, error = self._normalize(raw)
+            if error:
+                rejects.append((line_no, raw, error))
+            else:
+                valid.append((line_no, raw, values))
+
+        valid = self._check_references(valid, rejects)
+        result['imported'] += self._write(valid, rejects)
+        result['processed'] += len(batch)
+        result['rejected'] = len(rejects)
+        if self.progress_callback:
+            self.progress_callback(result['processed'], result['imported'], result['rejected'])
+
+    def _normalize(self, raw):
+        """把一行原始数据转换为目标列的值，返回 (值元组, 错误信息)"""
+        record = {}
+        for key, value in raw.items():
+            if key is None:
+                continue
+            column = self.spec['headers'].get(str(key).strip(), str(key).strip())
+            if isinstance(value, str):
+                value = value.strip()
+            elif isinstance(value, float) and value.is_integer() and column in ('SNo', 'CNo', 'Semester'):
+                # Excel 会把纯数字学号读成浮点数
+                value = int(value)
+            record[column] = value
+
+        missing = [c for c in self.spec['columns'] if record.get(c) in (None, '')]
+        if missing:
+            return None, f"缺少字段: {', '.join(missing)}"
+
+        try:
+            if self.kind == 'scores':
+                score = float(record['ScoreValue'])
+                if score < 0 or score > 100:
+                    return None, "成绩必须在0-100之间"
+                record['ScoreValue'] = score
+            elif self.kind == 'students':
+                record['EnrollmentYear'] = int(float(record['EnrollmentYear']))
+            elif self.kind == 'courses':
+                credit = float(record['Credit'])
+                if credit <= 0 or credit >= 100:
+                    return None, "学分必须大于0且小于100"
+                record['Credit'] = credit
+                if record['CourseType'] not in COURSE_TYPES:
+                    return None, f"课程类型必须是 {'/'.join(COURSE_TYPES)} 之一"
+        except (TypeError, ValueError):
+            return None, "数值字段格式错误"
+
+        values = []
+        for column in self.spec['columns']:
+            value = record[column]
+            values.append(str(value) if column in ('SNo', 'CNo', 'Semester', 'SName', 'Dept', 'CName') else value)
+        return tuple(values), None
+
+    def _check_references(self, valid, rejects):
+        """成绩导入：批量确认学号和课程号存在"""
+        if self.kind != 'scores' or not valid:
+            return valid
+
+        snos = {v[0] for _, _, v in valid} - self._known_students
+        cnos = {v[1] for _, _, v in valid} - self._known_courses
+        self._known_students |= self._existing_keys("Student", "SNo", snos)
+        self._known_courses |= self._existing_keys("Course", "CNo", cnos)
+
+        checked = []
+        for line_no, raw, values in valid:
+            if values[0] not in self._known_students:
+                rejects.append((line_no, raw, f"学号不存在: {values[0]}"))
+            elif values[1] not in self._known_courses:
+                rejects.append((line_no, raw, f"课程号不存在: {values[1]}"))
+            else:
+                checked.append((line_no, raw, values))
+        return checked
+
+    def _existing_keys(self, table, column, keys):
+        if not keys:
+            return set()
+        keys = list(keys)
+        placeholders = ", ".join(["%s"] * len(keys))
+        rows = self.db_manager.execute_query(
+            f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", tuple(keys))
+        return {row[column] for row in rows}
+
+    def _write(self, valid, rejects):
+        """executemany 写入并提交；整批失败时逐行重试以找出出错的行"""
+        if not valid:
+            return 0
+        sql = self.spec['sql']
+        with self.db_manager.session() as (connection, cursor):
+            cursor.execute("SET @SuppressChangeLog = 1")
+            try:
+                return self._write_rows(connection, cursor, sql, valid, rejects)
+            finally:
+                cursor.execute("SET @SuppressChangeLog = NULL")
+
+    def _write_rows(self, connection, cursor, sql, valid, rejects):
+        try:
+            cursor.executemany(sql, [v for _, _, v in valid])
+            connection.commit()
+            return len(valid)
+        except Error:
+            connection.rollback()
+
+        imported = 0
+        for line_no, raw, values in valid:
+            try:
+                cursor.execute(sql, values)
+                imported += 1
+            except Error as e:
+                rejects.append((line_no, raw, f"写入失败: {e}"))
+        connection.commit()
+        return imported
+
+    def _write_rejects(self, reject_path, rejects):
+        """写出拒绝文件：原始列 + 行号 + 原因"""
+        fieldnames = []
+        for _, raw, _ in rejects:
+            for key in raw.keys():
+                if key is not None and key not in fieldnames:
+                    fieldnames.append(key)
+        with open(reject_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['行号'] + fieldnames + ['错误原因'])
+            for line_no, raw, error in sorted(rejects, key=lambda r: r[0]):
+                writer.writerow([line_no] + [raw.get(k, '') for k in fieldnames] + [error])
+
+def main(argv=None):
+    """命令行入口"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="批量导入成绩/学生/课程（CSV 或 XLSX）")
+    parser.add_argument('kind', choices=sorted(IMPORT_SPECS), help="导入类型")
+    parser.add_argument('file', help="CSV 或 XLSX 文件")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default=os.environ.get('AWS_DB_PASSWORD', ''))
+    parser.add_argument('--database', default='AcademicWarningSystem')
+    parser.add_argument('--chunk-size', type=int, default=5000, help="每批提交的行数")
+    parser.add_argument('--reject-file', default=None, help="拒绝文件路径（默认与输入文件同名 .rejects.csv）")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager()
+    db.set_config(args.host, args.port, args.user, args.password, args.database)
+    if not db.connect():
+        print("数据库连接失败")
+        return 2
+
+    def progress(processed, imported, rejected):
+        print(f"已处理 {processed} 行，导入 {imported} 行，拒绝 {rejected} 行")
+
+    try:
+        importer = BulkImporter(db, args.kind, chunk_size=args.chunk_size, progress_callback=progress)
+        result = importer.run(args.file, args.reject_file)
+    finally:
+        db.disconnect()
+
+    print(f"导入完成：共 {result['processed']} 行，成功 {result['imported']} 行，拒绝 {result['rejected']} 行")
+    if result['reject_file']:
+        print(f"拒绝明细已写入: {result['reject_file']}")
+    return 0 if result['rejected'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+变更订阅
+定期读取 ChangeLog 中序号大于上次位置的记录，把其他客户端对学生、课程、成绩的
+增删改转换成与 DatabaseManager 变更通知相同格式的字典，界面只需局部更新这些行。
+
+本客户端自己的写入已经通过变更通知处理过，读到对应的日志记录时会跳过。
+
+Seq 是自增列，在插入时分配、提交时才可见：序号较小的事务可能晚于较大的序号提交。
+读到的序号不连续时记下空缺的序号，之后每次轮询重新读取这些位置补上迟到的记录；
+超过 gap_timeout 秒仍空缺（多为回滚的事务）时要求整表刷新，而不是静默跳过。
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+
+# 由触发器写入变更日志的表
+LOGGED_TABLES = ('Student', 'Course', 'Score')
+
+class ChangeFeed:
+    """变更日志的轮询读取器（poll 在后台线程中调用）
+
+    poll() 返回变更列表；返回 None 表示需要整表刷新：
+    未读的记录已被压缩删除，积压的变更超过 max_changes 条，
+    或空缺的序号超过 gap_timeout 秒仍未读到。
+    """
+
+    def __init__(self, db_manager, batch_size=500, max_changes=2000,
+                 keep_seconds=3600, compact_interval=300, gap_timeout=10.0):
+        self.db = db_manager
+        self.batch_size = batch_size
+        self.max_changes = max_changes
+        self.keep_seconds = keep_seconds
+        self.compact_interval = compact_interval
+        self.gap_timeout = gap_timeout
+        self.last_seq = None
+        # 小于 last_seq 但尚未读到的序号 -> 放弃等待的时间
+        self._missing = {}
+        # 开始时日志为空（压缩总会保留最新一条，因此只会是新库），之后读到的序号不必连续
+        self._started_empty = False
+        self._local = Counter()
+        self._lock = threading.Lock()
+        self._last_compact = 0.0
+        db_manager.add_change_listener(self._on_local_change)
+
+    def restart(self):
+        """下次 poll 时从日志的最新位置开始（连接数据库或整表刷新后调用）"""
+        with self._lock:
+            self.last_seq = None
+            self._missing.clear()
+            self._local.clear()
+
+    def _on_local_change(self, change):
+        if change['table'] in LOGGED_TABLES:
+            with self._lock:
+                self._local[(change['table'], change['action'], change['key'])] += 1
+
+    def _is_local(self, change):
+        """是否为本客户端已处理过的写入（是则消耗一次记录）"""
+        marker = (change['table'], change['action'], change['key'])
+        with self._lock:
+            if self._local[marker] <= 0:
+                return False
+            self._local[marker] -= 1
+            if not self._local[marker]:
+                del self._local[marker]
+            return True
+
+    def poll(self):
+        """读取新的变更并更新维度缓存"""
+        if not self.db.connection or not self.db.cursor:
+            return []
+        self._maybe_compact()
+        bounds = self.db.get_change_log_bounds()
+        if bounds is None:
+            return []
+        min_seq, max_seq = bounds
+        if self.last_seq is None:
+            self.last_seq = max_seq or 0
+            self._started_empty = max_seq is None
+            return []
+        changes = self._recheck_missing()
+        if changes is None:
+            return self._reset_to(max_seq)
+        if max_seq is None or max_seq <= self.last_seq:
+            return self._finish(changes)
+        # 未读的记录已被压缩删除
+        compacted = min_seq > self.last_seq + 1 and not self._started_empty
+        if compacted or max_seq - self.last_seq > self.max_changes:
+            return self._reset_to(max_seq)
+        # 新库的第一条记录之前没有需要等待的序号
+        check_gaps = not self._started_empty
+        self._started_empty = False
+
+        now = time.monotonic()
+        while True:
+            rows = self.db.get_changes_since(self.last_seq, self.batch_size)
+            for row in rows:
+                if check_gaps:
+                    if row['Seq'] - self.last_seq > self.max_changes:
+                        return self._reset_to(max_seq)
+                    for seq in range(self.last_seq + 1, row['Seq']):
+                        self._missing[seq] = now + self.gap_timeout
+                check_gaps = True
+                self.last_seq = row['Seq']
+                self._collect(row, changes)
+            if len(rows) < self.batch_size:
+                break
+        if len(self._missing) > self.max_changes:
+            return self._reset_to(self.last_seq)
+        return self._finish(changes)
+
+    def _reset_to(self, seq):
+        """放弃增量，从 seq 之后继续，返回 None 要求整表刷新"""
+        self.restart()
+        self.last_seq = seq or 0
+        return None
+
+    def _collect(self, row, changes):
+        change = self._to_change(row)
+        if not self._is_local(change):
+            changes.append(change)
+
+    def _recheck_missing(self):
+        """重新读取空缺的序号，返回迟到提交的变更；超时仍空缺时返回 None"""
+        changes = []
+        if not self._missing:
+            return changes
+        seq = min(self._missing) - 1
+        while seq < self.last_seq:
+            rows = self.db.get_changes_since(seq, self.batch_size)
+            for row in rows:
+                if row['Seq'] in self._missing:
+                    del self._missing[row['Seq']]
+                    self._collect(row, changes)
+            if len(rows) < self.batch_size:
+                break
+            seq = rows[-1]['Seq']
+        now = time.monotonic()
+        if any(deadline < now for deadline in self._missing.values()):
+            return None
+        return changes
+
+    def _finish(self, changes):
+        for change in changes:
+            self._apply_to_dimensions(change)
+        return changes
+
+    def _to_change(self, row):
+        key = row['KeyValue']
+        if key is not None:
+            key = json.loads(key)
+            key = key[0] if len(key) == 1 else tuple(key)
+        return {'table': row['TableName'], 'action': row['Operation'], 'key': key,
+                'values': None, 'seq': row['Seq']}
+
+    def _apply_to_dimensions(self, change):
+        """同步维度缓存；课程变更同时补上课程的新值（课程表格直接使用）"""
+        dimensions = self.db.dimensions
+        table, action = change['table'], change['action']
+        if action == 'reload':
+            if table != 'Score':
+                dimensions.invalidate()
+        elif table == 'Student':
+            if action == 'delete':
+                dimensions.student_deleted(change['key'])
+            else:
+                dimensions.reload_student(change['key'])
+        elif table == 'Course':
+            if action == 'delete':
+                dimensions.course_deleted(change['key'])
+            else:
+                change['values'] = dimensions.reload_course(change['key'])
+                if change['values'] is None:
+                    change['action'] = 'delete'
+
+    def _maybe_compact(self):
+        now = time.monotonic()
+        if now - self._last_compact < self.compact_interval:
+            return
+        self._last_compact = now
+        self.db.compact_change_log(self.keep_seconds)
@@ -5,17 +5,351 @@
 负责数据库连接、初始化、CRUD操作等
 """
 
-import mysql.connector
-from mysql.connector import Error
+import itertools
 import os
 import sys
+import threading
+from contextlib import contextmanager
+
+from database.dimension_cache import DimensionCache
+from database.grading import DEFAULT_SCALE, GRADE_SCALE_JOIN, GradeScale
+from database.query_cache import QueryCache, expand_tables
+from database.sql_splitter import iter_statements
+
+# mysql.connector 导入较慢，首次连接时才导入（见 _load_driver），界面可以先显示出来。
+# 导入之前不会有数据库操作，Error 先用一个不会被抛出的占位类型，使 except 子句仍然有效
+class Error(Exception):
+    """mysql.connector 导入前的占位异常类型"""
+
+mysql = None
+pooling = None
+
+# 连接的数据库不存在
+ER_BAD_DB_ERROR = 1049
+
+def _load_driver():
+    """导入 mysql.connector（只在第一次调用时导入）"""
+    global mysql, pooling, Error
+    if mysql is not None:
+        return
+    import mysql.connector
+    from mysql.connector import pooling as connector_pooling
+    pooling = connector_pooling
+    Error = mysql.connector.Error
+
+# 连接池名称需全局唯一，每次重建连接池时递增
+_pool_counter = itertools.count(1)
+
+# 成绩查询中通过 GradeScale 范围连接得到的绩点与是否通过，界面不再逐行计算
+SCORE_GRADE_COLUMNS = "GS.GradePoint AS GradePoint, GS.IsPassed AS IsPassed"
+
+# 全部成绩（get_all_scores / iter_all_scores 共用）
+ALL_SCORES_SQL = f"""
+    SELECT SC.SNo, SC.CNo, SC.ScoreValue, SC.Semester, S.SName, C.CName, C.Credit,
+           {SCORE_GRADE_COLUMNS}
+    FROM Score SC
+    INNER JOIN Student S ON SC.SNo = S.SNo
+    INNER JOIN Course C ON SC.CNo = C.CNo
+    {GRADE_SCALE_JOIN}
+    ORDER BY SC.SNo, SC.Semester
+"""
+
+# 全部核心课程不及格记录（get_failed_core_courses / iter_failed_core_courses 共用）
+FAILED_CORE_COURSES_SQL = "SELECT * FROM FailedCoreCoursesView ORDER BY 学号, 学期, 课程名"
+
+# 结果缓存的依赖表：其中任一表的 DataVersion 变化后缓存失效
+GPA_TABLES = ('Student', 'Score', 'Course', 'GradeScale', 'StudentAggregate')
+FAILED_TABLES = ('Score', 'Student', 'Course', 'GradeScale')
+WARNING_TABLES = GPA_TABLES + ('CoreCourse', 'GraduationRequirement')
+
+# 基于汇总表 StudentAggregate 的学生GPA数据源，列名与 StudentGPAView 一致
+STUDENT_AGGREGATE_GPA_SQL = """(
+    SELECT 
+        S.SNo AS 学号,
+        S.SName AS 姓名,
+        S.Dept AS 院系,
+        COALESCE(SA.EarnedCredit, 0) AS 已获学分,
+        CASE 
+            WHEN SA.EarnedCredit > 0 THEN ROUND(SA.WeightedGradePoints / SA.EarnedCredit, 2)
+            ELSE 0.00
+        END AS 平均绩点
+    FROM Student S
+    LEFT JOIN StudentAggregate SA ON S.SNo = SA.SNo
+)"""
+
+# ========== 共用 SQL ==========
+# DatabaseManager 与 AsyncDatabaseManager（database/async_db_manager.py）执行同样的语句，
+# 与 use_aggregate 有关的查询由下面的函数生成。
+
+def gpa_source(use_aggregate):
+    """学生GPA数据源：汇总表模式下为派生表，否则为 StudentGPAView"""
+    return STUDENT_AGGREGATE_GPA_SQL if use_aggregate else "StudentGPAView"
+
+def students_with_gpa_sql(use_aggregate):
+    """所有学生（包含GPA和学分）"""
+    return f"""
+        SELECT 
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            S.Dept AS 院系,
+            S.EnrollmentYear,
+            SG.已获学分,
+            SG.平均绩点
+        FROM Student S
+        LEFT JOIN {gpa_source(use_aggregate)} SG ON S.SNo = SG.学号
+        ORDER BY S.SNo
+    """
+
+def students_with_gpa_for_sql(key_query, use_aggregate):
+    """key_query 选出的学生（包含GPA和学分），只对这些学生聚合成绩"""
+    if use_aggregate:
+        return f"""
+            SELECT 
+                S.SNo AS 学号,
+                S.SName AS 姓名,
+                S.Dept AS 院系,
+                S.EnrollmentYear,
+                COALESCE(SA.EarnedCredit, 0) AS 已获学分,
+                CASE 
+                    WHEN SA.EarnedCredit > 0 THEN ROUND(SA.WeightedGradePoints / SA.EarnedCredit, 2)
+                    ELSE 0.00
+                END AS 平均绩点
+            FROM ({key_query}) K
+            INNER JOIN Student S ON S.SNo = K.SNo
+            LEFT JOIN StudentAggregate SA ON SA.SNo = S.SNo
+            ORDER BY S.SNo
+        """
+    # 与 StudentGPAView 的计算方式一致
+    return f"""
+        SELECT 
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            S.Dept AS 院系,
+            S.EnrollmentYear,
+            COALESCE(SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END), 0) AS 已获学分,
+            CASE 
+                WHEN SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END) > 0 
+                THEN ROUND(SUM(GS.GradePoint * C.Credit) / SUM(CASE WHEN GS.IsPassed = 1 THEN C.Credit ELSE 0 END), 2)
+                ELSE 0.00
+            END AS 平均绩点
+        FROM ({key_query}) K
+        INNER JOIN Student S ON S.SNo = K.SNo
+        LEFT JOIN Score SC ON S.SNo = SC.SNo
+        LEFT JOIN Course C ON SC.CNo = C.CNo
+        {GRADE_SCALE_JOIN}
+        GROUP BY S.SNo, S.SName, S.Dept, S.EnrollmentYear
+        ORDER BY S.SNo
+    """
+
+def student_gpa_view_sql(use_aggregate):
+    """学生GPA排名"""
+    return f"SELECT * FROM {gpa_source(use_aggregate)} SG ORDER BY 平均绩点 DESC"
+
+def credits_completed_sql(use_aggregate):
+    """学分完成情况"""
+    if use_aggregate:
+        return f"""
+            SELECT SG.学号, SG.姓名, SG.已获学分 AS 已获学分总数
+            FROM {gpa_source(use_aggregate)} SG
+            ORDER BY 已获学分总数 DESC
+        """
+    return "SELECT * FROM CreditsCompletedView ORDER BY 已获学分总数 DESC"
+
+def department_statistics_sql(use_aggregate):
+    """各院系统计"""
+    return f"""
+        SELECT 
+            SG.院系,
+            COUNT(*) AS 学生人数,
+            ROUND(AVG(SG.平均绩点), 2) AS 平均GPA,
+            ROUND(AVG(SG.已获学分), 2) AS 平均已获学分
+        FROM {gpa_source(use_aggregate)} SG
+        GROUP BY SG.院系
+        ORDER BY 平均GPA DESC
+    """
+
+def scores_for_sql(key_query):
+    """key_query 选出的成绩（含学生姓名、课程名、绩点），按主键排序"""
+    return f"""
+        SELECT SC.SNo, SC.CNo, SC.ScoreValue, SC.Semester, S.SName, C.CName, C.Credit,
+               {SCORE_GRADE_COLUMNS}
+        FROM ({key_query}) K
+        INNER JOIN Score SC ON SC.SNo = K.SNo AND SC.CNo = K.CNo AND SC.Semester = K.Semester
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN Course C ON SC.CNo = C.CNo
+        {GRADE_SCALE_JOIN}
+        ORDER BY SC.SNo, SC.CNo, SC.Semester
+    """
+
+def failed_courses_page_sql(key_filter):
+    """一页未通过课程，列与 FailedCoursesView 相同；key_filter 为空或按上一页最后一行定位的 WHERE"""
+    return f"""
+        SELECT 
+            S.SNo AS 学号,
+            S.SName AS 姓名,
+            S.Dept AS 院系,
+            C.CNo AS 课程号,
+            C.CName AS 课程名,
+            C.Credit AS 学分,
+            C.CourseType AS 课程类型,
+            SC.ScoreValue AS 成绩,
+            SC.Semester AS 学期
+        FROM Score SC
+        INNER JOIN Student S ON SC.SNo = S.SNo
+        INNER JOIN Course C ON SC.CNo = C.CNo
+        INNER JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore AND GS.IsPassed = 0
+        {key_filter}
+        ORDER BY SC.SNo, SC.CNo, SC.Semester
+        LIMIT %s
+    """
+
+# 分页加载一段成绩：先只在主键上定位本页，再连接学生和课程，跳过的行不做连接
+SCORES_RANGE_SQL = scores_for_sql("""
+    SELECT SNo, CNo, Semester FROM Score
+    ORDER BY SNo, CNo, Semester
+    LIMIT %s OFFSET %s
+""")
+
+SCORES_AFTER_KEY_SQL = """
+    SELECT SNo, CNo, Semester FROM Score
+    WHERE (SNo, CNo, Semester) > (%s, %s, %s)
+    ORDER BY SNo, CNo, Semester
+    LIMIT %s
+"""
+SCORES_FIRST_KEY_SQL = "SELECT SNo, CNo, Semester FROM Score ORDER BY SNo, CNo, Semester LIMIT %s"
+SCORE_KEY_SQL = "SELECT SNo, CNo, Semester FROM Score WHERE SNo = %s AND CNo = %s AND Semester = %s"
+
+STUDENTS_RANGE_KEY_SQL = "SELECT SNo FROM Student ORDER BY SNo LIMIT %s OFFSET %s"
+STUDENTS_AFTER_KEY_SQL = "SELECT SNo FROM Student WHERE SNo > %s ORDER BY SNo LIMIT %s"
+STUDENTS_FIRST_KEY_SQL = "SELECT SNo FROM Student ORDER BY SNo LIMIT %s"
+STUDENT_KEY_SQL = "SELECT SNo FROM Student WHERE SNo = %s"
+
+STUDENT_SCORES_SQL = """
+    SELECT SC.SNo, SC.CNo, SC.ScoreValue, SC.Semester, C.CName, C.Credit, C.CourseType
+    FROM Score SC
+    INNER JOIN Course C ON SC.CNo = C.CNo
+    WHERE SC.SNo = %s
+    ORDER BY SC.Semester, C.CName
+"""
+
+SEMESTER_STATISTICS_SQL = """
+    SELECT 
+        SC.Semester AS 学期,
+        COUNT(DISTINCT SC.SNo) AS 选课学生数,
+        COUNT(*) AS 总选课数,
+        COUNT(DISTINCT SC.CNo) AS 开设课程数,
+        ROUND(AVG(SC.ScoreValue), 2) AS 平均成绩
+    FROM Score SC
+    GROUP BY SC.Semester
+    ORDER BY SC.Semester
+"""
+
+FAILED_CORE_COURSES_BY_STUDENT_SQL = "SELECT * FROM FailedCoreCoursesView WHERE 学号 = %s ORDER BY 学期, 课程名"
+FAILED_COURSES_SQL = "SELECT * FROM FailedCoursesView ORDER BY 学号, 学期, 课程号"
+FAILED_COURSES_BY_STUDENT_SQL = "SELECT * FROM FailedCoursesView WHERE 学号 = %s ORDER BY 学期, 课程号"
+
+# 从不及格分数段出发，走 idx_score 索引的范围计数
+FAILED_COURSES_COUNT_SQL = """
+    SELECT COUNT(*) AS total
+    FROM GradeScale GS
+    INNER JOIN Score SC ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore
+    WHERE GS.IsPassed = 0
+"""
+
+# 表行数估计（来自 information_schema 统计信息，不扫描表）
+ESTIMATE_ROW_COUNT_SQL = """
+    SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+"""
+
+CHANGES_SINCE_SQL = """
+    SELECT Seq, TableName, Operation, KeyValue
+    FROM ChangeLog
+    WHERE Seq > %s
+    ORDER BY Seq
+    LIMIT %s
+"""
+
+# 汇总表与视图计算结果逐个学生比对
+VERIFY_AGGREGATE_SQL = """
+    SELECT 
+        G.学号,
+        G.已获学分 AS 视图已获学分,
+        CC.已获学分总数 AS 视图已获学分总数,
+        SA.EarnedCredit AS 汇总已获学分,
+        G.平均绩点 AS 视图平均绩点,
+        CASE 
+            WHEN SA.EarnedCredit > 0 THEN ROUND(SA.WeightedGradePoints / SA.EarnedCredit, 2)
+            ELSE 0.00
+        END AS 汇总平均绩点,
+        COALESCE(F.FailCount, 0) AS 视图核心课程不及格数,
+        SA.CoreFailCount AS 汇总核心课程不及格数
+    FROM StudentGPAView G
+    INNER JOIN CreditsCompletedView CC ON CC.学号 = G.学号
+    LEFT JOIN StudentAggregate SA ON SA.SNo = G.学号
+    LEFT JOIN (
+        SELECT 学号, COUNT(*) AS FailCount
+        FROM FailedCoreCoursesView
+        GROUP BY 学号
+    ) F ON F.学号 = G.学号
+    WHERE SA.SNo IS NULL
+       OR SA.EarnedCredit <> G.已获学分
+       OR SA.EarnedCredit <> CC.已获学分总数
+       OR G.平均绩点 <> CASE 
+              WHEN SA.EarnedCredit > 0 THEN ROUND(SA.WeightedGradePoints / SA.EarnedCredit, 2)
+              ELSE 0.00
+          END
+       OR SA.CoreFailCount <> COALESCE(F.FailCount, 0)
+    ORDER BY G.学号
+"""
+
+def page_result(rows, page_size, key_columns, total=None):
+    """组装分页结果"""
+    next_after = None
+    if rows and len(rows) >= page_size:
+        last = rows[-1]
+        if len(key_columns) == 1:
+            next_after = last[key_columns[0]]
+        else:
+            next_after = tuple(last[c] for c in key_columns)
+    result = {'rows': rows, 'next_after': next_after}
+    if total is not None:
+        result['total_estimate'] = total
+    return result
 
 class DatabaseManager:
-    """数据库管理器"""
+    """数据库管理器
+    
+    默认所有查询共用一个连接；pool_size > 0 时启用连接池模式：
+    主线程继续使用主连接，其他线程（后台任务）各自从连接池借出独立会话，
+    因此多个查询可以同时执行而不会争用同一个游标。
+    
+    use_aggregate=True 时，学生GPA/学分相关查询改为读取触发器维护的
+    StudentAggregate 汇总表，而不是每次通过视图重新聚合整个成绩表。
     
-    def __init__(self):
+    统计类查询（GPA视图、院系统计、预警名单等）的结果会被缓存，
+    通过 DataVersion 表中依赖表的版本号判断是否过期；cache_entries=0 时关闭缓存。
+    """
+    
+    def __init__(self, pool_size=0, use_aggregate=False, cache_entries=128, cache_bytes=64 * 1024 * 1024):
         self.connection = None
         self.cursor = None
+        self.pool = None
+        self.pool_size = pool_size
+        # 保护主连接/主游标，防止多个线程同时使用
+        self._lock = threading.RLock()
+        # 当前线程正在使用的会话 (connection, cursor)
+        self._local = threading.local()
+        self._pool_slots = None
+        self.use_aggregate = use_aggregate
+        self._grade_scale = None
+        self.query_cache = QueryCache(cache_entries, cache_bytes) if cache_entries > 0 else None
+        # 数据库中没有 DataVersion 表（旧版脚本建的库）时不使用缓存
+        self._versioned = True
+        # 学生/课程/院系的内存索引，由本类的增删改方法增量维护
+        self.dimensions = DimensionCache(self)
+        # 写入成功后的变更回调，见 add_change_listener
+        self._change_listeners = []
         self.config = {
             'host': 'localhost',
             'port': 3306,
@@ -25,123 +359,332 @@ class DatabaseManager:
             'charset': 'utf8mb4'
         }
     
-    def set_config(self, host, port, user, password, database):
+    def set_config(self, host, port, user, password, database, pool_size=None):
         """设置数据库连接配置"""
         self.config['host'] = host
         self.config['port'] = port
         self.config['user'] = user
         self.config['password'] = password
         self.config['database'] = database
+        if pool_size is not None:
+            self.pool_size = pool_size
     
     def connect(self):
-        """连接到数据库"""
+        """连接到数据库
+        
+        直接连接配置中的数据库，只有数据库不存在时才先连接服务器创建它，
+        正常启动时不再执行 SHOW DATABASES。
+        """
+        _load_driver()
         try:
-            # 先尝试连接（不指定数据库）
-            temp_config = self.config.copy()
-            database_name = temp_config.pop('database', None)
-            
-            # 连接到MySQL服务器
-            self.connection = mysql.connector.connect(**temp_config)
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor(dictionary=True)
-                
-                # 如果指定了数据库，检查是否存在，不存在则创建
-                if database_name:
-                    self.cursor.execute("SHOW DATABASES LIKE %s", (database_name,))
-                    if not self.cursor.fetchone():
-                        # 数据库不存在，创建它
-                        self.cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
-                        self.connection.commit()
-                    
-                    # 切换到指定数据库
-                    self.cursor.execute(f"USE `{database_name}`")
+            try:
+                connection = mysql.connector.connect(**self.config)
+            except Error as e:
+                if e.errno != ER_BAD_DB_ERROR or not self.config.get('database'):
+                    raise
+                connection = self._create_database_and_connect()
+            if connection.is_connected():
+                # 重新连接时关闭旧的主连接，否则每次重连都会多占用一个服务器连接
+                with self._lock:
+                    self._close_connection()
+                    self.connection = connection
+                    self.cursor = connection.cursor(dictionary=True)
                 
+                self._grade_scale = None
+                self._versioned = True
+                self.clear_query_cache()
+                self.dimensions.invalidate()
+                self.create_pool()
                 return True
         except Error as e:
             print(f"数据库连接错误: {e}")
             return False
         return False
     
+    def _create_database_and_connect(self):
+        """连接服务器，创建配置中的数据库并切换过去"""
+        temp_config = self.config.copy()
+        database_name = temp_config.pop('database')
+        connection = mysql.connector.connect(**temp_config)
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        connection.commit()
+        cursor.execute(f"USE `{database_name}`")
+        cursor.close()
+        return connection
+    
+    def create_pool(self):
+        """按 pool_size 创建连接池（pool_size <= 0 时不使用连接池）"""
+        self._close_pool()
+        if self.pool_size <= 0:
+            return False
+        try:
+            self.pool = pooling.MySQLConnectionPool(
+                pool_name=f"aws_pool_{next(_pool_counter)}",
+                pool_size=self.pool_size,
+                pool_reset_session=True,
+                **self.config
+            )
+            # 连接池耗尽时 get_connection 会直接报错，这里用信号量让借用方排队等待
+            self._pool_slots = threading.BoundedSemaphore(self.pool_size)
+            return True
+        except Error as e:
+            # 连接池创建失败时退回共享连接模式
+            print(f"创建连接池失败，使用单连接模式: {e}")
+            self.pool = None
+            return False
+    
+    def _close_pool(self):
+        """关闭连接池中的空闲连接并丢弃连接池
+        
+        连接池对象释放时不会关闭其中的连接，不显式关闭会一直占用到服务器超时；
+        此时仍被借出的连接在归还时回到已丢弃的旧连接池，随其一起释放。
+        """
+        pool = self.pool
+        self.pool = None
+        self._pool_slots = None
+        if pool is None:
+            return
+        # 逐个借出空闲连接并断开；不调用借出连接的 close()，那会把连接放回连接池。
+        # 连接池取空时 get_connection() 抛出 PoolError
+        for _ in range(pool.pool_size):
+            try:
+                pooled = pool.get_connection()
+            except Error:
+                break
+            try:
+                pooled.disconnect()
+            except Error as e:
+                print(f"关闭连接池错误: {e}")
+    
+    def _close_connection(self):
+        """关闭主连接及其游标"""
+        cursor, connection = self.cursor, self.connection
+        self.cursor = None
+        self.connection = None
+        try:
+            if cursor:
+                cursor.close()
+            if connection and connection.is_connected():
+                connection.close()
+        except Error as e:
+            print(f"关闭连接错误: {e}")
+    
     def disconnect(self):
         """断开数据库连接"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        self._close_pool()
+        self._grade_scale = None
+        self.clear_query_cache()
+        self.dimensions.invalidate()
+        with self._lock:
+            self._close_connection()
     
-    def execute_sql_file(self, file_path):
-        """执行SQL文件"""
+    @contextmanager
+    def session(self):
+        """获取当前线程的数据库会话，产出 (connection, cursor)
+        
+        - 同一线程内嵌套调用复用同一会话，可用于把多条语句放在同一连接上执行
+        - 连接池模式下，非主线程从连接池借出连接，最外层退出时归还
+        - 其他情况使用主连接，并用锁串行化访问；最外层退出时结束主连接上未结束的事务
+        
+        连接没有开启 autocommit（批量导入、执行脚本需要按批提交/回滚），InnoDB 的
+        REPEATABLE READ 下只读查询也会开启事务并一直沿用第一次读取时的快照，
+        看不到其他客户端之后提交的数据（DataVersion 版本号、变更日志都不会变化）。
+        池连接归还时由 pool_reset_session 重置，主连接则在这里回滚：
+        写操作都已自行提交，回滚只会结束只读事务（或丢弃出错后未提交的部分）。
+        """
+        current = getattr(self._local, 'session', None)
+        if current is not None:
+            yield current
+            return
+        
+        pool = self.pool
+        if pool is not None and threading.current_thread() is not threading.main_thread():
+            slots = self._pool_slots
+            slots.acquire()
+            try:
+                conn = pool.get_connection()
+                try:
+                    cursor = conn.cursor(dictionary=True)
+                    self._local.session = (conn, cursor)
+                    try:
+                        yield conn, cursor
+                    finally:
+                        self._local.session = None
+                        cursor.close()
+                finally:
+                    # 池连接的 close() 会把连接归还连接池
+                    conn.close()
+            finally:
+                slots.release()
+        else:
+            with self._lock:
+                connection = self.connection
+                self._local.session = (connection, self.cursor)
+                try:
+                    yield connection, self.cursor
+                finally:
+                    self._local.session = None
+                    self._end_read_transaction(connection)
+    
+    def _end_read_transaction(self, connection):
+        """结束连接上未提交的事务，下一次读取使用新的快照"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                sql_script = f.read()
-            
-            # 使用MySQL的multi_statement模式执行
-            # 先分割出完整的SQL语句
-            statements = []
-            current_statement = ""
-            in_delimiter_block = False
-            delimiter = ";"
-            
-            for line in sql_script.split('\n'):
-                original_line = line
-                line = line.strip()
-                
-                # 跳过空行和注释
-                if not line or line.startswith('--'):
-                    continue
+            if connection is not None and connection.in_transaction:
+                connection.rollback()
+        except Error as e:
+            print(f"结束事务错误: {e}")
+    
+    def execute_sql_file(self, file_path, batch_size=1000, disable_checks=False,
+                         progress_callback=None, resume=False, cancel_event=None):
+        """执行SQL文件
+        
+        逐行读取并切分语句（支持 DELIMITER 与引号内的分号），不会一次读入整个文件；
+        连续的 INSERT/UPDATE/DELETE 合并在同一事务中，每 batch_size 条提交一次。
+        
+        disable_checks: 执行 DML 时关闭外键与唯一性检查（仅用于可信的种子数据）
+        progress_callback(已执行语句数, 已读字节数, 文件总字节数): 每次提交后调用
+        resume: 从上次中断处继续——已提交的语句记录在 <file_path>.checkpoint 中，
+                文件内容变化后检查点自动失效
+        cancel_event: threading.Event，置位后提交已执行的语句并停止（保留检查点），返回 False
+        """
+        checkpoint_path = file_path + ".checkpoint"
+        total_bytes = os.path.getsize(file_path)
+        signature = f"{total_bytes}:{int(os.path.getmtime(file_path))}"
+        skip = self._read_sql_checkpoint(checkpoint_path, signature) if resume else 0
+        if skip:
+            print(f"从第 {skip + 1} 条语句继续执行 {file_path}")
+        
+        bytes_read = [0]
+        
+        def read_lines(f):
+            first = True
+            for raw in f:
+                bytes_read[0] += len(raw)
+                line = raw.decode('utf-8-sig' if first else 'utf-8')
+                first = False
+                yield line
+        
+        try:
+            with self.session() as (connection, cursor), open(file_path, 'rb') as f:
+                pending = 0
+                done = skip
+                checks_off = False
+                cancelled = False
                 
-                # 处理DELIMITER
-                if line.upper().startswith('DELIMITER'):
-                    if '$$' in line:
-                        delimiter = "$$"
-                        in_delimiter_block = True
-                    else:
-                        delimiter = ";"
-                        in_delimiter_block = False
-                    continue
+                def commit(index):
+                    connection.commit()
+                    self._write_sql_checkpoint(checkpoint_path, signature, index)
+                    if progress_callback:
+                        progress_callback(index, bytes_read[0], total_bytes)
                 
-                # 累积语句
-                current_statement += original_line + "\n"
+                def set_checks(enabled):
+                    value = 1 if enabled else 0
+                    cursor.execute(f"SET FOREIGN_KEY_CHECKS = {value}")
+                    cursor.execute(f"SET UNIQUE_CHECKS = {value}")
                 
-                # 检查是否到达语句结束
-                if line.endswith(delimiter):
-                    stmt = current_statement.rstrip().rstrip(delimiter).strip()
-                    if stmt:
-                        statements.append(stmt)
-                    current_statement = ""
-            
-            # 如果有剩余的语句
-            if current_statement.strip():
-                statements.append(current_statement.strip())
-            
-            # 执行每个SQL语句
-            for statement in statements:
-                if statement:
-                    try:
-                        # 对于包含多行值的INSERT语句，需要完整执行
-                        # 使用executemany对于批量INSERT更高效，但这里使用execute更简单
-                        self.cursor.execute(statement)
-                        self.connection.commit()
-                    except Error as e:
-                        # 某些语句可能失败（如DROP TABLE IF EXISTS），继续执行
-                        error_msg = str(e).lower()
-                        if "doesn't exist" not in error_msg:
-                            # 对于重复键错误，也继续执行（可能是重复初始化）
-                            if "duplicate entry" not in error_msg:
-                                print(f"执行SQL时出错: {e}")
-                                # 只打印前200个字符
-                                sql_preview = statement[:200] if len(statement) > 200 else statement
-                                print(f"SQL预览: {sql_preview}...")
+                try:
+                    for statement in iter_statements(read_lines(f)):
+                        # 恢复执行时跳过已提交的语句，但会话级语句需要重新执行
+                        if statement.index < skip:
+                            if statement.keyword in ('USE', 'SET'):
+                                self._execute_script_statement(connection, cursor, statement)
+                            continue
+                        
+                        if cancel_event is not None and cancel_event.is_set():
+                            if pending:
+                                commit(done)
+                            cancelled = True
+                            break
+                        
+                        if statement.is_dml:
+                            if disable_checks and not checks_off:
+                                set_checks(False)
+                                checks_off = True
+                        else:
+                            # DDL 会隐式提交，这里先显式提交以便记录检查点
+                            if pending:
+                                commit(statement.index)
+                                pending = 0
+                            if checks_off:
+                                set_checks(True)
+                                checks_off = False
+                        
+                        self._execute_script_statement(connection, cursor, statement)
+                        done = statement.index + 1
+                        
+                        if statement.is_dml:
+                            pending += 1
+                            if pending >= batch_size:
+                                commit(done)
+                                pending = 0
+                        else:
+                            self._write_sql_checkpoint(checkpoint_path, signature, done)
+                    
+                    if not cancelled:
+                        connection.commit()
+                        if progress_callback:
+                            progress_callback(done, bytes_read[0], total_bytes)
+                finally:
+                    if checks_off and connection.is_connected():
+                        set_checks(True)
             
+            if cancelled:
+                print(f"已取消执行 {file_path}，已提交 {done} 条语句，可使用 resume=True 继续")
+                return False
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
             return True
         except Exception as e:
             print(f"执行SQL文件错误: {e}")
+            if os.path.exists(checkpoint_path):
+                print(f"已提交的进度保存在 {checkpoint_path}，可使用 resume=True 继续")
             import traceback
             traceback.print_exc()
             return False
     
-    def initialize_database(self, sql_file_path):
-        """初始化数据库（执行SQL脚本）"""
+    def _execute_script_statement(self, connection, cursor, statement):
+        """执行脚本中的一条语句；可忽略的错误只打印，连接断开时抛出"""
+        try:
+            if statement.keyword == 'CALL':
+                # 存储过程可能返回多个结果集
+                for result in cursor.execute(statement.sql, multi=True):
+                    if result.with_rows:
+                        result.fetchall()
+            else:
+                cursor.execute(statement.sql)
+                if cursor.with_rows:
+                    cursor.fetchall()
+        except Error as e:
+            if not connection.is_connected():
+                raise
+            # 某些语句可能失败（如DROP TABLE IF EXISTS），继续执行
+            error_msg = str(e).lower()
+            if "doesn't exist" not in error_msg:
+                # 对于重复键错误，也继续执行（可能是重复初始化）
+                if "duplicate entry" not in error_msg:
+                    print(f"执行SQL时出错（第 {statement.line} 行）: {e}")
+                    print(f"SQL预览: {statement.preview()}")
+    
+    def _read_sql_checkpoint(self, checkpoint_path, signature):
+        """读取检查点，返回已提交的语句数（文件已变化或没有检查点时为0）"""
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                saved_signature, count = f.read().split()
+            return int(count) if saved_signature == signature else 0
+        except (OSError, ValueError):
+            return 0
+    
+    def _write_sql_checkpoint(self, checkpoint_path, signature, count):
+        try:
+            with open(checkpoint_path, 'w', encoding='utf-8') as f:
+                f.write(f"{signature} {count}")
+        except OSError as e:
+            print(f"写入检查点失败: {e}")
+    
+    def initialize_database(self, sql_file_path, **options):
+        """初始化数据库（执行SQL脚本），options 传给 execute_sql_file"""
+        _load_driver()
         # 先连接到MySQL服务器（不指定数据库）
         temp_config = self.config.copy()
         temp_config.pop('database', None)
@@ -159,60 +702,285 @@ class DatabaseManager:
             
             # 连接到目标数据库
             if self.connect():
-                return self.execute_sql_file(sql_file_path)
+                return self.execute_sql_file(sql_file_path, **options)
         except Error as e:
             print(f"初始化数据库错误: {e}")
             return False
         return False
     
-    def execute_query(self, query, params=None):
-        """执行查询（SELECT）"""
+    @contextmanager
+    def raising_errors(self):
+        """在当前线程内让读取方法出错时抛出异常，而不是返回 [] / None
+        
+        供需要区分“查询出错”与“没有数据”的调用方（如查询服务）包裹一组读方法调用
+        """
+        previous = getattr(self._local, 'raise_errors', False)
+        self._local.raise_errors = True
+        try:
+            yield
+        finally:
+            self._local.raise_errors = previous
+    
+    def _should_raise(self, raise_errors=False):
+        return raise_errors or getattr(self._local, 'raise_errors', False)
+    
+    def execute_query(self, query, params=None, raise_errors=False):
+        """执行查询（SELECT）
+        
+        出错时默认打印并返回 []；raise_errors=True 时抛出异常（校验等需要区分“出错”与“无结果”的场合）
+        """
         if not self.connection or not self.cursor:
             return []
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
+            with self.session() as (connection, cursor):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchall()
         except Error as e:
             print(f"查询错误: {e}")
+            if self._should_raise(raise_errors):
+                raise
             return []
     
     def execute_update(self, query, params=None):
         """执行更新（INSERT, UPDATE, DELETE）"""
+        return self._execute_write(query, params) is not None
+    
+    def _execute_write(self, query, params=None):
+        """执行更新，返回受影响的行数，失败返回 None
+        
+        修改/删除方法只在影响到行时才发变更通知：没有匹配的行时触发器不会写变更日志，
+        若仍然通知，变更订阅会留下本机写入的标记，把之后其他客户端对同一行的修改当作本机写入跳过。
+        """
         if not self.connection or not self.cursor:
-            return False
+            return None
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            self.connection.commit()
-            return True
+            with self.session() as (connection, cursor):
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    connection.commit()
+                    return max(cursor.rowcount, 0)
+                except Error:
+                    connection.rollback()
+                    raise
         except Error as e:
-            if self.connection:
-                self.connection.rollback()
             print(f"更新错误: {e}")
-            return False
+            return None
     
-    def call_procedure(self, procedure_name, params=None):
-        """调用存储过程"""
+    def call_procedure(self, procedure_name, params=None, raise_errors=False):
+        """调用存储过程，出错时默认打印并返回 []；raise_errors=True 时抛出异常"""
         if not self.connection or not self.cursor:
             return []
         try:
+            with self.session() as (connection, cursor):
+                if params:
+                    cursor.callproc(procedure_name, params)
+                else:
+                    cursor.callproc(procedure_name)
+                
+                results = []
+                for result in cursor.stored_results():
+                    results.extend(result.fetchall())
+                return results
+        except Error as e:
+            print(f"调用存储过程错误: {e}")
+            if self._should_raise(raise_errors):
+                raise
+            return []
+    
+    # ========== 结果缓存 ==========
+    def clear_query_cache(self):
+        """清空查询结果缓存"""
+        if self.query_cache is not None:
+            self.query_cache.clear()
+    
+    def _data_versions(self, cursor, tables):
+        """读取依赖表（含级联父表）的数据版本号，返回元组；不支持版本号时返回 None"""
+        if not self._versioned:
+            return None
+        try:
+            # 版本号分片存储，各分片之和每次写入都会增加
+            cursor.execute("SELECT TableName, SUM(Version) AS Version FROM DataVersion GROUP BY TableName")
+            versions = {row['TableName']: row['Version'] for row in cursor.fetchall()}
+        except Error as e:
+            print(f"读取数据版本失败，查询结果将不缓存: {e}")
+            self._versioned = False
+            return None
+        return tuple((table, versions.get(table)) for table in expand_tables(tables))
+    
+    def _cached(self, key, tables, fetch, error_label):
+        """在同一会话中先读版本号再取数据；出错时返回 []（raising_errors 内抛出）且不缓存"""
+        if not self.connection or not self.cursor:
+            return []
+        cache = self.query_cache
+        try:
+            with self.session() as (connection, cursor):
+                versions = self._data_versions(cursor, tables)
+                if versions is not None:
+                    rows = cache.get(key, versions)
+                    if rows is not None:
+                        return rows
+                rows = fetch(cursor)
+                if versions is not None:
+                    cache.put(key, versions, rows)
+                return rows
+        except Error as e:
+            print(f"{error_label}: {e}")
+            if self._should_raise():
+                raise
+            return []
+    
+    def cached_query(self, query, params=None, tables=()):
+        """执行查询并缓存结果，tables 为查询依赖的表"""
+        if self.query_cache is None:
+            return self.execute_query(query, params)
+        
+        def fetch(cursor):
             if params:
-                self.cursor.callproc(procedure_name, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.callproc(procedure_name)
-            
+                cursor.execute(query)
+            return cursor.fetchall()
+        
+        key = ('query', query, tuple(params) if params else None)
+        return self._cached(key, tables, fetch, "查询错误")
+    
+    def cached_procedure(self, procedure_name, tables=()):
+        """调用（无参数）存储过程并缓存结果，tables 为存储过程依赖的表"""
+        if self.query_cache is None:
+            return self.call_procedure(procedure_name)
+        
+        def fetch(cursor):
+            cursor.callproc(procedure_name)
             results = []
-            for result in self.cursor.stored_results():
+            for result in cursor.stored_results():
                 results.extend(result.fetchall())
             return results
+        
+        return self._cached(('procedure', procedure_name), tables, fetch, "调用存储过程错误")
+    
+    # ========== 变更通知 ==========
+    def add_change_listener(self, callback):
+        """注册写入成功后的回调 callback(change)
+        
+        change 为字典：table（表名）、action（insert/update/delete，批量导入为 reload）、
+        key（主键，复合主键为元组）、values（已知的新值，可能为 None）。
+        回调在执行写入的线程中调用，界面需自行转到主线程。
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change(self, table, action, key, values=None):
+        change = {'table': table, 'action': action, 'key': key, 'values': values}
+        for callback in list(self._change_listeners):
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"变更回调出错: {e}")
+    
+    # ========== 变更日志（其他客户端的写入） ==========
+    def get_changes_since(self, seq, limit=500):
+        """变更日志中序号大于 seq 的记录，按序号排序，最多 limit 条"""
+        return self.execute_query(CHANGES_SINCE_SQL, (seq, limit))
+    
+    def get_change_log_bounds(self):
+        """变更日志当前的 (最小序号, 最大序号)，日志为空时为 (None, None)，查询失败返回 None"""
+        rows = self.execute_query("SELECT MIN(Seq) AS min_seq, MAX(Seq) AS max_seq FROM ChangeLog")
+        if not rows:
+            return None
+        return rows[0]['min_seq'], rows[0]['max_seq']
+    
+    def compact_change_log(self, keep_seconds=3600, limit=10000):
+        """删除 keep_seconds 秒之前的变更记录（保留最新一条）"""
+        return self.execute_update("CALL usp_CompactChangeLog(%s, %s)", (keep_seconds, limit))
+    
+    def log_bulk_change(self, table):
+        """批量写入（关闭了逐行记录）后记一条 reload 变更，其他客户端收到后整表刷新"""
+        if not self.execute_update("CALL usp_LogChange(%s, 'reload', NULL)", (table,)):
+            return False
+        self._notify_change(table, 'reload', None)
+        return True
+    
+    # ========== 流式查询 ==========
+    @contextmanager
+    def stream_connection(self):
+        """为流式查询打开一个独立连接
+        
+        未缓冲游标在结果读完之前会独占连接，因此不使用主连接或连接池，
+        每次流式查询单独连接，结束（或提前停止迭代）后关闭。
+        """
+        _load_driver()
+        conn = mysql.connector.connect(consume_results=True, **self.config)
+        try:
+            yield conn
+        finally:
+            try:
+                conn.close()
+            except Error:
+                pass
+    
+    def iter_query(self, query, params=None, batch_size=1000, raise_errors=False):
+        """流式执行查询（SELECT），逐行产出字典
+        
+        使用未缓冲游标按 batch_size 批量 fetchmany，任一时刻内存中最多只有一批行；
+        生成器在第一次迭代时才连接数据库。
+        出错时默认打印并结束迭代；raise_errors=True 时抛出异常（导出等不能接受结果被截断的场合）。
+        """
+        if not self.connection or not self.cursor:
+            return
+        try:
+            with self.stream_connection() as conn:
+                cursor = conn.cursor(dictionary=True, buffered=False)
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield row
+                finally:
+                    cursor.close()
         except Error as e:
-            print(f"调用存储过程错误: {e}")
-            return []
+            print(f"流式查询错误: {e}")
+            if self._should_raise(raise_errors):
+                raise
+    
+    def iter_procedure(self, procedure_name, batch_size=1000, raise_errors=False):
+        """流式调用（无参数）存储过程，逐行产出其所有结果集中的行"""
+        if not self.connection or not self.cursor:
+            return
+        try:
+            with self.stream_connection() as conn:
+                cursor = conn.cursor(dictionary=True, buffered=False)
+                try:
+                    for result in cursor.execute(f"CALL {procedure_name}()", multi=True):
+                        if not result.with_rows:
+                            continue
+                        while True:
+                            rows = result.fetchmany(batch_size)
+                            if not rows:
+                                break
+                            for row in rows:
+                                yield row
+                finally:
+                    cursor.close()
+        except Error as e:
+            print(f"流式调用存储过程错误: {e}")
+            if self._should_raise(raise_errors):
+                raise
     
     # ========== 学生管理 ==========
     def get_all_students(self):
@@ -221,35 +989,59 @@ class DatabaseManager:
         return self.execute_query(query)
     
     def get_all_students_with_gpa(self):
-        """获取所有学生（包含GPA和学分，通过视图计算）"""
-        query = """
-            SELECT 
-                S.SNo AS 学号,
-                S.SName AS 姓名,
-                S.Dept AS 院系,
-                S.EnrollmentYear,
-                SG.已获学分,
-                SG.平均绩点
-            FROM Student S
-            LEFT JOIN StudentGPAView SG ON S.SNo = SG.学号
-            ORDER BY S.SNo
+        """获取所有学生（包含GPA和学分，通过视图或汇总表计算）"""
+        return self.cached_query(students_with_gpa_sql(self.use_aggregate), tables=GPA_TABLES)
+    
+    def iter_all_students_with_gpa(self, batch_size=1000, raise_errors=False):
+        """流式获取所有学生（包含GPA和学分）"""
+        return self.iter_query(students_with_gpa_sql(self.use_aggregate), batch_size=batch_size, raise_errors=raise_errors)
+    
+    def count_students(self):
+        """学生总数"""
+        rows = self.execute_query("SELECT COUNT(*) AS total FROM Student")
+        return rows[0]['total'] if rows else 0
+    
+    def get_students_with_gpa_range(self, offset, limit):
+        """按学号顺序获取一段学生（包含GPA和学分），供虚拟表格分页加载"""
+        return self._get_students_with_gpa_for(STUDENTS_RANGE_KEY_SQL, (limit, offset))
+    
+    def _get_students_with_gpa_for(self, key_query, params):
+        """获取 key_query 选出的学生（包含GPA和学分）
+        
+        只对这些学生聚合成绩，不会物化整个 StudentGPAView
         """
-        return self.execute_query(query)
+        return self.execute_query(students_with_gpa_for_sql(key_query, self.use_aggregate), params)
     
     def add_student(self, sno, sname, dept, year):
         """添加学生"""
         query = "INSERT INTO Student (SNo, SName, Dept, EnrollmentYear) VALUES (%s, %s, %s, %s)"
-        return self.execute_update(query, (sno, sname, dept, year))
+        if not self.execute_update(query, (sno, sname, dept, year)):
+            return False
+        self.dimensions.student_saved(sno, sname, dept, year)
+        self._notify_change('Student', 'insert', sno)
+        return True
     
     def update_student(self, sno, sname, dept, year):
         """更新学生信息"""
         query = "UPDATE Student SET SName=%s, Dept=%s, EnrollmentYear=%s WHERE SNo=%s"
-        return self.execute_update(query, (sname, dept, year, sno))
+        affected = self._execute_write(query, (sname, dept, year, sno))
+        if affected is None:
+            return False
+        if affected:
+            self.dimensions.student_saved(sno, sname, dept, year)
+            self._notify_change('Student', 'update', sno)
+        return True
     
     def delete_student(self, sno):
         """删除学生（级联删除成绩）"""
         query = "DELETE FROM Student WHERE SNo=%s"
-        return self.execute_update(query, (sno,))
+        affected = self._execute_write(query, (sno,))
+        if affected is None:
+            return False
+        if affected:
+            self.dimensions.student_deleted(sno)
+            self._notify_change('Student', 'delete', sno)
+        return True
     
     # ========== 课程管理 ==========
     def get_all_courses(self):
@@ -260,123 +1052,154 @@ class DatabaseManager:
     def add_course(self, cno, cname, credit, course_type):
         """添加课程"""
         query = "INSERT INTO Course (CNo, CName, Credit, CourseType) VALUES (%s, %s, %s, %s)"
-        return self.execute_update(query, (cno, cname, credit, course_type))
+        if not self.execute_update(query, (cno, cname, credit, course_type)):
+            return False
+        self.dimensions.course_saved(cno, cname, credit, course_type)
+        self._notify_change('Course', 'insert', cno, {'CNo': cno, 'CName': cname, 'Credit': credit, 'CourseType': course_type})
+        return True
     
     def update_course(self, cno, cname, credit, course_type):
         """更新课程"""
         query = "UPDATE Course SET CName=%s, Credit=%s, CourseType=%s WHERE CNo=%s"
-        return self.execute_update(query, (cname, credit, course_type, cno))
+        affected = self._execute_write(query, (cname, credit, course_type, cno))
+        if affected is None:
+            return False
+        if affected:
+            self.dimensions.course_saved(cno, cname, credit, course_type)
+            self._notify_change('Course', 'update', cno, {'CNo': cno, 'CName': cname, 'Credit': credit, 'CourseType': course_type})
+        return True
     
     def delete_course(self, cno):
         """删除课程"""
         query = "DELETE FROM Course WHERE CNo=%s"
-        return self.execute_update(query, (cno,))
+        affected = self._execute_write(query, (cno,))
+        if affected is None:
+            return False
+        if affected:
+            self.dimensions.course_deleted(cno)
+            self._notify_change('Course', 'delete', cno)
+        return True
     
     # ========== 成绩管理 ==========
+    def get_grade_scale(self):
+        """成绩等级表（GradeScale），每次连接只读取一次
+        
+        未连接、表不存在或为空时返回默认分数线
+        """
+        scale = self._grade_scale
+        if scale is None:
+            rows = []
+            if self.connection and self.cursor:
+                rows = self.execute_query("SELECT MinScore, GradePoint, IsPassed FROM GradeScale ORDER BY MinScore")
+            scale = GradeScale.from_rows(rows) if rows else DEFAULT_SCALE
+            if rows:
+                self._grade_scale = scale
+        return scale
+    
+    def reload_grade_scale(self):
+        """修改 GradeScale 后调用：丢弃缓存的分数线"""
+        self._grade_scale = None
+    
     def calculate_gpa(self, score_value):
         """计算绩点（Python端计算，与数据库函数fn_CalculateGPA一致）"""
-        if score_value >= 90:
-            return 4.0
-        elif score_value >= 80:
-            return 3.0
-        elif score_value >= 70:
-            return 2.0
-        elif score_value >= 60:
-            return 1.0
-        else:
-            return 0.0
+        return self.get_grade_scale().grade_point(score_value)
+    
+    def derive_grades(self, score_values):
+        """批量计算一整列成绩的绩点和是否通过，返回 (绩点列表, 是否通过列表)"""
+        return self.get_grade_scale().derive(score_values)
     
     def get_all_scores(self):
         """获取所有成绩（不包含冗余字段）"""
-        query = """
-            SELECT SC.SNo, SC.CNo, SC.ScoreValue, SC.Semester, S.SName, C.CName, C.Credit
-            FROM Score SC
-            INNER JOIN Student S ON SC.SNo = S.SNo
-            INNER JOIN Course C ON SC.CNo = C.CNo
-            ORDER BY SC.SNo, SC.Semester
-        """
-        return self.execute_query(query)
+        return self.execute_query(ALL_SCORES_SQL)
+    
+    def iter_all_scores(self, batch_size=1000, raise_errors=False):
+        """流式获取所有成绩（内存占用与总行数无关）"""
+        return self.iter_query(ALL_SCORES_SQL, batch_size=batch_size, raise_errors=raise_errors)
+    
+    def count_scores(self):
+        """成绩总数"""
+        rows = self.execute_query("SELECT COUNT(*) AS total FROM Score")
+        return rows[0]['total'] if rows else 0
+    
+    def get_scores_range(self, offset, limit):
+        """按主键顺序 (SNo, CNo, Semester) 获取一段成绩，供虚拟表格分页加载"""
+        return self.execute_query(SCORES_RANGE_SQL, (limit, offset))
     
     def get_student_scores(self, sno):
         """获取指定学生的成绩（不包含冗余字段）"""
-        query = """
-            SELECT SC.SNo, SC.CNo, SC.ScoreValue, SC.Semester, C.CName, C.Credit, C.CourseType
-            FROM Score SC
-            INNER JOIN Course C ON SC.CNo = C.CNo
-            WHERE SC.SNo = %s
-            ORDER BY SC.Semester, C.CName
-        """
-        return self.execute_query(query, (sno,))
+        return self.execute_query(STUDENT_SCORES_SQL, (sno,))
     
     def add_score(self, sno, cno, score_value, semester):
         """添加成绩（触发器会自动计算GPA和是否通过）"""
         query = "INSERT INTO Score (SNo, CNo, ScoreValue, Semester) VALUES (%s, %s, %s, %s)"
-        return self.execute_update(query, (sno, cno, score_value, semester))
+        if not self.execute_update(query, (sno, cno, score_value, semester)):
+            return False
+        self._notify_change('Score', 'insert', (sno, cno, semester))
+        return True
     
     def update_score(self, sno, cno, semester, score_value):
         """更新成绩"""
         query = "UPDATE Score SET ScoreValue=%s WHERE SNo=%s AND CNo=%s AND Semester=%s"
-        return self.execute_update(query, (score_value, sno, cno, semester))
+        affected = self._execute_write(query, (score_value, sno, cno, semester))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Score', 'update', (sno, cno, semester))
+        return True
     
     def delete_score(self, sno, cno, semester):
         """删除成绩"""
         query = "DELETE FROM Score WHERE SNo=%s AND CNo=%s AND Semester=%s"
-        return self.execute_update(query, (sno, cno, semester))
+        affected = self._execute_write(query, (sno, cno, semester))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('Score', 'delete', (sno, cno, semester))
+        return True
     
     # ========== 查询功能 ==========
     def get_warning_list(self):
         """获取预警学生名单"""
-        return self.call_procedure('usp_GenerateWarningList')
+        return self.cached_procedure('usp_GenerateWarningList', tables=WARNING_TABLES)
+    
+    def iter_warning_list(self, batch_size=1000, raise_errors=False):
+        """流式获取预警学生名单"""
+        return self.iter_procedure('usp_GenerateWarningList', batch_size=batch_size, raise_errors=raise_errors)
     
     def get_failed_core_courses(self, sno=None):
         """获取核心课程不及格"""
         if sno:
-            query = """
-                SELECT * FROM FailedCoreCoursesView WHERE 学号 = %s
-            """
-            return self.execute_query(query, (sno,))
+            return self.cached_query(FAILED_CORE_COURSES_BY_STUDENT_SQL, (sno,), tables=FAILED_TABLES + ('CoreCourse',))
         else:
-            query = "SELECT * FROM FailedCoreCoursesView"
-            return self.execute_query(query)
+            return self.cached_query(FAILED_CORE_COURSES_SQL, tables=FAILED_TABLES + ('CoreCourse',))
+    
+    def iter_failed_core_courses(self, batch_size=1000, raise_errors=False):
+        """流式获取所有核心课程不及格记录"""
+        return self.iter_query(FAILED_CORE_COURSES_SQL, batch_size=batch_size, raise_errors=raise_errors)
     
     def get_student_gpa_view(self):
         """获取学生GPA视图"""
-        query = "SELECT * FROM StudentGPAView ORDER BY 平均绩点 DESC"
-        return self.execute_query(query)
+        return self.cached_query(student_gpa_view_sql(self.use_aggregate), tables=GPA_TABLES)
+    
+    def iter_student_gpa_view(self, batch_size=1000, raise_errors=False):
+        """流式获取学生GPA排名"""
+        return self.iter_query(student_gpa_view_sql(self.use_aggregate), batch_size=batch_size, raise_errors=raise_errors)
     
     def get_credits_completed(self):
         """获取学分完成情况"""
-        query = "SELECT * FROM CreditsCompletedView ORDER BY 已获学分总数 DESC"
-        return self.execute_query(query)
+        return self.cached_query(credits_completed_sql(self.use_aggregate), tables=GPA_TABLES)
+    
+    def iter_credits_completed(self, batch_size=1000, raise_errors=False):
+        """流式获取学分完成情况"""
+        return self.iter_query(credits_completed_sql(self.use_aggregate), batch_size=batch_size, raise_errors=raise_errors)
     
     def get_department_statistics(self):
         """获取各院系统计"""
-        query = """
-            SELECT 
-                SG.院系,
-                COUNT(*) AS 学生人数,
-                ROUND(AVG(SG.平均绩点), 2) AS 平均GPA,
-                ROUND(AVG(SG.已获学分), 2) AS 平均已获学分
-            FROM StudentGPAView SG
-            GROUP BY SG.院系
-            ORDER BY 平均GPA DESC
-        """
-        return self.execute_query(query)
+        return self.cached_query(department_statistics_sql(self.use_aggregate), tables=GPA_TABLES)
     
     def get_semester_statistics(self):
         """获取学期统计"""
-        query = """
-            SELECT 
-                SC.Semester AS 学期,
-                COUNT(DISTINCT SC.SNo) AS 选课学生数,
-                COUNT(*) AS 总选课数,
-                COUNT(DISTINCT SC.CNo) AS 开设课程数,
-                ROUND(AVG(SC.ScoreValue), 2) AS 平均成绩
-            FROM Score SC
-            GROUP BY SC.Semester
-            ORDER BY SC.Semester
-        """
-        return self.execute_query(query)
+        return self.cached_query(SEMESTER_STATISTICS_SQL, tables=('Score',))
     
     # ========== 毕业要求管理 ==========
     def get_graduation_requirements(self):
@@ -387,17 +1210,32 @@ class DatabaseManager:
     def add_graduation_requirement(self, dept, total_credit, fail_limit, min_gpa):
         """添加毕业要求"""
         query = "INSERT INTO GraduationRequirement (Dept, TotalCreditRequired, CoreCourseFailLimit, MinGPA) VALUES (%s, %s, %s, %s)"
-        return self.execute_update(query, (dept, total_credit, fail_limit, min_gpa))
+        if not self.execute_update(query, (dept, total_credit, fail_limit, min_gpa)):
+            return False
+        self.dimensions.requirement_saved(dept)
+        self._notify_change('GraduationRequirement', 'insert', dept)
+        return True
     
     def update_graduation_requirement(self, dept, total_credit, fail_limit, min_gpa):
         """更新毕业要求"""
         query = "UPDATE GraduationRequirement SET TotalCreditRequired=%s, CoreCourseFailLimit=%s, MinGPA=%s WHERE Dept=%s"
-        return self.execute_update(query, (total_credit, fail_limit, min_gpa, dept))
+        affected = self._execute_write(query, (total_credit, fail_limit, min_gpa, dept))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('GraduationRequirement', 'update', dept)
+        return True
     
     def delete_graduation_requirement(self, dept):
         """删除毕业要求"""
         query = "DELETE FROM GraduationRequirement WHERE Dept=%s"
-        return self.execute_update(query, (dept,))
+        affected = self._execute_write(query, (dept,))
+        if affected is None:
+            return False
+        if affected:
+            self.dimensions.requirement_deleted(dept)
+            self._notify_change('GraduationRequirement', 'delete', dept)
+        return True
     
     # ========== 核心课程管理 ==========
     def get_core_courses(self, dept=None):
@@ -412,20 +1250,126 @@ class DatabaseManager:
     def add_core_course(self, dept, cno):
         """添加核心课程"""
         query = "INSERT INTO CoreCourse (Dept, CNo) VALUES (%s, %s)"
-        return self.execute_update(query, (dept, cno))
+        if not self.execute_update(query, (dept, cno)):
+            return False
+        self._notify_change('CoreCourse', 'insert', (dept, cno))
+        return True
     
     def delete_core_course(self, dept, cno):
         """删除核心课程"""
         query = "DELETE FROM CoreCourse WHERE Dept=%s AND CNo=%s"
-        return self.execute_update(query, (dept, cno))
+        affected = self._execute_write(query, (dept, cno))
+        if affected is None:
+            return False
+        if affected:
+            self._notify_change('CoreCourse', 'delete', (dept, cno))
+        return True
     
     # ========== 未通过课程查询 ==========
     def get_failed_courses(self, sno=None):
         """获取未通过课程（所有课程，不仅仅是核心课程）"""
         if sno:
-            query = "SELECT * FROM FailedCoursesView WHERE 学号 = %s"
-            return self.execute_query(query, (sno,))
+            return self.cached_query(FAILED_COURSES_BY_STUDENT_SQL, (sno,), tables=FAILED_TABLES)
         else:
-            query = "SELECT * FROM FailedCoursesView"
-            return self.execute_query(query)
-
+            return self.cached_query(FAILED_COURSES_SQL, tables=FAILED_TABLES)
+    
+    def iter_failed_courses(self, sno=None, batch_size=1000, raise_errors=False):
+        """流式获取未通过课程"""
+        if sno:
+            return self.iter_query(FAILED_COURSES_BY_STUDENT_SQL, (sno,), batch_size, raise_errors)
+        return self.iter_query(FAILED_COURSES_SQL, batch_size=batch_size, raise_errors=raise_errors)
+    
+    # ========== 分页查询（键集分页） ==========
+    # 每页返回 {'rows': 本页数据, 'next_after': 下一页的起始键（None 表示已是最后一页）}，
+    # with_total=True 时附带 'total_estimate' 总数估计。
+    # 按主键定位下一页（WHERE 主键 > 上一页最后一行），翻到第N页的代价与N无关。
+    
+    def _get_scores_for(self, key_query, params):
+        """获取 key_query 选出的成绩（含学生姓名、课程名、绩点），按主键排序"""
+        return self.execute_query(scores_for_sql(key_query), params)
+    
+    def get_score(self, sno, cno, semester):
+        """获取单条成绩（列与 get_scores_page 相同），不存在时返回 None"""
+        rows = self._get_scores_for(SCORE_KEY_SQL, (sno, cno, semester))
+        return rows[0] if rows else None
+    
+    def get_scores_page(self, after=None, page_size=100, with_total=False):
+        """按 (SNo, CNo, Semester) 分页获取成绩，after 为上一页返回的 next_after"""
+        if after:
+            key_query = SCORES_AFTER_KEY_SQL
+            params = (after[0], after[1], after[2], page_size)
+        else:
+            key_query = SCORES_FIRST_KEY_SQL
+            params = (page_size,)
+        rows = self._get_scores_for(key_query, params)
+        total = self.estimate_row_count('Score') if with_total else None
+        return page_result(rows, page_size, ('SNo', 'CNo', 'Semester'), total)
+    
+    def get_students_page(self, after=None, page_size=100, with_total=False):
+        """按学号分页获取学生（基础信息），after 为上一页最后一个学号"""
+        if after:
+            query = "SELECT * FROM Student WHERE SNo > %s ORDER BY SNo LIMIT %s"
+            params = (after, page_size)
+        else:
+            query = "SELECT * FROM Student ORDER BY SNo LIMIT %s"
+            params = (page_size,)
+        rows = self.execute_query(query, params)
+        total = self.estimate_row_count('Student') if with_total else None
+        return page_result(rows, page_size, ('SNo',), total)
+    
+    def get_student_with_gpa(self, sno):
+        """获取单个学生（列与 get_students_with_gpa_page 相同），不存在时返回 None"""
+        rows = self._get_students_with_gpa_for(STUDENT_KEY_SQL, (sno,))
+        return rows[0] if rows else None
+    
+    def get_students_with_gpa_page(self, after=None, page_size=100, with_total=False):
+        """按学号分页获取学生（包含GPA和学分）"""
+        if after:
+            key_query = STUDENTS_AFTER_KEY_SQL
+            params = (after, page_size)
+        else:
+            key_query = STUDENTS_FIRST_KEY_SQL
+            params = (page_size,)
+        rows = self._get_students_with_gpa_for(key_query, params)
+        total = self.estimate_row_count('Student') if with_total else None
+        return page_result(rows, page_size, ('学号',), total)
+    
+    def get_failed_courses_page(self, after=None, page_size=100, with_total=False):
+        """按 (学号, 课程号, 学期) 分页获取未通过课程，列与 FailedCoursesView 相同"""
+        if after:
+            key_filter = "WHERE (SC.SNo, SC.CNo, SC.Semester) > (%s, %s, %s)"
+            params = (after[0], after[1], after[2], page_size)
+        else:
+            key_filter = ""
+            params = (page_size,)
+        rows = self.execute_query(failed_courses_page_sql(key_filter), params)
+        total = None
+        if with_total:
+            count_rows = self.execute_query(FAILED_COURSES_COUNT_SQL)
+            total = count_rows[0]['total'] if count_rows else 0
+        return page_result(rows, page_size, ('学号', '课程号', '学期'), total)
+    
+    def estimate_row_count(self, table):
+        """表行数估计（来自 information_schema 统计信息，不扫描表）"""
+        rows = self.execute_query(ESTIMATE_ROW_COUNT_SQL, (table,))
+        return int(rows[0]['total'] or 0) if rows else 0
+    
+    # ========== 学生成绩汇总表 ==========
+    def rebuild_student_aggregate(self):
+        """全量重建学生成绩汇总表"""
+        return self.execute_update("CALL usp_RebuildStudentAggregate()")
+    
+    def verify_student_aggregate(self):
+        """将汇总表与视图计算结果逐个学生比对，返回不一致的记录（空列表表示一致）
+        
+        未连接或查询失败（表/视图缺失、连接断开等）时返回 None，不能当作“一致”
+        """
+        if not self.connection or not self.cursor:
+            return None
+        try:
+            with self.session() as (connection, cursor):
+                cursor.execute(VERIFY_AGGREGATE_SQL)
+                return cursor.fetchall()
+        except Error as e:
+            print(f"校验汇总表错误: {e}")
+            return None
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+维度数据缓存
+学生（按学号）、课程（按课程号和课程名）和院系列表在首次使用时整体加载一次，
+之后由 DatabaseManager 的增删改方法增量更新，查找为 O(1)，
+对话框打开时不必每次重新查询整张学生表和课程表。
+"""
+
+import threading
+from collections import Counter
+
+class DimensionCache:
+    """学生、课程、院系的内存索引（线程安全）"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._lock = threading.RLock()
+        self.invalidate()
+
+    def invalidate(self):
+        """丢弃缓存，下次访问时重新加载（批量导入、切换数据库后调用）"""
+        with self._lock:
+            self._loaded = False
+            self._students = {}
+            self._courses = {}
+            self._dept_counts = Counter()
+            self._requirement_depts = set()
+            self._reset_views()
+
+    def _reset_views(self):
+        # 排序后的列表与下拉框文本按需生成，数据变化时丢弃
+        self._student_list = None
+        self._course_list = None
+        self._departments = None
+        self._student_labels = None
+        self._course_labels = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        db = self.db
+        if not db.connection or not db.cursor:
+            return
+        students = db.get_all_students()
+        courses = db.get_all_courses()
+        requirements = db.get_graduation_requirements()
+        self._students = {s['SNo']: s for s in students}
+        self._courses = {c['CNo']: c for c in courses}
+        self._dept_counts = Counter(s.get('Dept') for s in students if s.get('Dept'))
+        self._requirement_depts = {r['Dept'] for r in requirements if r.get('Dept')}
+        self._reset_views()
+        self._loaded = True
+
+    # ========== 查找 ==========
+    def student(self, sno):
+        """按学号查学生，不存在时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._students.get(sno)
+
+    def course(self, cno):
+        """按课程号查课程"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._courses.get(cno)
+
+    def students(self):
+        """按学号排序的学生列表（不要修改返回的列表）"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._student_list is None:
+                self._student_list = [self._students[k] for k in sorted(self._students)]
+            return self._student_list
+
+    def courses(self):
+        """按课程号排序的课程列表（不要修改返回的列表）"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._course_list is None:
+                self._course_list = [self._courses[k] for k in sorted(self._courses)]
+            return self._course_list
+
+    def departments(self):
+        """院系列表：有学生的院系和设置了毕业要求的院系"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._departments is None:
+                self._departments = sorted(set(self._dept_counts) | self._requirement_depts)
+            return self._departments
+
+    def student_labels(self):
+        """下拉框用的 "学号 - 姓名" 列表"""
+        with self._lock:
+            if self._student_labels is None or not self._loaded:
+                self._student_labels = [f"{s['SNo']} - {s.get('SName')}" for s in self.students()]
+            return self._student_labels
+
+    def course_labels(self):
+        """下拉框用的 "课程号 - 课程名" 列表"""
+        with self._lock:
+            if self._course_labels is None or not self._loaded:
+                self._course_labels = [f"{c['CNo']} - {c.get('CName')}" for c in self.courses()]
+            return self._course_labels
+
+    # ========== 增量更新（写入数据库成功后由 DatabaseManager 调用） ==========
+    def student_saved(self, sno, sname, dept, year):
+        with self._lock:
+            if not self._loaded:
+                return
+            old = self._students.get(sno)
+            if old is not None and old.get('Dept'):
+                self._dept_counts[old['Dept']] -= 1
+                if self._dept_counts[old['Dept']] <= 0:
+                    del self._dept_counts[old['Dept']]
+            self._students[sno] = {'SNo': sno, 'SName': sname, 'Dept': dept, 'EnrollmentYear': year}
+            if dept:
+                self._dept_counts[dept] += 1
+            self._reset_views()
+
+    def student_deleted(self, sno):
+        with self._lock:
+            if not self._loaded:
+                return
+            old = self._students.pop(sno, None)
+            if old is not None and old.get('Dept'):
+                self._dept_counts[old['Dept']] -= 1
+                if self._dept_counts[old['Dept']] <= 0:
+                    del self._dept_counts[old['Dept']]
+            self._reset_views()
+
+    def course_saved(self, cno, cname, credit, course_type):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._courses[cno] = {'CNo': cno, 'CName': cname, 'Credit': credit, 'CourseType': course_type}
+            self._reset_views()
+
+    def course_deleted(self, cno):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._courses.pop(cno, None)
+            self._reset_views()
+
+    def requirement_saved(self, dept):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._requirement_depts.add(dept)
+            self._departments = None
+
+    def requirement_deleted(self, dept):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._requirement_depts.discard(dept)
+            self._departments = None
+
+    # ========== 按主键重新读取（其他客户端写入后由 ChangeFeed 调用） ==========
+    def reload_student(self, sno):
+        """从数据库重新读取一名学生并更新缓存，返回该学生（已删除时为 None）"""
+        rows = self.db.execute_query(
+            "SELECT SNo, SName, Dept, EnrollmentYear FROM Student WHERE SNo = %s", (sno,))
+        if not rows:
+            self.student_deleted(sno)
+            return None
+        s = rows[0]
+        self.student_saved(s['SNo'], s['SName'], s['Dept'], s['EnrollmentYear'])
+        return s
+
+    def reload_course(self, cno):
+        """从数据库重新读取一门课程并更新缓存，返回该课程（已删除时为 None）"""
+        rows = self.db.execute_query(
+            "SELECT CNo, CName, Credit, CourseType FROM Course WHERE CNo = %s", (cno,))
+        if not rows:
+            self.course_deleted(cno)
+            return None
+        c = rows[0]
+        self.course_saved(c['CNo'], c['CName'], c['Credit'], c['CourseType'])
+        return c
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+流式导出（CSV / XLSX / Parquet）
+从数据库按批读取行并逐批写出，内存占用只与批大小有关，与总行数无关；
+百万行级的成绩表也不经过界面直接写入文件。
+
+    python database/exporter.py scores scores.csv
+    python database/exporter.py warning_list warning.xlsx --password ...
+    python database/exporter.py gpa_ranking gpa.parquet
+
+写入先写到同目录的临时文件，完成后再改名，取消或出错时不会留下半个文件。
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+# 导出内容：名称 -> 说明、读取函数（db, batch_size -> 行的可迭代对象）、
+# 列（(键, 表头) 列表；None 表示直接使用查询返回的列名）。
+# 行数可能很大的数据源使用数据库端流式游标；汇总类结果只有几十行，直接查询。
+EXPORT_SOURCES = {
+    'warning_list': {
+        'label': '预警学生名单',
+        'loader': lambda db, batch_size: db.iter_warning_list(batch_size, raise_errors=True),
+        'columns': None,
+    },
+    'gpa_ranking': {
+        'label': '学生GPA排名',
+        'loader': lambda db, batch_size: db.iter_student_gpa_view(batch_size, raise_errors=True),
+        'columns': None,
+    },
+    'failed_core_courses': {
+        'label': '核心课程不及格记录',
+        'loader': lambda db, batch_size: db.iter_failed_core_courses(batch_size, raise_errors=True),
+        'columns': None,
+    },
+    'failed_courses': {
+        'label': '所有未通过课程',
+        'loader': lambda db, batch_size: db.iter_failed_courses(batch_size=batch_size, raise_errors=True),
+        'columns': None,
+    },
+    'credits': {
+        'label': '学分完成情况',
+        'loader': lambda db, batch_size: db.iter_credits_completed(batch_size, raise_errors=True),
+        'columns': None,
+    },
+    'department_stats': {
+        'label': '各院系统计',
+        'loader': lambda db, batch_size: db.get_department_statistics(),
+        'columns': None,
+    },
+    'semester_stats': {
+        'label': '学期统计',
+        'loader': lambda db, batch_size: db.get_semester_statistics(),
+        'columns': None,
+    },
+    'students': {
+        'label': '学生',
+        'loader': lambda db, batch_size: db.iter_all_students_with_gpa(batch_size, raise_errors=True),
+        'columns': [('学号', '学号'), ('姓名', '姓名'), ('院系', '院系'), ('EnrollmentYear', '入学年份'),
+                    ('已获学分', '总学分'), ('平均绩点', 'GPA')],
+    },
+    'scores': {
+        'label': '成绩',
+        'loader': lambda db, batch_size: db.iter_all_scores(batch_size, raise_errors=True),
+        'columns': [('SNo', '学号'), ('SName', '姓名'), ('CNo', '课程号'), ('CName', '课程名'),
+                    ('Credit', '学分'), ('ScoreValue', '成绩'), ('GradePoint', '绩点'),
+                    ('IsPassed', '是否通过'), ('Semester', '学期')],
+    },
+    'courses': {
+        'label': '课程',
+        'loader': lambda db, batch_size: db.get_all_courses(),
+        'columns': [('CNo', '课程号'), ('CName', '课程名'), ('Credit', '学分'), ('CourseType', '课程类型')],
+    },
+    'graduation_requirements': {
+        'label': '毕业要求',
+        'loader': lambda db, batch_size: db.get_graduation_requirements(),
+        'columns': [('Dept', '院系'), ('TotalCreditRequired', '总学分要求'),
+                    ('CoreCourseFailLimit', '核心课不及格上限'), ('MinGPA', '最低GPA要求')],
+    },
+    'core_courses': {
+        'label': '核心课程',
+        'loader': lambda db, batch_size: _core_courses_with_names(db),
+        'columns': [('Dept', '院系'), ('CNo', '课程号'), ('CName', '课程名')],
+    },
+}
+
+FORMATS = {
+    '.csv': 'csv',
+    '.xlsx': 'xlsx',
+    '.parquet': 'parquet',
+}
+
+# xlsx 单个工作表最多 1048576 行（含表头），超出后续写到新的工作表
+XLSX_MAX_ROWS = 1048576
+
+def _core_courses_with_names(db):
+    """核心课程，课程名取自维度缓存"""
+    for row in db.get_core_courses():
+        course = db.dimensions.course(row.get('CNo'))
+        yield {'Dept': row.get('Dept'), 'CNo': row.get('CNo'),
+               'CName': course.get('CName') if course else None}
+
+def format_for_path(path):
+    """根据扩展名判断导出格式"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"不支持的导出格式: {ext or '(无扩展名)'}，请使用 {' / '.join(FORMATS)}")
+    return FORMATS[ext]
+
+def resolve_columns(first, columns):
+    """返回 (取值用的键, 表头)
+
+    columns 可以是表头列表（与字典的键一致时按键取值，否则按位置对应），
+    也可以是 (键, 表头) 列表。
+    """
+    if columns and all(isinstance(c, tuple) for c in columns):
+        return [k for k, _ in columns], [h for _, h in columns]
+    if isinstance(first, dict):
+        keys = list(first.keys())
+        if columns and all(c in first for c in columns):
+            return list(columns), list(columns)
+    else:
+        keys = list(range(len(first)))
+    headers = list(columns) if columns and len(columns) == len(keys) else [str(k) for k in keys]
+    return keys, headers
+
+def _tmp_path(path):
+    """同目录下的临时文件，写完后再改名为 path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    return os.path.join(directory, f".{os.path.basename(path)}.part")
+
+def _row_values(row, keys):
+    return [row.get(k) if isinstance(row, dict) else row[k] for k in keys]
+
+class CsvWriter:
+    """CSV（utf-8-sig，Excel 可直接打开中文）"""
+
+    def __init__(self, path, headers):
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write(self, rows):
+        self.writer.writerows(['' if v is None else v for v in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+class XlsxWriter:
+    """XLSX（openpyxl 只写模式，行直接写入临时文件，不在内存中保留）"""
+
+    def __init__(self, path, headers):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError("导出 xlsx 文件需要安装 openpyxl：pip install openpyxl")
+        self.path = path
+        self.headers = headers
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.sheet_rows = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        index = len(self.workbook.worksheets) + 1
+        self.sheet = self.workbook.create_sheet(title="Sheet1" if index == 1 else f"Sheet{index}")
+        self.sheet.append(self.headers)
+        self.sheet_rows = 1
+
+    def write(self, rows):
+        for row in rows:
+            if self.sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self):
+        self.workbook.save(self.path)
+
+class ParquetWriter:
+    """Parquet（pyarrow，每批写成一个 row group；列类型按第一批推断）"""
+
+    def __init__(self, path, headers):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("导出 parquet 文件需要安装 pyarrow：pip install pyarrow")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.headers = headers
+        self.schema = None
+        self.writer = None
+
+    def _table(self, rows):
+        columns = [list(c) for c in zip(*rows)] if rows else [[] for _ in self.headers]
+        arrays = [self.pa.array(values) for values in columns]
+        if self.schema is None:
+            # 第一批中全为空的列无法推断类型，按字符串处理；
+            # DECIMAL 的精度按第一批推断，后续批次可能放不下，统一写成 double
+            fields = []
+            for header, array in zip(self.headers, arrays):
+                value_type = array.type
+                if self.pa.types.is_null(value_type):
+                    value_type = self.pa.string()
+                elif self.pa.types.is_decimal(value_type):
+                    value_type = self.pa.float64()
+                fields.append(self.pa.field(header, value_type))
+            self.schema = self.pa.schema(fields)
+        arrays = [array.cast(field.type) for array, field in zip(arrays, self.schema)]
+        return self.pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def write(self, rows):
+        table = self._table(rows)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            # 没有数据行时也写出只有表头的空文件
+            self.writer = self.pq.ParquetWriter(self.path, self._table([]).schema)
+        self.writer.close()
+
+WRITERS = {
+    'csv': CsvWriter,
+    'xlsx': XlsxWriter,
+    'parquet': ParquetWriter,
+}
+
+def export_rows(rows, path, columns=None, fmt=None, batch_size=5000,
+                progress_callback=None, cancel_event=None):
+    """把行（字典或元组的可迭代对象）流式写入文件
+
+    每写完一批调用 progress_callback(已写行数)，并检查 cancel_event；
+    返回 {'rows': 写出的行数, 'path': 文件路径, 'cancelled': 是否被取消}，
+    被取消时不保留文件。
+    """
+    fmt = fmt or format_for_path(path)
+    tmp_path = _tmp_path(path)
+    writer = None
+    keys = None
+    headers = [h for _, h in columns] if columns and all(isinstance(c, tuple) for c in columns) else columns
+    written = 0
+    cancelled = False
+    batch = []
+    iterator = iter(rows)
+    try:
+        for row in iterator:
+            if keys is None:
+                keys, headers = resolve_columns(row, columns)
+                writer = WRITERS[fmt](tmp_path, headers)
+            batch.append(_row_values(row, keys))
+            if len(batch) >= batch_size:
+                writer.write(batch)
+                written += len(batch)
+                batch = []
+                if progress_callback:
+                    progress_callback(written)
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+        if not cancelled:
+            if writer is None:
+                writer = WRITERS[fmt](tmp_path, list(headers or []))
+            if batch:
+                writer.write(batch)
+                written += len(batch)
+                if progress_callback:
+                    progress_callback(written)
+            writer.close()
+            writer = None
+            os.replace(tmp_path, path)
+    finally:
+        # 提前结束时关闭生成器，释放数据库端的流式游标
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {'rows': written, 'path': path, 'cancelled': cancelled}
+
+def _safe_name(value):
+    """分区值转为可用作文件名的字符串"""
+    name = "空" if value is None or value == "" else str(value)
+    return "".join("_" if c in '\\/:*?"<>|' else c for c in name)
+
+def export_partitioned(rows, directory, prefix, partition_func, columns=None, fmt='csv',
+                       batch_size=5000, progress_callback=None):
+    """一次遍历，按 partition_func(行) 的值把行分别写入 directory 下的多个文件
+
+    文件名为 "前缀_分区值.扩展名"（如 warning_list_计算机学院.csv），每个分区各自按批写出，
+    内存占用为 分区数 × batch_size 行。
+    返回 {'rows': 写出的总行数, 'files': {分区值: 文件路径}}
+    """
+    ext = next(e for e, f in FORMATS.items() if f == fmt)
+    os.makedirs(directory, exist_ok=True)
+    # 分区值 -> {'writer', 'batch', 'tmp', 'path'}
+    parts = {}
+    keys = headers = None
+    written = 0
+    iterator = iter(rows)
+    try:
+        for row in iterator:
+            if keys is None:
+                keys, headers = resolve_columns(row, columns)
+            value = partition_func(row)
+            part = parts.get(value)
+            if part is None:
+                path = os.path.join(directory, f"{prefix}_{_safe_name(value)}{ext}")
+                part = parts[value] = {'writer': None, 'batch': [], 'tmp': _tmp_path(path), 'path': path}
+                part['writer'] = WRITERS[fmt](part['tmp'], headers)
+            part['batch'].append(_row_values(row, keys))
+            if len(part['batch']) >= batch_size:
+                part['writer'].write(part['batch'])
+                written += len(part['batch'])
+                part['batch'] = []
+                if progress_callback:
+                    progress_callback(written)
+        for part in parts.values():
+            if part['batch']:
+                part['writer'].write(part['batch'])
+                written += len(part['batch'])
+                part['batch'] = []
+            part['writer'].close()
+            part['writer'] = None
+            os.replace(part['tmp'], part['path'])
+        if progress_callback:
+            progress_callback(written)
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()
+        for part in parts.values():
+            if part['writer'] is not None:
+                try:
+                    part['writer'].close()
+                except Exception:
+                    pass
+            if os.path.exists(part['tmp']):
+                os.remove(part['tmp'])
+    return {'rows': written, 'files': {value: part['path'] for value, part in parts.items()}}
+
+def export_source(db, name, path, fmt=None, batch_size=5000, progress_callback=None, cancel_event=None):
+    """按 EXPORT_SOURCES 中的名称导出"""
+    if name not in EXPORT_SOURCES:
+        raise ValueError(f"未知的导出内容: {name}")
+    source = EXPORT_SOURCES[name]
+    rows = source['loader'](db, batch_size)
+    return export_rows(rows, path, source['columns'], fmt, batch_size, progress_callback, cancel_event)
+
+def main(argv=None):
+    """命令行入口"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="导出查询结果或数据表（CSV / XLSX / Parquet）")
+    parser.add_argument('source', choices=sorted(EXPORT_SOURCES), help="导出内容")
+    parser.add_argument('file', help="输出文件，格式由扩展名决定（.csv / .xlsx / .parquet）")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default=os.environ.get('AWS_DB_PASSWORD', ''))
+    parser.add_argument('--database', default='AcademicWarningSystem')
+    parser.add_argument('--batch-size', type=int, default=5000, help="每批读取和写出的行数")
+    args = parser.parse_args(argv)
+
+    try:
+        format_for_path(args.file)
+    except ValueError as e:
+        print(e)
+        return 2
+
+    db = DatabaseManager()
+    db.set_config(args.host, args.port, args.user, args.password, args.database)
+    if not db.connect():
+        print("数据库连接失败")
+        return 2
+
+    def progress(written):
+        print(f"已导出 {written} 行")
+
+    try:
+        result = export_source(db, args.source, args.file, batch_size=args.batch_size,
+                               progress_callback=progress)
+    finally:
+        db.disconnect()
+
+    print(f"导出完成：共 {result['rows']} 行，已写入 {result['path']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+绩点与是否通过的推导
+分数线来自数据库的 GradeScale 表（分数段 [MinScore, MaxScore) -> 绩点、是否通过），
+与 fn_CalculateGPA / fn_IsPassed 及各视图使用同一份数据；
+未连接数据库或表为空时使用 DEFAULT_SCALE（90/80/70/60 -> 4/3/2/1）。
+
+derive_grades 一次处理一整列成绩，安装了 numpy 且行数较多时使用向量化计算。
+"""
+
+from bisect import bisect_right
+
+# numpy 导入较慢，第一次批量推导足够多的行时才导入（见 _load_numpy），
+# 界面和命令行启动时不必为它付出导入时间
+np = None
+_numpy_checked = False
+
+def _load_numpy():
+    """导入 numpy（只尝试一次），未安装时返回 None"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np
+
+# 少于该行数时 numpy 的数组转换开销大于收益
+NUMPY_MIN_ROWS = 256
+
+# 成绩与 GradeScale 的范围连接（SC 为成绩表别名）
+GRADE_SCALE_JOIN = "LEFT JOIN GradeScale GS ON SC.ScoreValue >= GS.MinScore AND SC.ScoreValue < GS.MaxScore"
+
+class GradeScale:
+    """成绩等级表：按分数段查绩点和是否通过
+
+    bands: [(分数下限, 绩点, 是否通过), ...]，每段覆盖到下一段的下限为止；
+    低于最低一段下限的成绩按 0 绩点、不通过处理。
+    """
+
+    def __init__(self, bands):
+        ordered = sorted((float(lower), float(point), bool(passed)) for lower, point, passed in bands)
+        self.bounds = [lower for lower, _, _ in ordered]
+        self.points = [0.0] + [point for _, point, _ in ordered]
+        self.passed = [False] + [passed for _, _, passed in ordered]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """由 GradeScale 表的查询结果构造"""
+        return cls([(row['MinScore'], row['GradePoint'], row['IsPassed']) for row in rows])
+
+    @property
+    def pass_score(self):
+        """最低的通过分数线"""
+        for lower, passed in zip(self.bounds, self.passed[1:]):
+            if passed:
+                return lower
+        return None
+
+    def grade_point(self, score_value):
+        return self.points[bisect_right(self.bounds, float(score_value))]
+
+    def is_passed(self, score_value):
+        return self.passed[bisect_right(self.bounds, float(score_value))]
+
+    def derive(self, score_values):
+        """批量推导，返回 (绩点列表, 是否通过列表)；None 按0分处理"""
+        np = _load_numpy() if len(score_values) >= NUMPY_MIN_ROWS else None
+        if np is not None:
+            values = np.array([0 if v is None else v for v in score_values], dtype=float)
+            index = np.searchsorted(self.bounds, values, side='right')
+            return np.asarray(self.points)[index].tolist(), np.asarray(self.passed)[index].tolist()
+
+        bounds, points, passed = self.bounds, self.points, self.passed
+        index = [bisect_right(bounds, 0.0 if v is None else float(v)) for v in score_values]
+        return [points[i] for i in index], [passed[i] for i in index]
+
+DEFAULT_SCALE = GradeScale([(90, 4.0, True), (80, 3.0, True), (70, 2.0, True), (60, 1.0, True), (0, 0.0, False)])
+
+def grade_point(score_value, scale=None):
+    """单个成绩的绩点"""
+    return (scale or DEFAULT_SCALE).grade_point(score_value)
+
+def is_passed(score_value, scale=None):
+    """单个成绩是否通过"""
+    return (scale or DEFAULT_SCALE).is_passed(score_value)
+
+def derive_grades(score_values, scale=None):
+    """批量推导绩点和是否通过
+
+    score_values: 成绩序列（float / Decimal / None，None 按0分处理）
+    返回 (绩点列表, 是否通过列表)，顺序与输入一致
+    """
+    return (scale or DEFAULT_SCALE).derive(score_values)
+
+def annotate_grades(rows, scale=None, score_key='ScoreValue'):
+    """为一批行（字典）补充 GradePoint / IsPassed 字段，返回原列表"""
+    missing = [row for row in rows if 'GradePoint' not in row]
+    if missing:
+        points, passed = derive_grades([row.get(score_key) for row in missing], scale)
+        for row, point, ok in zip(missing, points, passed):
+            row['GradePoint'] = point
+            row['IsPassed'] = ok
+    return rows
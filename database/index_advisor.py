@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+查询诊断与索引建议
+对 DatabaseManager 的每个查询方法，截获其实际执行的 SQL，在当前数据上运行
+EXPLAIN FORMAT=JSON（可选 EXPLAIN ANALYZE），标记全表扫描、文件排序和临时表；
+对涉及的表给出复合/覆盖索引建议，并可临时建索引比较前后耗时。
+
+命令行用法：
+    python -m database.index_advisor --password 123456
+    python -m database.index_advisor --password 123456 --analyze --try-indexes
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from database.sql_splitter import split_sql
+
+# 需要诊断的查询方法：(方法名, 根据样本数据生成参数的函数)
+QUERY_METHODS = [
+    ('get_all_students', lambda sample: ()),
+    ('get_all_students_with_gpa', lambda sample: ()),
+    ('count_students', lambda sample: ()),
+    ('get_students_with_gpa_range', lambda sample: (0, 200)),
+    ('get_students_page', lambda sample: (sample['sno'], 200)),
+    ('get_students_with_gpa_page', lambda sample: (sample['sno'], 200)),
+    ('get_all_courses', lambda sample: ()),
+    ('get_all_scores', lambda sample: ()),
+    ('count_scores', lambda sample: ()),
+    ('get_scores_range', lambda sample: (0, 200)),
+    ('get_scores_page', lambda sample: (sample['score_key'], 200)),
+    ('get_student_scores', lambda sample: (sample['sno'],)),
+    ('get_warning_list', lambda sample: ()),
+    ('get_failed_core_courses', lambda sample: ()),
+    ('get_failed_courses', lambda sample: ()),
+    ('get_failed_courses_page', lambda sample: (None, 200, True)),
+    ('get_student_gpa_view', lambda sample: ()),
+    ('get_credits_completed', lambda sample: ()),
+    ('get_department_statistics', lambda sample: ()),
+    ('get_semester_statistics', lambda sample: ()),
+    ('get_graduation_requirements', lambda sample: ()),
+    ('get_core_courses', lambda sample: (sample['dept'],)),
+]
+
+# 候选索引：只有在诊断中发现涉及该表的问题时才会建议/试验
+CANDIDATE_INDEXES = [
+    {
+        'table': 'Score',
+        'name': 'idx_adv_score_semester_cover',
+        'columns': '(Semester, SNo, CNo, ScoreValue)',
+        'reason': '学期统计按 Semester 分组并统计 SNo/CNo/ScoreValue，覆盖索引可按序读取，免回表、免临时表',
+    },
+    {
+        'table': 'Score',
+        'name': 'idx_adv_score_value_cover',
+        'columns': '(ScoreValue, SNo, CNo)',
+        'reason': '不及格查询按成绩范围过滤后连接学生和课程，覆盖索引避免回表',
+    },
+    {
+        'table': 'Score',
+        'name': 'idx_adv_score_cno_value',
+        'columns': '(CNo, ScoreValue)',
+        'reason': '按课程统计不及格（核心课程/课程触发器）时可直接在索引上过滤成绩',
+    },
+    {
+        'table': 'CoreCourse',
+        'name': 'idx_adv_core_cno_dept',
+        'columns': '(CNo, Dept)',
+        'reason': '从成绩表出发按 (CNo, Dept) 连接核心课程时，可替代外键自动创建的单列 CNo 索引',
+    },
+    {
+        'table': 'Student',
+        'name': 'idx_adv_student_dept_cover',
+        'columns': '(Dept, SNo, SName)',
+        'reason': '预警名单按 Dept 连接毕业要求并按 (Dept, SNo) 排序输出姓名，覆盖索引免排序、免回表',
+    },
+]
+
+# 视图和存储过程中约定的表别名
+KNOWN_ALIASES = {
+    'SC': 'Score', 'S': 'Student', 'S2': 'Student', 'C': 'Course', 'CC': 'CoreCourse',
+    'GS': 'GradeScale', 'GR': 'GraduationRequirement', 'SA': 'StudentAggregate',
+}
+
+_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?\s+(?:AS\s+)?`?(\w+)`?", re.I)
+_ACTUAL_TIME_RE = re.compile(r"actual time=([\d.]+)\.\.([\d.]+)")
+
+class IndexAdvisor:
+    """查询诊断器
+
+    small_table_rows: 扫描行数低于该值的全表扫描视为小表，不报告
+    repeat: 计时时每条语句执行的次数（取最短耗时）
+    """
+
+    def __init__(self, db_manager, small_table_rows=100, repeat=3, analyze=False):
+        self.db = db_manager
+        self.small_table_rows = small_table_rows
+        self.repeat = repeat
+        self.analyze = analyze
+
+    # ========== 截获查询 ==========
+    def capture(self, method_name, args):
+        """调用 DatabaseManager 的方法，返回它执行的 [(sql, params)]"""
+        captured = []
+        db = self.db
+        original_query = db.execute_query
+        original_procedure = db.call_procedure
+
+        def recording_query(query, params=None):
+            captured.append((query, params))
+            return original_query(query, params)
+
+        def recording_procedure(procedure_name, params=None):
+            for statement in self.procedure_statements(procedure_name, original_query):
+                captured.append((statement, None))
+            return original_procedure(procedure_name, params)
+
+        # 关闭结果缓存，保证缓存的查询也经过 execute_query / call_procedure
+        cache = getattr(db, 'query_cache', None)
+        db.query_cache = None
+        db.execute_query = recording_query
+        db.call_procedure = recording_procedure
+        try:
+            getattr(db, method_name)(*args)
+        finally:
+            # 删除实例属性，恢复类上的方法
+            del db.execute_query
+            del db.call_procedure
+            db.query_cache = cache
+        return captured
+
+    def procedure_statements(self, procedure_name, execute_query=None):
+        """取出存储过程体中的 SELECT 语句（CALL 本身无法 EXPLAIN）"""
+        execute_query = execute_query or self.db.execute_query
+        rows = execute_query("""
+            SELECT ROUTINE_DEFINITION AS body FROM information_schema.ROUTINES
+            WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_NAME = %s
+        """, (procedure_name,))
+        if not rows or not rows[0]['body']:
+            return []
+        body = rows[0]['body'].strip()
+        body = re.sub(r"^BEGIN\b", "", body, flags=re.I)
+        body = re.sub(r"\bEND\s*$", "", body, flags=re.I)
+        return [sql for sql in split_sql(body) if re.match(r"\s*SELECT\b", sql, re.I)]
+
+    def sample(self):
+        """为带参数的方法选取样本参数（取中间位置的数据，避免总是命中第一页）"""
+        count = self.db.count_students()
+        students = self.db.execute_query(
+            "SELECT SNo, Dept FROM Student ORDER BY SNo LIMIT 1 OFFSET %s", (max(0, count // 2),))
+        scores = self.db.execute_query("SELECT SNo, CNo, Semester FROM Score ORDER BY SNo, CNo, Semester LIMIT 1")
+        student = students[0] if students else {'SNo': '', 'Dept': ''}
+        score_key = (scores[0]['SNo'], scores[0]['CNo'], scores[0]['Semester']) if scores else None
+        return {'sno': student['SNo'], 'dept': student['Dept'], 'score_key': score_key}
+
+    # ========== 执行计划 ==========
+    def explain(self, query, params=None):
+        """EXPLAIN FORMAT=JSON，返回解析后的计划（失败时返回 None）"""
+        rows = self.db.execute_query("EXPLAIN FORMAT=JSON " + query, params)
+        if not rows:
+            return None
+        return json.loads(list(rows[0].values())[0])
+
+    def explain_analyze(self, query, params=None):
+        """EXPLAIN ANALYZE（MySQL 8.0.18+，会真正执行查询），返回文本计划"""
+        rows = self.db.execute_query("EXPLAIN ANALYZE " + query, params)
+        return list(rows[0].values())[0] if rows else None
+
+    def find_issues(self, plan, query):
+        """在 JSON 计划中查找全表扫描、全索引扫描、文件排序和临时表"""
+        aliases = dict(KNOWN_ALIASES)
+        for table, alias in _ALIAS_RE.findall(query):
+            aliases[alias] = table
+        issues = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                alias = node.get('table_name')
+                if alias and 'access_type' in node:
+                    rows = node.get('rows_examined_per_scan') or 0
+                    table = aliases.get(alias, alias)
+                    if node['access_type'] in ('ALL', 'index') and rows >= self.small_table_rows:
+                        kind = '全表扫描' if node['access_type'] == 'ALL' else '全索引扫描'
+                        issues.append({'type': kind, 'table': table, 'rows': rows,
+                                       'key': node.get('key'), 'condition': node.get('attached_condition')})
+                if node.get('using_filesort'):
+                    issues.append({'type': '文件排序', 'table': None, 'rows': None, 'key': None, 'condition': None})
+                if node.get('using_temporary_table'):
+                    issues.append({'type': '临时表', 'table': None, 'rows': None, 'key': None, 'condition': None})
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(plan)
+        return issues
+
+    def time_query(self, query, params=None):
+        """多次执行，返回最短耗时（秒）"""
+        best = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            self.db.execute_query(query, params)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    # ========== 诊断 ==========
+    def diagnose(self, methods=None):
+        """诊断所有查询方法，返回 [{'method', 'sql', 'params', 'issues', 'tables', 'time', 'analyze'}]"""
+        sample = self.sample()
+        results = []
+        for method_name, make_args in QUERY_METHODS:
+            if methods and method_name not in methods:
+                continue
+            try:
+                captured = self.capture(method_name, make_args(sample))
+            except Exception as e:
+                print(f"{method_name} 执行失败: {e}")
+                continue
+            for query, params in captured:
+                results.append(self.diagnose_query(method_name, query, params))
+        return results
+
+    def diagnose_query(self, method_name, query, params=None):
+        plan = self.explain(query, params)
+        issues = self.find_issues(plan, query) if plan else []
+        result = {
+            'method': method_name,
+            'sql': " ".join(query.split()),
+            'params': params,
+            'issues': issues,
+            'tables': sorted({i['table'] for i in issues if i['table']}),
+            'time': self.time_query(query, params),
+            'analyze': None,
+        }
+        if self.analyze:
+            text = self.explain_analyze(query, params)
+            result['analyze'] = text
+            match = _ACTUAL_TIME_RE.search(text or "")
+            if match:
+                result['actual_ms'] = float(match.group(2))
+        return result
+
+    def suggest(self, results):
+        """根据诊断结果挑选相关的候选索引（已存在同名索引的跳过）"""
+        flagged = set()
+        for result in results:
+            flagged.update(result['tables'])
+        existing = self.existing_indexes()
+        return [c for c in CANDIDATE_INDEXES
+                if c['table'] in flagged and c['name'] not in existing.get(c['table'], {})]
+
+    def existing_indexes(self):
+        """当前库中的索引：{表名: {索引名: [列, ...]}}"""
+        rows = self.db.execute_query("""
+            SELECT TABLE_NAME AS tbl, INDEX_NAME AS idx, COLUMN_NAME AS col, NON_UNIQUE AS non_unique
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """)
+        indexes = {}
+        for row in rows:
+            indexes.setdefault(row['tbl'], {}).setdefault(row['idx'], []).append(row['col'])
+        return indexes
+
+    def redundant_indexes(self):
+        """列是另一个索引前缀的二级索引（可考虑删除，外键所需的除外）"""
+        redundant = []
+        for table, indexes in self.existing_indexes().items():
+            for name, columns in indexes.items():
+                if name == 'PRIMARY':
+                    continue
+                for other, other_columns in indexes.items():
+                    if other != name and len(other_columns) > len(columns) and other_columns[:len(columns)] == columns:
+                        redundant.append({'table': table, 'index': name, 'columns': columns, 'covered_by': other})
+                        break
+        return redundant
+
+    def try_index(self, candidate, results, keep=False, min_speedup=1.1):
+        """临时创建候选索引，重新计时受影响的查询，再删除（keep=True 且有效时保留）"""
+        affected = [r for r in results if candidate['table'] in r['tables']]
+        if not affected:
+            return None
+        table, name = candidate['table'], candidate['name']
+        if not self.db.execute_update(f"CREATE INDEX {name} ON {table} {candidate['columns']}"):
+            return None
+        self.db.execute_query(f"ANALYZE TABLE {table}")
+        comparisons = []
+        try:
+            for result in affected:
+                after = self.diagnose_query(result['method'], result['sql'], result['params'])
+                comparisons.append({
+                    'method': result['method'],
+                    'before': result['time'],
+                    'after': after['time'],
+                    'issues_before': len(result['issues']),
+                    'issues_after': len(after['issues']),
+                })
+        finally:
+            before_total = sum(c['before'] for c in comparisons)
+            after_total = sum(c['after'] for c in comparisons)
+            speedup = before_total / after_total if after_total else None
+            kept = keep and speedup is not None and speedup >= min_speedup
+            if not kept:
+                self.db.execute_update(f"DROP INDEX {name} ON {table}")
+        return {'candidate': candidate, 'comparisons': comparisons, 'speedup': speedup, 'kept': kept}
+
+def format_report(results, suggestions=(), trials=(), redundant=()):
+    """把诊断结果整理为文本报告"""
+    lines = ["查询诊断报告", "=" * 60]
+    flagged = [r for r in results if r['issues']]
+    lines.append(f"共诊断 {len(results)} 条语句，其中 {len(flagged)} 条存在问题")
+    lines.append("")
+
+    for result in sorted(results, key=lambda r: -r['time']):
+        status = "；".join(
+            f"{i['type']}{'(' + i['table'] + ', 约' + str(i['rows']) + '行)' if i['table'] else ''}"
+            for i in result['issues']) or "正常"
+        lines.append(f"[{result['method']}] {result['time'] * 1000:.1f} ms  {status}")
+        if result['issues']:
+            lines.append(f"    SQL: {result['sql'][:160]}{'...' if len(result['sql']) > 160 else ''}")
+        if result.get('analyze'):
+            first_line = result['analyze'].splitlines()[0]
+            lines.append(f"    ANALYZE: {first_line[:160]}")
+
+    if suggestions:
+        lines += ["", "索引建议", "-" * 60]
+        for candidate in suggestions:
+            lines.append(f"CREATE INDEX {candidate['name']} ON {candidate['table']} {candidate['columns']};")
+            lines.append(f"    -- {candidate['reason']}")
+
+    if trials:
+        lines += ["", "索引试验（前后耗时）", "-" * 60]
+        for trial in trials:
+            candidate = trial['candidate']
+            speedup = f"{trial['speedup']:.2f}x" if trial['speedup'] else "-"
+            lines.append(f"{candidate['table']}.{candidate['name']}: 总体 {speedup}"
+                         f"{'（已保留）' if trial['kept'] else ''}")
+            for c in trial['comparisons']:
+                lines.append(f"    {c['method']}: {c['before'] * 1000:.1f} ms -> {c['after'] * 1000:.1f} ms，"
+                             f"问题 {c['issues_before']} -> {c['issues_after']}")
+
+    if redundant:
+        lines += ["", "冗余索引（是其他索引的前缀）", "-" * 60]
+        for r in redundant:
+            lines.append(f"{r['table']}.{r['index']} ({', '.join(r['columns'])}) 被 {r['covered_by']} 覆盖")
+    return "\n".join(lines)
+
+def main(argv=None):
+    """命令行入口"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="DatabaseManager 查询诊断与索引建议")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default=os.environ.get('AWS_DB_PASSWORD', ''))
+    parser.add_argument('--database', default='AcademicWarningSystem')
+    parser.add_argument('--methods', nargs='*', help="只诊断指定的方法")
+    parser.add_argument('--repeat', type=int, default=3, help="每条语句计时的执行次数")
+    parser.add_argument('--analyze', action='store_true', help="同时运行 EXPLAIN ANALYZE（会真正执行查询）")
+    parser.add_argument('--try-indexes', action='store_true', help="临时创建建议的索引并比较前后耗时")
+    parser.add_argument('--apply', action='store_true', help="与 --try-indexes 同用：保留有效的索引")
+    parser.add_argument('--json', help="把诊断结果另存为 JSON 文件")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager()
+    db.set_config(args.host, args.port, args.user, args.password, args.database)
+    if not db.connect():
+        print("数据库连接失败")
+        return 2
+
+    try:
+        advisor = IndexAdvisor(db, repeat=args.repeat, analyze=args.analyze)
+        results = advisor.diagnose(args.methods)
+        suggestions = advisor.suggest(results)
+        trials = []
+        if args.try_indexes:
+            for candidate in suggestions:
+                trial = advisor.try_index(candidate, results, keep=args.apply)
+                if trial:
+                    trials.append(trial)
+        redundant = advisor.redundant_indexes()
+    finally:
+        db.disconnect()
+
+    print(format_report(results, suggestions, trials, redundant))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'suggestions': suggestions, 'trials': trials, 'redundant': redundant},
+                      f, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+查询结果缓存
+按 (查询, 参数) 缓存结果行，LRU 淘汰，并限制条目数和估算内存占用。
+
+每条缓存记录其依赖表在 DataVersion 表中的版本号（由各表触发器递增），
+读取时版本不一致即视为失效，因此其他客户端写入成绩后缓存也不会返回旧数据。
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+# 外键级联删除/更新不会触发子表上的触发器，依赖子表的查询也要依赖其父表的版本
+CASCADE_PARENTS = {
+    'Score': ('Student', 'Course'),
+    'CoreCourse': ('Course',),
+}
+
+# 估算大结果集内存占用时抽样的行数
+SIZE_SAMPLE_ROWS = 200
+
+def expand_tables(tables):
+    """补上级联父表，返回排序后的表名元组"""
+    expanded = set(tables)
+    for table in tables:
+        expanded.update(CASCADE_PARENTS.get(table, ()))
+    return tuple(sorted(expanded))
+
+def estimate_size(rows):
+    """估算结果行占用的内存（字节），行数多时按前若干行抽样推算"""
+    size = sys.getsizeof(rows)
+    if not rows:
+        return size
+    sample = rows[:SIZE_SAMPLE_ROWS]
+    sample_size = 0
+    for row in sample:
+        sample_size += sys.getsizeof(row)
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            sample_size += sys.getsizeof(value)
+    return size + sample_size * len(rows) // len(sample)
+
+def copy_rows(rows):
+    """浅拷贝每一行，调用方修改返回的行不会影响缓存"""
+    return [row.copy() if isinstance(row, dict) else row for row in rows]
+
+class QueryCache:
+    """带版本校验的 LRU 结果缓存（线程安全）
+
+    max_entries: 最多缓存的结果数
+    max_bytes: 所有结果估算内存占用的上限，单个结果超过上限时不缓存
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, versions):
+        """版本一致时返回结果行的拷贝，否则返回 None（过期的记录同时被删除）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != versions:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            rows = entry[1]
+        return copy_rows(rows)
+
+    def put(self, key, versions, rows):
+        """保存结果（保存的是拷贝）"""
+        size = estimate_size(rows)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        rows = copy_rows(rows)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (versions, rows, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """命中/未命中/淘汰次数及当前占用"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
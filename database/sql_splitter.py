@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SQL脚本语句分割器
+逐行读入脚本并切分出完整语句，不需要把整个文件读进内存：
+- 支持 DELIMITER 切换为任意分隔符（$$、//、;; 等）
+- 引号（'、"、`）内的分号和分隔符不会被当作语句结束，支持反斜杠转义和双写引号
+- 去掉 -- 和 # 行注释；/* */ 块注释原样保留（/*! ... */ 是可执行注释）
+"""
+
+import re
+
+_QUOTE_END = {
+    "'": re.compile(r"\\.|''|'", re.S),
+    '"': re.compile(r'\\.|""|"', re.S),
+    '`': re.compile(r"``|`"),
+}
+
+_DML_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+class SQLStatement:
+    """切分出的一条语句"""
+
+    __slots__ = ('index', 'sql', 'line', 'keyword')
+
+    def __init__(self, index, sql, line):
+        self.index = index
+        self.sql = sql
+        self.line = line
+        # 语句首个关键字（大写），用于区分 DML / DDL / 查询
+        match = re.match(r"\s*(?:/\*.*?\*/\s*)*([A-Za-z]+)", sql, re.S)
+        self.keyword = match.group(1).upper() if match else ''
+
+    @property
+    def is_dml(self):
+        return self.keyword in _DML_KEYWORDS
+
+    def preview(self, length=200):
+        return self.sql[:length] + ("..." if len(self.sql) > length else "")
+
+class SQLSplitter:
+    """增量语句分割器：feed(line) 返回该行结束的语句列表，finish() 返回剩余的语句"""
+
+    def __init__(self, delimiter=";"):
+        self.delimiter = delimiter
+        self._token_re = None
+        self._parts = []
+        # 当前语句是否已有非空白内容（不必每行重新拼接 _parts 判断）
+        self._has_content = False
+        self._quote = None
+        self._in_block_comment = False
+        self._line_no = 0
+        self._start_line = None
+        self._count = 0
+        self._compile()
+
+    def _compile(self):
+        self._token_re = re.compile("|".join([r"'", r'"', r"`", r"--", r"#", r"/\*", re.escape(self.delimiter)]))
+
+    def _append(self, text):
+        if text:
+            if not self._has_content and text.strip():
+                self._has_content = True
+                self._start_line = self._line_no
+            self._parts.append(text)
+
+    def _emit(self, statements):
+        sql = "".join(self._parts).strip()
+        if sql:
+            statements.append(SQLStatement(self._count, sql, self._start_line))
+            self._count += 1
+        self._parts = []
+        self._has_content = False
+        self._start_line = None
+
+    def _at_statement_start(self):
+        return self._quote is None and not self._in_block_comment and not self._has_content
+
+    def feed(self, line):
+        """读入一行（可带换行符），返回在这一行内结束的语句"""
+        self._line_no += 1
+        statements = []
+
+        # DELIMITER 是客户端命令，只在语句开头出现
+        if self._at_statement_start():
+            # 关键字后可以是任意空白（空格、制表符）
+            words = line.split()
+            if words and words[0].upper() == "DELIMITER":
+                if len(words) >= 2:
+                    self.delimiter = words[1]
+                    self._compile()
+                return statements
+
+        pos = 0
+        length = len(line)
+        while pos < length:
+            if self._quote is not None:
+                end = None
+                for match in _QUOTE_END[self._quote].finditer(line, pos):
+                    if match.group() == self._quote:
+                        end = match.end()
+                        break
+                if end is None:
+                    self._append(line[pos:])
+                    return statements
+                self._append(line[pos:end])
+                self._quote = None
+                pos = end
+                continue
+
+            if self._in_block_comment:
+                end = line.find("*/", pos)
+                if end < 0:
+                    self._append(line[pos:])
+                    return statements
+                self._append(line[pos:end + 2])
+                self._in_block_comment = False
+                pos = end + 2
+                continue
+
+            match = self._token_re.search(line, pos)
+            if match is None:
+                self._append(line[pos:])
+                break
+            token = match.group()
+            start, end = match.start(), match.end()
+
+            if token in _QUOTE_END:
+                self._append(line[pos:end])
+                self._quote = token
+                pos = end
+            elif token == "/*":
+                self._append(line[pos:end])
+                self._in_block_comment = True
+                pos = end
+            elif token == "--" and end < length and line[end] not in " \t\r\n":
+                # MySQL 中 "--" 后必须跟空白才是注释，否则是两个减号
+                self._append(line[pos:end])
+                pos = end
+            elif token in ("--", "#"):
+                self._append(line[pos:start] + "\n")
+                break
+            else:
+                self._append(line[pos:start])
+                self._emit(statements)
+                pos = end
+        return statements
+
+    def finish(self):
+        """文件结束：返回最后一条没有分隔符结尾的语句"""
+        statements = []
+        self._emit(statements)
+        return statements
+
+def iter_statements(lines, delimiter=";"):
+    """从行迭代器中逐条产出 SQLStatement"""
+    splitter = SQLSplitter(delimiter)
+    for line in lines:
+        for statement in splitter.feed(line):
+            yield statement
+    for statement in splitter.finish():
+        yield statement
+
+def split_sql(script, delimiter=";"):
+    """把整段 SQL 文本切分为语句字符串列表"""
+    return [s.sql for s in iter_statements(script.splitlines(True), delimiter)]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量导入对话框
+"""
+
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+class BulkImportDialog:
+    """批量导入对话框（成绩 / 学生 / 课程）"""
+    
+    def __init__(self, parent, db_manager, task_runner, kind):
+        from database.bulk_import import IMPORT_SPECS
+        
+        self.db_manager = db_manager
+        self.task_runner = task_runner
+        self.kind = kind
+        self.name = IMPORT_SPECS[kind]['name']
+        self.headers = IMPORT_SPECS[kind]['headers']
+        self.cancel_event = None
+        self.running = False
+        self.closed = False
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"批量导入{self.name}")
+        self.dialog.geometry("520x260")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (520 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (260 // 2)
+        self.dialog.geometry(f"520x260+{x}+{y}")
+        
+        self.create_widgets()
+    
+    def create_widgets(self):
+        """创建控件"""
+        ttk.Label(self.dialog, text="文件:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
+        self.file_entry = ttk.Entry(self.dialog, width=40)
+        self.file_entry.grid(row=0, column=1, padx=5, pady=10)
+        ttk.Button(self.dialog, text="浏览", command=self.browse, width=8).grid(row=0, column=2, padx=5, pady=10)
+        
+        ttk.Label(self.dialog, text="每批行数:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
+        self.chunk_entry = ttk.Entry(self.dialog, width=12)
+        self.chunk_entry.grid(row=1, column=1, padx=5, pady=10, sticky=tk.W)
+        self.chunk_entry.insert(0, "5000")
+        
+        ttk.Label(self.dialog, text=f"表头: {'、'.join(self.headers)}（支持 CSV / XLSX）",
+                  foreground="gray").grid(row=2, column=0, columnspan=3, padx=10, sticky=tk.W)
+        
+        self.progress_label = ttk.Label(self.dialog, text="")
+        self.progress_label.grid(row=3, column=0, columnspan=3, padx=10, pady=10, sticky=tk.W)
+        
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.grid(row=4, column=0, columnspan=3, pady=15)
+        
+        self.start_button = ttk.Button(button_frame, text="开始导入", command=self.start, width=12)
+        self.start_button.pack(side=tk.LEFT, padx=10)
+        self.close_button = ttk.Button(button_frame, text="关闭", command=self.close, width=12)
+        self.close_button.pack(side=tk.LEFT, padx=10)
+    
+    def browse(self):
+        """选择文件"""
+        path = filedialog.askopenfilename(
+            parent=self.dialog,
+            filetypes=[("CSV / Excel", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx"), ("所有文件", "*.*")]
+        )
+        if path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, path)
+    
+    def start(self):
+        """在后台线程中开始导入"""
+        from database.bulk_import import BulkImporter
+        
+        path = self.file_entry.get().strip()
+        if not path:
+            messagebox.showerror("错误", "请选择要导入的文件", parent=self.dialog)
+            return
+        try:
+            chunk_size = int(self.chunk_entry.get().strip())
+            if chunk_size <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("错误", "每批行数必须是正整数", parent=self.dialog)
+            return
+        
+        self.cancel_event = threading.Event()
+        importer = BulkImporter(self.db_manager, self.kind, chunk_size=chunk_size,
+                                progress_callback=self.on_progress, cancel_event=self.cancel_event)
+        self.running = True
+        self.start_button.config(state=tk.DISABLED)
+        self.close_button.config(text="取消")
+        self.progress_label.config(text="正在导入...")
+        self.task_runner.submit(("bulk_import", self.kind), importer.run,
+                                self.on_finished, self.on_error, path)
+    
+    def on_progress(self, processed, imported, rejected):
+        """导入线程中调用，转交主线程更新进度"""
+        self.task_runner.call_soon(self.show_progress, processed, imported, rejected)
+    
+    def show_progress(self, processed, imported, rejected):
+        if self.closed:
+            return
+        self.progress_label.config(text=f"已处理 {processed} 行，导入 {imported} 行，拒绝 {rejected} 行")
+    
+    def on_finished(self, result):
+        """导入完成"""
+        self.running = False
+        if self.closed:
+            return
+        self.start_button.config(state=tk.NORMAL)
+        self.close_button.config(text="关闭")
+        summary = f"共 {result['processed']} 行，成功 {result['imported']} 行，拒绝 {result['rejected']} 行"
+        if result['cancelled']:
+            summary = "导入已取消（已提交的批次保留）\n" + summary
+        if result['reject_file']:
+            summary += f"\n拒绝明细: {result['reject_file']}"
+        self.progress_label.config(text=summary.replace("\n", "  "))
+        messagebox.showinfo("导入完成", summary, parent=self.dialog)
+    
+    def on_error(self, error):
+        """导入失败"""
+        self.running = False
+        if self.closed:
+            return
+        self.start_button.config(state=tk.NORMAL)
+        self.close_button.config(text="关闭")
+        self.progress_label.config(text="导入失败")
+        messagebox.showerror("错误", f"导入失败: {str(error)}", parent=self.dialog)
+    
+    def close(self):
+        """关闭对话框；导入进行中时先请求取消"""
+        if self.running:
+            if not messagebox.askyesno("确认", "导入正在进行，是否在当前批次提交后停止？", parent=self.dialog):
+                return
+            self.cancel_event.set()
+        self.closed = True
+        self.dialog.destroy()
@@ -7,15 +7,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from gui.task_runner import TaskRunner
+from gui.export_dialog import ExportDialog
+
 class CoreCourseManagementFrame(ttk.Frame):
     """核心课程管理框架"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, task_runner=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
         self.create_widgets()
-        # 延迟刷新，等待数据库连接
-        self.after(100, self.refresh_data)
+        # 数据在标签页首次显示时由主窗口加载
     
     def create_widgets(self):
         """创建控件"""
@@ -25,8 +28,13 @@ class CoreCourseManagementFrame(ttk.Frame):
         
         ttk.Button(toolbar, text="添加", command=self.add_core_course).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="删除", command=self.delete_core_course).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="导出", command=self.export_data).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="刷新", command=self.refresh_data).pack(side=tk.LEFT, padx=2)
         
+        # 加载状态
+        self.loading_label = ttk.Label(toolbar, text="")
+        self.loading_label.pack(side=tk.RIGHT, padx=10)
+        
         # 表格
         tree_frame = ttk.Frame(self)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -45,19 +53,38 @@ class CoreCourseManagementFrame(ttk.Frame):
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     
     def refresh_data(self):
-        """刷新数据"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
+        """刷新数据（在后台线程中查询）"""
         if not self.db_manager.connection or not self.db_manager.cursor:
+            self.task_runner.cancel("core_courses")
+            self.populate(([], {}))
             return
         
+        self.loading_label.config(text="加载中...")
+        self.task_runner.submit("core_courses", self.load_data,
+                                self.populate, self.on_load_error)
+    
+    def load_data(self):
+        """后台线程：获取核心课程及课程名"""
         core_courses = self.db_manager.get_core_courses()
+        course_dict = {}
+        if core_courses:
+            # 课程名取自维度缓存
+            dimensions = self.db_manager.dimensions
+            for cc in core_courses:
+                course = dimensions.course(cc.get('CNo'))
+                if course:
+                    course_dict[course['CNo']] = course.get('CName')
+        return core_courses, course_dict
+    
+    def populate(self, data):
+        """在主线程中填充表格"""
+        core_courses, course_dict = data
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.loading_label.config(text="")
+        self.event_generate("<<DataLoaded>>")
+        
         if core_courses:
-            # 获取课程信息
-            courses = self.db_manager.get_all_courses()
-            course_dict = {c.get('CNo'): c.get('CName') for c in courses}
-            
             for cc in core_courses:
                 cno = cc.get('CNo', '')
                 self.tree.insert("", tk.END, values=(
@@ -66,6 +93,11 @@ class CoreCourseManagementFrame(ttk.Frame):
                     course_dict.get(cno, '未知课程')
                 ))
     
+    def on_load_error(self, error):
+        """后台加载失败"""
+        self.loading_label.config(text="加载失败")
+        print(f"核心课程数据加载失败: {error}")
+    
     def add_core_course(self):
         """添加核心课程"""
         if not self.db_manager.connection or not self.db_manager.cursor:
@@ -95,6 +127,14 @@ class CoreCourseManagementFrame(ttk.Frame):
                 self.refresh_data()
             else:
                 messagebox.showerror("错误", "删除失败")
+    
+    def export_data(self):
+        """导出全部核心课程（CSV / XLSX / Parquet）"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = ExportDialog(self, self.db_manager, self.task_runner, "core_courses")
+        self.wait_window(dialog.dialog)
 
 class CoreCourseDialog:
     """核心课程对话框"""
@@ -117,16 +157,15 @@ class CoreCourseDialog:
     def create_widgets(self):
         """创建控件"""
         # 获取所有院系
-        students = self.db_manager.get_all_students()
-        depts = list(set([s.get('Dept', '') for s in students if s.get('Dept')]))
+        dimensions = self.db_manager.dimensions
+        depts = dimensions.departments()
         
         ttk.Label(self.dialog, text="院系:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
         self.dept_combo = ttk.Combobox(self.dialog, width=22, values=depts)
         self.dept_combo.grid(row=0, column=1, padx=10, pady=10)
         
         # 获取所有课程
-        courses = self.db_manager.get_all_courses()
-        course_list = [f"{c.get('CNo')} - {c.get('CName')}" for c in courses]
+        course_list = dimensions.course_labels()
         
         ttk.Label(self.dialog, text="课程:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
         self.course_combo = ttk.Combobox(self.dialog, width=22, values=course_list, state="readonly")
@@ -5,17 +5,22 @@
 """
 
 import tkinter as tk
+from bisect import bisect_left
 from tkinter import ttk, messagebox
 
+from gui.task_runner import TaskRunner
+from gui.export_dialog import ExportDialog
+from gui.bulk_import_dialog import BulkImportDialog
+
 class CourseManagementFrame(ttk.Frame):
     """课程管理框架"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, task_runner=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
         self.create_widgets()
-        # 延迟刷新，等待数据库连接
-        self.after(100, self.refresh_data)
+        # 数据在标签页首次显示时由主窗口加载
     
     def create_widgets(self):
         """创建控件"""
@@ -26,8 +31,14 @@ class CourseManagementFrame(ttk.Frame):
         ttk.Button(toolbar, text="添加", command=self.add_course).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="修改", command=self.edit_course).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="删除", command=self.delete_course).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="批量导入", command=self.import_data).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="导出", command=self.export_data).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="刷新", command=self.refresh_data).pack(side=tk.LEFT, padx=2)
         
+        # 加载状态
+        self.loading_label = ttk.Label(toolbar, text="")
+        self.loading_label.pack(side=tk.RIGHT, padx=10)
+        
         # 表格
         tree_frame = ttk.Frame(self)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -46,23 +57,56 @@ class CourseManagementFrame(ttk.Frame):
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     
     def refresh_data(self):
-        """刷新数据"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
+        """刷新数据（在后台线程中查询）"""
         # 检查数据库连接
         if not self.db_manager.connection or not self.db_manager.cursor:
+            self.task_runner.cancel("courses")
+            self.populate([])
             return
         
-        courses = self.db_manager.get_all_courses()
+        self.loading_label.config(text="加载中...")
+        self.task_runner.submit("courses", self.db_manager.get_all_courses,
+                                self.populate, self.on_load_error)
+    
+    def populate(self, courses):
+        """在主线程中填充表格"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.loading_label.config(text="")
+        self.event_generate("<<DataLoaded>>")
+        
         if courses:
             for course in courses:
-                self.tree.insert("", tk.END, values=(
-                    course.get('CNo', ''),
-                    course.get('CName', ''),
-                    course.get('Credit', 0),
-                    course.get('CourseType', '')
-                ))
+                # 以课程号作为 iid，变更通知可直接定位到行
+                self.tree.insert("", tk.END, iid=course['CNo'], values=self.format_row(course))
+    
+    def format_row(self, course):
+        return (
+            course.get('CNo', ''),
+            course.get('CName', ''),
+            course.get('Credit', 0),
+            course.get('CourseType', '')
+        )
+    
+    def apply_change(self, change):
+        """根据 DatabaseManager 的变更通知局部更新表格（在主线程中调用）"""
+        if change['table'] != 'Course':
+            return
+        cno = change['key']
+        if change['action'] == 'delete':
+            if self.tree.exists(cno):
+                self.tree.delete(cno)
+        elif self.tree.exists(cno):
+            self.tree.item(cno, values=self.format_row(change['values']))
+        else:
+            # 按课程号顺序插入（与 get_all_courses 的排序一致）
+            index = bisect_left(self.tree.get_children(), cno)
+            self.tree.insert("", index, iid=cno, values=self.format_row(change['values']))
+    
+    def on_load_error(self, error):
+        """后台加载失败"""
+        self.loading_label.config(text="加载失败")
+        print(f"课程数据加载失败: {error}")
     
     def add_course(self):
         """添加课程"""
@@ -71,6 +115,14 @@ class CourseManagementFrame(ttk.Frame):
             return
         dialog = CourseDialog(self, self.db_manager)
         self.wait_window(dialog.dialog)
+    
+    def import_data(self):
+        """从 CSV/XLSX 批量导入课程"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = BulkImportDialog(self, self.db_manager, self.task_runner, "courses")
+        self.wait_window(dialog.dialog)
         self.refresh_data()
     
     def edit_course(self):
@@ -86,11 +138,11 @@ class CourseManagementFrame(ttk.Frame):
         item = self.tree.item(selection[0])
         values = item['values']
         
+        # iid 即课程号（values 中数字样式的课程号会被转换成整数）
         dialog = CourseDialog(self, self.db_manager,
-                             cno=values[0], cname=values[1],
+                             cno=selection[0], cname=values[1],
                              credit=values[2], course_type=values[3])
         self.wait_window(dialog.dialog)
-        self.refresh_data()
     
     def delete_course(self):
         """删除课程"""
@@ -103,15 +155,22 @@ class CourseManagementFrame(ttk.Frame):
             return
         
         item = self.tree.item(selection[0])
-        cno = item['values'][0]
+        cno = selection[0]
         cname = item['values'][1]
         
         if messagebox.askyesno("确认", f"确定要删除课程 {cname} ({cno}) 吗？\n这将同时删除所有相关成绩记录！"):
             if self.db_manager.delete_course(cno):
                 messagebox.showinfo("成功", "删除成功")
-                self.refresh_data()
             else:
                 messagebox.showerror("错误", "删除失败")
+    
+    def export_data(self):
+        """导出全部课程（CSV / XLSX / Parquet）"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = ExportDialog(self, self.db_manager, self.task_runner, "courses")
+        self.wait_window(dialog.dialog)
 
 class CourseDialog:
     """课程信息对话框"""
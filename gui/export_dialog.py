@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+导出对话框
+"""
+
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+class ExportDialog:
+    """导出对话框（查询结果 / 管理表格 -> CSV / XLSX / Parquet）"""
+    
+    def __init__(self, parent, db_manager, task_runner, source):
+        from database.exporter import EXPORT_SOURCES
+        
+        self.db_manager = db_manager
+        self.task_runner = task_runner
+        self.source = source
+        self.label = EXPORT_SOURCES[source]['label']
+        self.cancel_event = None
+        self.running = False
+        self.closed = False
+        
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"导出{self.label}")
+        self.dialog.geometry("520x240")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (520 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (240 // 2)
+        self.dialog.geometry(f"520x240+{x}+{y}")
+        
+        self.create_widgets()
+    
+    def create_widgets(self):
+        """创建控件"""
+        ttk.Label(self.dialog, text="文件:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
+        self.file_entry = ttk.Entry(self.dialog, width=40)
+        self.file_entry.grid(row=0, column=1, padx=5, pady=10)
+        ttk.Button(self.dialog, text="浏览", command=self.browse, width=8).grid(row=0, column=2, padx=5, pady=10)
+        
+        ttk.Label(self.dialog, text="每批行数:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
+        self.batch_entry = ttk.Entry(self.dialog, width=12)
+        self.batch_entry.grid(row=1, column=1, padx=5, pady=10, sticky=tk.W)
+        self.batch_entry.insert(0, "5000")
+        
+        ttk.Label(self.dialog, text="格式由扩展名决定：.csv / .xlsx / .parquet",
+                  foreground="gray").grid(row=2, column=0, columnspan=3, padx=10, sticky=tk.W)
+        
+        self.progress_label = ttk.Label(self.dialog, text="")
+        self.progress_label.grid(row=3, column=0, columnspan=3, padx=10, pady=10, sticky=tk.W)
+        
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.grid(row=4, column=0, columnspan=3, pady=15)
+        
+        self.start_button = ttk.Button(button_frame, text="开始导出", command=self.start, width=12)
+        self.start_button.pack(side=tk.LEFT, padx=10)
+        self.close_button = ttk.Button(button_frame, text="关闭", command=self.close, width=12)
+        self.close_button.pack(side=tk.LEFT, padx=10)
+    
+    def browse(self):
+        """选择保存位置"""
+        path = filedialog.asksaveasfilename(
+            parent=self.dialog,
+            initialfile=f"{self.label}.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("Excel", "*.xlsx"), ("Parquet", "*.parquet")]
+        )
+        if path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, path)
+    
+    def start(self):
+        """在后台线程中开始导出"""
+        from database.exporter import export_source, format_for_path
+        
+        path = self.file_entry.get().strip()
+        if not path:
+            messagebox.showerror("错误", "请选择导出文件", parent=self.dialog)
+            return
+        try:
+            format_for_path(path)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e), parent=self.dialog)
+            return
+        try:
+            batch_size = int(self.batch_entry.get().strip())
+            if batch_size <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("错误", "每批行数必须是正整数", parent=self.dialog)
+            return
+        if os.path.exists(path) and not messagebox.askyesno("确认", f"{path} 已存在，是否覆盖？", parent=self.dialog):
+            return
+        
+        self.cancel_event = threading.Event()
+        self.running = True
+        self.start_button.config(state=tk.DISABLED)
+        self.close_button.config(text="取消")
+        self.progress_label.config(text="正在导出...")
+        self.task_runner.submit(("export", self.source), export_source,
+                                self.on_finished, self.on_error,
+                                self.db_manager, self.source, path, None, batch_size,
+                                self.on_progress, self.cancel_event)
+    
+    def on_progress(self, written):
+        """导出线程中调用，转交主线程更新进度"""
+        self.task_runner.call_soon(self.show_progress, written)
+    
+    def show_progress(self, written):
+        if self.closed:
+            return
+        self.progress_label.config(text=f"已导出 {written} 行")
+    
+    def on_finished(self, result):
+        """导出完成"""
+        self.running = False
+        if self.closed:
+            return
+        self.start_button.config(state=tk.NORMAL)
+        self.close_button.config(text="关闭")
+        if result['cancelled']:
+            self.progress_label.config(text="导出已取消")
+            return
+        summary = f"共 {result['rows']} 行，已写入 {result['path']}"
+        self.progress_label.config(text=f"共 {result['rows']} 行")
+        messagebox.showinfo("导出完成", summary, parent=self.dialog)
+    
+    def on_error(self, error):
+        """导出失败"""
+        self.running = False
+        if self.closed:
+            return
+        self.start_button.config(state=tk.NORMAL)
+        self.close_button.config(text="关闭")
+        self.progress_label.config(text="导出失败")
+        messagebox.showerror("错误", f"导出失败: {str(error)}", parent=self.dialog)
+    
+    def close(self):
+        """关闭对话框；导出进行中时先请求取消"""
+        if self.running:
+            if not messagebox.askyesno("确认", "导出正在进行，是否取消导出？", parent=self.dialog):
+                return
+            self.cancel_event.set()
+        self.closed = True
+        self.dialog.destroy()
@@ -7,15 +7,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from gui.task_runner import TaskRunner
+from gui.export_dialog import ExportDialog
+
 class GraduationRequirementManagementFrame(ttk.Frame):
     """毕业要求管理框架"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, task_runner=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
         self.create_widgets()
-        # 延迟刷新，等待数据库连接
-        self.after(100, self.refresh_data)
+        # 数据在标签页首次显示时由主窗口加载
     
     def create_widgets(self):
         """创建控件"""
@@ -26,8 +29,13 @@ class GraduationRequirementManagementFrame(ttk.Frame):
         ttk.Button(toolbar, text="添加", command=self.add_requirement).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="修改", command=self.edit_requirement).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="删除", command=self.delete_requirement).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="导出", command=self.export_data).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="刷新", command=self.refresh_data).pack(side=tk.LEFT, padx=2)
         
+        # 加载状态
+        self.loading_label = ttk.Label(toolbar, text="")
+        self.loading_label.pack(side=tk.RIGHT, padx=10)
+        
         # 表格
         tree_frame = ttk.Frame(self)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -46,14 +54,23 @@ class GraduationRequirementManagementFrame(ttk.Frame):
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     
     def refresh_data(self):
-        """刷新数据"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
+        """刷新数据（在后台线程中查询）"""
         if not self.db_manager.connection or not self.db_manager.cursor:
+            self.task_runner.cancel("graduation_requirements")
+            self.populate([])
             return
         
-        requirements = self.db_manager.get_graduation_requirements()
+        self.loading_label.config(text="加载中...")
+        self.task_runner.submit("graduation_requirements", self.db_manager.get_graduation_requirements,
+                                self.populate, self.on_load_error)
+    
+    def populate(self, requirements):
+        """在主线程中填充表格"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.loading_label.config(text="")
+        self.event_generate("<<DataLoaded>>")
+        
         if requirements:
             for req in requirements:
                 self.tree.insert("", tk.END, values=(
@@ -63,6 +80,11 @@ class GraduationRequirementManagementFrame(ttk.Frame):
                     req.get('MinGPA', 0)
                 ))
     
+    def on_load_error(self, error):
+        """后台加载失败"""
+        self.loading_label.config(text="加载失败")
+        print(f"毕业要求数据加载失败: {error}")
+    
     def add_requirement(self):
         """添加毕业要求"""
         if not self.db_manager.connection or not self.db_manager.cursor:
@@ -112,6 +134,14 @@ class GraduationRequirementManagementFrame(ttk.Frame):
                 self.refresh_data()
             else:
                 messagebox.showerror("错误", "删除失败")
+    
+    def export_data(self):
+        """导出全部毕业要求（CSV / XLSX / Parquet）"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = ExportDialog(self, self.db_manager, self.task_runner, "graduation_requirements")
+        self.wait_window(dialog.dialog)
 
 class GraduationRequirementDialog:
     """毕业要求对话框"""
@@ -5,14 +5,16 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, scrolledtext
 import sys
 import os
+import threading
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.db_manager import DatabaseManager
+from database.change_feed import ChangeFeed
 from gui.connection_dialog import ConnectionDialog
 from gui.student_management import StudentManagementFrame
 from gui.course_management import CourseManagementFrame
@@ -20,24 +22,41 @@ from gui.score_management import ScoreManagementFrame
 from gui.graduation_requirement_management import GraduationRequirementManagementFrame
 from gui.core_course_management import CoreCourseManagementFrame
 from gui.query_frame import QueryFrame
+from gui.task_runner import TaskRunner
+
+# 读取其他客户端变更的间隔（毫秒）
+CHANGE_POLL_INTERVAL = 2000
 
 class MainWindow:
     """主窗口类"""
     
-    def __init__(self, root):
+    def __init__(self, root, startup_timer=None):
         self.root = root
+        self.startup_timer = startup_timer
         self.root.title("大学生学业预警与成绩分析系统")
         self.root.geometry("1200x700")
         
-        self.db_manager = DatabaseManager()
+        # 连接池供后台任务使用，使各标签页的查询可以并行执行
+        self.db_manager = DatabaseManager(pool_size=4)
         self.connected = False
+        # 初始化数据库进行中时为取消事件
+        self.init_cancel = None
+        # 后台任务执行器，所有标签页共享
+        self.task_runner = TaskRunner(self.root, max_workers=4)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # 本客户端的增删改通过变更通知局部更新表格，不再整表刷新
+        self.db_manager.add_change_listener(self.on_data_changed)
+        # 其他客户端的增删改从变更日志中读取，同样局部更新
+        self.change_feed = ChangeFeed(self.db_manager)
         
         self.create_menu()
         self.create_toolbar()
         self.create_notebook()
+        self.mark_startup('window_ready')
         
-        # 检查数据库连接
+        # 在后台连接数据库，窗口不必等待连接完成
         self.check_connection()
+        self.root.after(CHANGE_POLL_INTERVAL, self.poll_changes)
     
     def create_menu(self):
         """创建菜单栏"""
@@ -49,8 +68,10 @@ class MainWindow:
         menubar.add_cascade(label="文件", menu=file_menu)
         file_menu.add_command(label="数据库连接", command=self.show_connection_dialog)
         file_menu.add_command(label="初始化数据库", command=self.initialize_database)
+        file_menu.add_command(label="校验成绩汇总表", command=self.verify_student_aggregate)
+        file_menu.add_command(label="查询诊断报告", command=self.show_query_diagnostics)
         file_menu.add_separator()
-        file_menu.add_command(label="退出", command=self.root.quit)
+        file_menu.add_command(label="退出", command=self.on_close)
         
         # 帮助菜单
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -63,7 +84,8 @@ class MainWindow:
         toolbar.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
         
         ttk.Button(toolbar, text="连接数据库", command=self.show_connection_dialog).pack(side=tk.LEFT, padx=2)
-        ttk.Button(toolbar, text="初始化数据库", command=self.initialize_database).pack(side=tk.LEFT, padx=2)
+        self.init_button = ttk.Button(toolbar, text="初始化数据库", command=self.initialize_database)
+        self.init_button.pack(side=tk.LEFT, padx=2)
         ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=5)
         
         self.status_label = ttk.Label(toolbar, text="未连接", foreground="red")
@@ -75,39 +97,82 @@ class MainWindow:
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # 学生管理
-        self.student_frame = StudentManagementFrame(self.notebook, self.db_manager)
+        self.student_frame = StudentManagementFrame(self.notebook, self.db_manager, self.task_runner)
         self.notebook.add(self.student_frame, text="学生管理")
         
         # 课程管理
-        self.course_frame = CourseManagementFrame(self.notebook, self.db_manager)
+        self.course_frame = CourseManagementFrame(self.notebook, self.db_manager, self.task_runner)
         self.notebook.add(self.course_frame, text="课程管理")
         
         # 成绩管理
-        self.score_frame = ScoreManagementFrame(self.notebook, self.db_manager)
+        self.score_frame = ScoreManagementFrame(self.notebook, self.db_manager, self.task_runner)
         self.notebook.add(self.score_frame, text="成绩管理")
         
         # 毕业要求管理
-        self.graduation_frame = GraduationRequirementManagementFrame(self.notebook, self.db_manager)
+        self.graduation_frame = GraduationRequirementManagementFrame(self.notebook, self.db_manager, self.task_runner)
         self.notebook.add(self.graduation_frame, text="毕业要求")
         
         # 核心课程管理
-        self.core_course_frame = CoreCourseManagementFrame(self.notebook, self.db_manager)
+        self.core_course_frame = CoreCourseManagementFrame(self.notebook, self.db_manager, self.task_runner)
         self.notebook.add(self.core_course_frame, text="核心课程")
         
         # 查询分析
-        self.query_frame = QueryFrame(self.notebook, self.db_manager)
+        self.query_frame = QueryFrame(self.notebook, self.db_manager, self.task_runner)
         self.notebook.add(self.query_frame, text="查询分析")
+        
+        # 各标签页依赖的表：未显示的标签页在这些表变化后标记为过期，切换到它时才刷新
+        self.tab_tables = {
+            self.student_frame: ('Student', 'Score', 'Course'),
+            self.course_frame: ('Course',),
+            self.score_frame: ('Score', 'Student', 'Course'),
+            self.graduation_frame: ('GraduationRequirement',),
+            self.core_course_frame: ('CoreCourse', 'Course'),
+            self.query_frame: ('Student', 'Score', 'Course', 'CoreCourse', 'GraduationRequirement', 'GradeScale'),
+        }
+        self.stale_tabs = set(self.tab_tables)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        for frame in self.tab_tables:
+            frame.bind("<<DataLoaded>>", self.on_tab_loaded)
     
     def check_connection(self):
-        """检查数据库连接"""
-        if self.db_manager.connect():
+        """在后台（重新）连接数据库，完成后更新状态并加载当前标签页"""
+        self.connected = False
+        self.status_label.config(text="正在连接...", foreground="blue")
+        self.task_runner.submit("connect", self.db_manager.connect,
+                                self.on_connected, self.on_connect_error)
+    
+    def on_connected(self, ok):
+        """连接完成（主线程）"""
+        if ok:
+            self.mark_startup('connected')
             self.connected = True
             self.status_label.config(text="已连接", foreground="green")
-            # 连接成功后自动刷新所有标签页
+            # 可能换了数据库，变更日志从最新位置重新读取
+            self.change_feed.restart()
+            # 连接成功后所有标签页标记为过期，只加载当前显示的标签页
             self.refresh_all_tabs()
         else:
             self.connected = False
             self.status_label.config(text="未连接", foreground="red")
+            self.mark_startup('connect_failed')
+            self.finish_startup()
+    
+    def on_connect_error(self, error):
+        print(f"数据库连接错误: {error}")
+        self.on_connected(False)
+    
+    def on_tab_loaded(self, event=None):
+        """某个标签页的数据加载完成"""
+        self.mark_startup('first_data')
+        self.finish_startup()
+    
+    def mark_startup(self, stage):
+        if self.startup_timer:
+            self.startup_timer.mark(stage)
+    
+    def finish_startup(self):
+        if self.startup_timer:
+            self.startup_timer.finish()
     
     def show_connection_dialog(self):
         """显示连接对话框"""
@@ -116,7 +181,11 @@ class MainWindow:
         self.check_connection()
     
     def initialize_database(self):
-        """初始化数据库"""
+        """在后台初始化数据库；进行中再次调用时请求取消"""
+        if self.init_cancel is not None:
+            if messagebox.askyesno("确认", "数据库正在初始化，是否取消？\n已执行的语句会保留，下次可从中断处继续"):
+                self.init_cancel.set()
+            return
         if not messagebox.askyesno("确认", "这将重新创建数据库和所有表，现有数据将被删除！\n是否继续？"):
             return
         
@@ -125,50 +194,208 @@ class MainWindow:
             messagebox.showerror("错误", f"找不到SQL文件: {sql_file}")
             return
         
-        if self.db_manager.initialize_database(sql_file):
+        # 上次初始化中断时可以从已提交的位置继续
+        resume = os.path.exists(sql_file + ".checkpoint") and \
+            messagebox.askyesno("继续初始化", "上次初始化未完成，是否从中断处继续？\n选择“否”将从头执行")
+        
+        # 初始化期间暂停标签页加载和变更日志轮询
+        self.connected = False
+        self.init_cancel = threading.Event()
+        self.init_button.config(text="取消初始化")
+        self.status_label.config(text="正在初始化数据库...", foreground="blue")
+        self.task_runner.submit("initialize_database", self.db_manager.initialize_database,
+                                self.on_initialized, self.on_initialize_error,
+                                sql_file, batch_size=1000, progress_callback=self.on_initialize_progress,
+                                resume=resume, cancel_event=self.init_cancel)
+    
+    def on_initialize_progress(self, done, bytes_read, total_bytes):
+        """初始化线程中调用，转交主线程更新进度"""
+        self.task_runner.call_soon(self.show_initialize_progress, done, bytes_read, total_bytes)
+    
+    def show_initialize_progress(self, done, bytes_read, total_bytes):
+        if self.init_cancel is None:
+            return
+        percent = bytes_read * 100 // total_bytes if total_bytes else 100
+        self.status_label.config(text=f"正在初始化数据库... {percent}%（{done} 条语句）", foreground="blue")
+    
+    def on_initialized(self, ok):
+        """初始化结束（主线程）"""
+        cancelled = self.init_cancel.is_set()
+        self.init_cancel = None
+        self.init_button.config(text="初始化数据库")
+        # 重新连接后所有标签页标记为过期，并加载当前标签页
+        self.check_connection()
+        if ok:
             messagebox.showinfo("成功", "数据库初始化成功！")
-            self.check_connection()
-            # 初始化后自动刷新所有标签页
-            self.refresh_all_tabs()
+        elif cancelled:
+            messagebox.showinfo("已取消", "数据库初始化已取消，下次初始化时可从中断处继续")
         else:
             messagebox.showerror("错误", "数据库初始化失败，请检查控制台输出")
     
+    def on_initialize_error(self, error):
+        print(f"初始化数据库错误: {error}")
+        self.on_initialized(False)
+    
+    def verify_student_aggregate(self):
+        """校验成绩汇总表与视图是否一致，不一致时可选择重建"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        
+        def on_verified(mismatches):
+            if mismatches is None:
+                messagebox.showerror("错误", "校验汇总表时查询失败，请检查控制台输出")
+                return
+            if not mismatches:
+                messagebox.showinfo("校验通过", "成绩汇总表与视图计算结果一致")
+                return
+            if messagebox.askyesno("校验失败", f"有 {len(mismatches)} 名学生的汇总数据与视图不一致，是否重建汇总表？"):
+                self.status_label.config(text="正在重建汇总表...", foreground="blue")
+                self.task_runner.submit("rebuild_aggregate", self.db_manager.rebuild_student_aggregate,
+                                        on_rebuilt, on_rebuild_error)
+        
+        def on_rebuilt(ok):
+            self.status_label.config(text="已连接", foreground="green")
+            if ok:
+                messagebox.showinfo("成功", "成绩汇总表已重建")
+                self.refresh_all_tabs()
+            else:
+                messagebox.showerror("错误", "重建失败，请检查控制台输出")
+        
+        def on_rebuild_error(e):
+            self.status_label.config(text="已连接", foreground="green")
+            messagebox.showerror("错误", f"重建失败: {str(e)}")
+        
+        def on_error(e):
+            messagebox.showerror("错误", f"校验失败: {str(e)}")
+        
+        self.task_runner.submit("verify_aggregate", self.db_manager.verify_student_aggregate,
+                                on_verified, on_error)
+    
+    def show_query_diagnostics(self):
+        """对各查询运行 EXPLAIN，显示全表扫描/文件排序/临时表与索引建议"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        
+        def diagnose():
+            from database.index_advisor import IndexAdvisor, format_report
+            # 诊断时会截获方法调用，使用独立的连接，避免影响界面上的查询
+            db = DatabaseManager()
+            db.config = dict(self.db_manager.config)
+            if not db.connect():
+                raise RuntimeError("无法建立诊断用的数据库连接")
+            try:
+                advisor = IndexAdvisor(db, repeat=1)
+                results = advisor.diagnose()
+                return format_report(results, advisor.suggest(results), redundant=advisor.redundant_indexes())
+            finally:
+                db.disconnect()
+        
+        def on_done(report):
+            self.status_label.config(text="已连接", foreground="green")
+            window = tk.Toplevel(self.root)
+            window.title("查询诊断报告")
+            window.geometry("900x600")
+            text = scrolledtext.ScrolledText(window, wrap=tk.NONE, font=("Consolas", 10))
+            text.pack(fill=tk.BOTH, expand=True)
+            text.insert(tk.END, report)
+            text.config(state=tk.DISABLED)
+        
+        def on_error(e):
+            self.status_label.config(text="已连接", foreground="green")
+            messagebox.showerror("错误", f"查询诊断失败: {str(e)}")
+        
+        self.status_label.config(text="正在诊断查询...", foreground="blue")
+        self.task_runner.submit("query_diagnostics", diagnose, on_done, on_error)
+    
     def refresh_all_tabs(self):
-        """刷新所有标签页"""
+        """所有标签页标记为过期，只立即刷新当前显示的标签页"""
         # 确保数据库已连接
         if not self.db_manager.connection or not self.db_manager.cursor:
             return
         
-        if hasattr(self, 'student_frame'):
-            try:
-                self.student_frame.refresh_data()
-            except Exception as e:
-                print(f"刷新学生管理失败: {e}")
-        if hasattr(self, 'course_frame'):
-            try:
-                self.course_frame.refresh_data()
-            except Exception as e:
-                print(f"刷新课程管理失败: {e}")
-        if hasattr(self, 'score_frame'):
-            try:
-                self.score_frame.refresh_data()
-            except Exception as e:
-                print(f"刷新成绩管理失败: {e}")
-        if hasattr(self, 'graduation_frame'):
-            try:
-                self.graduation_frame.refresh_data()
-            except Exception as e:
-                print(f"刷新毕业要求失败: {e}")
-        if hasattr(self, 'core_course_frame'):
-            try:
-                self.core_course_frame.refresh_data()
-            except Exception as e:
-                print(f"刷新核心课程失败: {e}")
-        if hasattr(self, 'query_frame'):
+        # 其他客户端可能增删了学生或课程，手动刷新时重新加载维度缓存
+        self.db_manager.dimensions.invalidate()
+        self.stale_tabs = set(self.tab_tables)
+        self.refresh_current_tab()
+    
+    def current_tab(self):
+        """当前显示的标签页"""
+        selected = self.notebook.select()
+        return self.notebook.nametowidget(selected) if selected else None
+    
+    def refresh_current_tab(self):
+        """当前标签页过期时刷新"""
+        # 后台连接尚未完成时等连接完成后再加载
+        if not self.connected:
+            return
+        frame = self.current_tab()
+        if frame not in self.stale_tabs:
+            return
+        self.stale_tabs.discard(frame)
+        try:
+            frame.refresh_data()
+        except Exception as e:
+            print(f"刷新{self.notebook.tab(frame, 'text')}失败: {e}")
+    
+    def on_tab_changed(self, event=None):
+        """切换标签页：首次显示或数据已过期时加载"""
+        self.refresh_current_tab()
+    
+    def on_data_changed(self, change):
+        """DatabaseManager 写入成功后的回调（可能在后台线程中），转到主线程处理"""
+        self.task_runner.call_soon(self.dispatch_change, change)
+    
+    def poll_changes(self):
+        """定时在后台读取变更日志"""
+        if self.connected:
+            self.task_runner.submit("change_feed", self.change_feed.poll,
+                                    self.apply_remote_changes, self.on_change_feed_error)
+        self.root.after(CHANGE_POLL_INTERVAL, self.poll_changes)
+    
+    def apply_remote_changes(self, changes):
+        """应用其他客户端的变更；变更无法补齐或有批量导入时整表刷新"""
+        if changes is None or any(c['action'] == 'reload' for c in changes):
+            self.refresh_all_tabs()
+            return
+        for change in changes:
+            self.dispatch_change(change)
+    
+    def on_change_feed_error(self, error):
+        print(f"读取变更日志失败: {error}")
+    
+    def dispatch_change(self, change):
+        """当前标签页局部更新，其他依赖该表的标签页标记为过期"""
+        visible = self.current_tab()
+        for frame, tables in self.tab_tables.items():
+            if change['table'] not in tables or frame in self.stale_tabs:
+                continue
+            if frame is not visible:
+                self.stale_tabs.add(frame)
+                continue
+            # 批量导入由发起写入的界面自行刷新
+            if change['action'] == 'reload':
+                continue
+            if not hasattr(frame, 'apply_change'):
+                # 没有局部更新的标签页在后台重新加载，同一批变更只刷新一次
+                self.stale_tabs.add(frame)
+                self.root.after_idle(self.refresh_current_tab)
+                continue
             try:
-                self.query_frame.refresh_data()
+                frame.apply_change(change)
             except Exception as e:
-                print(f"刷新查询分析失败: {e}")
+                print(f"更新{self.notebook.tab(frame, 'text')}失败: {e}")
+    
+    def on_close(self):
+        """关闭窗口；初始化进行中时在当前语句执行完后停止"""
+        if self.init_cancel is not None:
+            if not messagebox.askyesno("确认", "数据库正在初始化，退出将在当前语句执行完后停止（下次可从中断处继续），是否退出？"):
+                return
+            self.init_cancel.set()
+        self.task_runner.shutdown()
+        self.db_manager.disconnect()
+        self.root.quit()
     
     def show_about(self):
         """显示关于对话框"""
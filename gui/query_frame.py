@@ -4,15 +4,25 @@
 查询分析界面
 """
 
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from gui.export_dialog import ExportDialog
+from gui.result_grid import ResultGrid
+from gui.task_runner import TaskRunner
+
 class QueryFrame(ttk.Frame):
     """查询分析框架"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, task_runner=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
+        # 当前显示的查询对应的导出内容（database.exporter.EXPORT_SOURCES 的键）
+        self.export_source = None
+        # 当前显示的查询，刷新时重新执行
+        self.last_query = None
         self.create_widgets()
     
     def create_widgets(self):
@@ -38,150 +48,113 @@ class QueryFrame(ttk.Frame):
         
         ttk.Separator(left_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
         ttk.Button(left_frame, text="刷新", command=self.refresh_data, width=20).pack(pady=5)
+        self.export_button = ttk.Button(left_frame, text="导出当前查询", command=self.export_data,
+                                        width=20, state=tk.DISABLED)
+        self.export_button.pack(pady=5)
         
-        # 右侧：结果显示
-        right_frame = ttk.Frame(self)
-        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # 滚动条
-        scrollbar = ttk.Scrollbar(right_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # 查询状态
+        self.status_label = ttk.Label(left_frame, text="")
+        self.status_label.pack(pady=5)
         
-        # 文本框显示结果
-        self.result_text = tk.Text(right_frame, yscrollcommand=scrollbar.set, wrap=tk.WORD, font=("Consolas", 10))
-        scrollbar.config(command=self.result_text.yview)
-        self.result_text.pack(fill=tk.BOTH, expand=True)
+        # 右侧：结果表格（只绘制可见行，点击列标题排序）
+        self.result_grid = ResultGrid(self)
+        self.result_grid.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
     
     def refresh_data(self):
-        """刷新数据"""
-        self.result_text.delete(1.0, tk.END)
-        self.result_text.insert(tk.END, "请选择左侧的查询选项...")
+        """刷新数据：在后台重新执行当前显示的查询（未连接或尚未查询时清空）"""
+        if self.last_query and self.db_manager.connection and self.db_manager.cursor:
+            self.run_query(*self.last_query)
+            return
+        self.task_runner.cancel("query")
+        self.last_query = None
+        self.export_source = None
+        self.export_button.config(state=tk.DISABLED)
+        self.status_label.config(text="")
+        self.result_grid.show_message("", "请选择左侧的查询选项...")
     
-    def display_result(self, title, data, columns=None):
+    def display_result(self, title, data, columns=None, empty_message="没有找到数据", elapsed=None):
         """显示查询结果"""
-        self.result_text.delete(1.0, tk.END)
-        self.result_text.insert(tk.END, f"{title}\n")
-        self.result_text.insert(tk.END, "=" * 80 + "\n\n")
+        self.result_grid.show(title, data, columns, elapsed, empty_message)
+    
+    def run_query(self, title, loader, columns=None, empty_message="没有找到数据", export_source=None):
+        """在后台线程中执行查询，完成后在主线程显示结果
         
-        if not data:
-            self.result_text.insert(tk.END, "没有找到数据\n")
+        export_source 为该查询对应的导出内容；导出时重新从数据库流式读取，不经过表格。
+        """
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
             return
+        self.status_label.config(text=f"正在查询：{title}...")
+        self.last_query = (title, loader, columns, empty_message, export_source)
+        
+        def load():
+            start = time.perf_counter()
+            results = loader()
+            return results, time.perf_counter() - start
         
-        # 如果有列名，显示表头
-        if columns:
-            header = " | ".join(columns)
-            self.result_text.insert(tk.END, header + "\n")
-            self.result_text.insert(tk.END, "-" * len(header) + "\n")
+        def on_success(result):
+            results, elapsed = result
+            self.status_label.config(text="")
+            self.display_result(title, results, columns, empty_message, elapsed)
+            self.export_source = export_source
+            self.export_button.config(state=tk.NORMAL if export_source else tk.DISABLED)
         
-        # 显示数据
-        for row in data:
-            if isinstance(row, dict):
-                # 字典格式
-                values = [str(row.get(k, '')) for k in row.keys()]
-                self.result_text.insert(tk.END, " | ".join(values) + "\n")
-            else:
-                # 列表/元组格式
-                self.result_text.insert(tk.END, " | ".join(str(v) for v in row) + "\n")
+        def on_error(e):
+            self.status_label.config(text="")
+            messagebox.showerror("错误", f"查询失败: {str(e)}")
         
-        self.result_text.insert(tk.END, f"\n共 {len(data)} 条记录\n")
+        # 新的查询会使尚未返回的旧查询结果失效
+        self.task_runner.submit("query", load, on_success, on_error)
     
-    def query_warning_list(self):
-        """查询预警学生名单"""
+    def export_data(self):
+        """导出当前查询的完整结果（CSV / XLSX / Parquet）"""
+        if not self.export_source:
+            return
         if not self.db_manager.connection or not self.db_manager.cursor:
             messagebox.showwarning("警告", "请先连接数据库")
             return
-        try:
-            results = self.db_manager.get_warning_list()
-            if results:
-                self.display_result("预警学生名单", results, 
-                                  ["学号", "姓名", "院系", "预警原因", "已获学分", "要求学分", "核心课程不及格数", "不及格上限"])
-            else:
-                self.result_text.delete(1.0, tk.END)
-                self.result_text.insert(tk.END, "预警学生名单\n" + "=" * 80 + "\n\n没有预警学生\n")
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
+        dialog = ExportDialog(self, self.db_manager, self.task_runner, self.export_source)
+        self.wait_window(dialog.dialog)
+    
+    def query_warning_list(self):
+        """查询预警学生名单"""
+        self.run_query("预警学生名单", self.db_manager.get_warning_list,
+                       ["学号", "姓名", "院系", "预警原因", "已获学分", "要求学分", "核心课程不及格数", "不及格上限"],
+                       empty_message="没有预警学生",
+                       export_source="warning_list")
     
     def query_gpa_ranking(self):
         """查询GPA排名"""
-        if not self.db_manager.connection or not self.db_manager.cursor:
-            messagebox.showwarning("警告", "请先连接数据库")
-            return
-        try:
-            results = self.db_manager.get_student_gpa_view()
-            if results:
-                self.display_result("学生GPA排名", results, ["学号", "姓名", "院系", "已获学分", "平均绩点"])
-            else:
-                self.display_result("学生GPA排名", [])
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
+        self.run_query("学生GPA排名", self.db_manager.get_student_gpa_view,
+                       ["学号", "姓名", "院系", "已获学分", "平均绩点"],
+                       export_source="gpa_ranking")
     
     def query_failed_core_courses(self):
         """查询核心课程不及格"""
-        if not self.db_manager.connection or not self.db_manager.cursor:
-            messagebox.showwarning("警告", "请先连接数据库")
-            return
-        try:
-            results = self.db_manager.get_failed_core_courses()
-            if results:
-                self.display_result("核心课程不及格记录", results, ["学号", "姓名", "课程名", "成绩", "学期"])
-            else:
-                self.display_result("核心课程不及格记录", [])
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
+        self.run_query("核心课程不及格记录", self.db_manager.get_failed_core_courses,
+                       ["学号", "姓名", "课程名", "成绩", "学期"],
+                       export_source="failed_core_courses")
     
     def query_failed_courses(self):
         """查询所有未通过课程"""
-        if not self.db_manager.connection or not self.db_manager.cursor:
-            messagebox.showwarning("警告", "请先连接数据库")
-            return
-        try:
-            results = self.db_manager.get_failed_courses()
-            if results:
-                self.display_result("所有未通过课程", results, ["学号", "姓名", "院系", "课程号", "课程名", "学分", "课程类型", "成绩", "学期"])
-            else:
-                self.display_result("所有未通过课程", [])
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
+        self.run_query("所有未通过课程", self.db_manager.get_failed_courses,
+                       ["学号", "姓名", "院系", "课程号", "课程名", "学分", "课程类型", "成绩", "学期"],
+                       export_source="failed_courses")
     
     def query_credits(self):
         """查询学分完成情况"""
-        if not self.db_manager.connection or not self.db_manager.cursor:
-            messagebox.showwarning("警告", "请先连接数据库")
-            return
-        try:
-            results = self.db_manager.get_credits_completed()
-            if results:
-                self.display_result("学分完成情况", results, ["学号", "姓名", "已获学分总数"])
-            else:
-                self.display_result("学分完成情况", [])
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
+        self.run_query("学分完成情况", self.db_manager.get_credits_completed,
+                       ["学号", "姓名", "已获学分总数"],
+                       export_source="credits")
     
     def query_department_stats(self):
         """查询院系统计"""
-        if not self.db_manager.connection or not self.db_manager.cursor:
-            messagebox.showwarning("警告", "请先连接数据库")
-            return
-        try:
-            results = self.db_manager.get_department_statistics()
-            if results:
-                self.display_result("各院系统计", results, ["院系", "学生人数", "平均GPA", "平均已获学分"])
-            else:
-                self.display_result("各院系统计", [])
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
+        self.run_query("各院系统计", self.db_manager.get_department_statistics,
+                       ["院系", "学生人数", "平均GPA", "平均已获学分"],
+                       export_source="department_stats")
     
     def query_semester_stats(self):
         """查询学期统计"""
-        if not self.db_manager.connection or not self.db_manager.cursor:
-            messagebox.showwarning("警告", "请先连接数据库")
-            return
-        try:
-            results = self.db_manager.get_semester_statistics()
-            if results:
-                self.display_result("学期统计", results, ["学期", "选课学生数", "总选课数", "开设课程数", "平均成绩"])
-            else:
-                self.display_result("学期统计", [])
-        except Exception as e:
-            messagebox.showerror("错误", f"查询失败: {str(e)}")
-
+        self.run_query("学期统计", self.db_manager.get_semester_statistics,
+                       ["学期", "选课学生数", "总选课数", "开设课程数", "平均成绩"],
+                       export_source="semester_stats")
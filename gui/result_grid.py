@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+查询结果表格
+结果行保存在内存中，由 VirtualTreeview 只绘制可见的行，几万行的结果也能立即显示；
+单元格保留查询返回的原始类型（数字列右对齐、按数值排序），
+点击列标题在内存中排序，不重新查询。
+"""
+
+import tkinter as tk
+from decimal import Decimal
+from tkinter import ttk
+
+from database.exporter import resolve_columns
+from gui.task_runner import TaskRunner
+from gui.virtual_tree import VirtualTreeview, ListSource
+
+NUMBER_TYPES = (int, float, Decimal)
+
+# 判断列类型时最多检查的行数
+TYPE_SAMPLE_ROWS = 100
+
+def is_number(value):
+    return isinstance(value, NUMBER_TYPES) and not isinstance(value, bool)
+
+def sort_key(value):
+    """排序键：数字按数值比较，其他按字符串比较，数字排在文本之前"""
+    if is_number(value):
+        return (0, value)
+    return (1, str(value))
+
+def format_value(value):
+    return "" if value is None else str(value)
+
+class ResultGrid(ttk.Frame):
+    """查询结果表格：标题、行数与耗时、可排序的虚拟化表格"""
+
+    def __init__(self, parent, page_size=500, column_width=110):
+        super().__init__(parent)
+        self.column_width = column_width
+        self.headers = []
+        self.keys = []
+        self.rows = []
+        self.sort_index = None
+        self.sort_descending = False
+        self.summary = ""
+
+        self.title_label = ttk.Label(self, text="", font=("Arial", 11, "bold"))
+        self.title_label.pack(fill=tk.X, pady=(0, 2))
+        self.info_label = ttk.Label(self, text="")
+        self.info_label.pack(fill=tk.X, pady=(0, 4))
+
+        # 数据已在内存中，页面同步加载
+        self.table = VirtualTreeview(self, (), TaskRunner(self, max_workers=0),
+                                     row_formatter=self.format_row, page_size=page_size)
+        self.table.pack(fill=tk.BOTH, expand=True)
+
+    def show_message(self, title, message=""):
+        """清空表格，只显示标题和提示"""
+        self.rows = []
+        self.keys = []
+        self.headers = []
+        self.table.set_columns(())
+        self.title_label.config(text=title)
+        self.info_label.config(text=message)
+
+    def show(self, title, rows, columns=None, elapsed=None, empty_message="没有找到数据"):
+        """显示一次查询的结果
+
+        rows 为字典（或元组）列表；columns 为表头，与字典的键一致时按键取值，
+        否则按位置对应。elapsed 为查询耗时（秒）。
+        """
+        rows = list(rows or [])
+        if not rows:
+            self.show_message(title, empty_message)
+            return
+        self.title_label.config(text=title)
+        self.rows = rows
+        self.keys, self.headers = resolve_columns(rows[0], columns)
+        self.sort_index = None
+        self.sort_descending = False
+        self.table.set_columns(tuple(self.headers), self.column_width)
+        for index, header in enumerate(self.headers):
+            if self._is_numeric(index):
+                self.table.tree.column(header, anchor=tk.E)
+            self.table.tree.heading(header, command=lambda i=index: self.sort_by(i))
+
+        self.summary = f"共 {len(rows)} 条记录"
+        if elapsed is not None:
+            self.summary += f"，查询耗时 {elapsed * 1000:.0f} ms"
+        self.info_label.config(text=self.summary)
+        self._reload()
+
+    def _is_numeric(self, index):
+        key = self.keys[index]
+        for row in self.rows[:TYPE_SAMPLE_ROWS]:
+            value = row[key]
+            if value is not None:
+                return is_number(value)
+        return False
+
+    def format_row(self, row):
+        return tuple(format_value(row[key]) for key in self.keys)
+
+    def sort_by(self, index):
+        """按某列排序（再次点击同一列切换升序/降序），空值始终排在最后"""
+        if self.sort_index == index:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_index = index
+            self.sort_descending = False
+        key = self.keys[index]
+        present = [row for row in self.rows if row[key] is not None]
+        missing = [row for row in self.rows if row[key] is None]
+        # 排序是稳定的，先后点击多列可得到多级排序
+        present.sort(key=lambda row: sort_key(row[key]), reverse=self.sort_descending)
+        self.rows = present + missing
+
+        for i, header in enumerate(self.headers):
+            arrow = (" ▼" if self.sort_descending else " ▲") if i == index else ""
+            self.table.tree.heading(header, text=header + arrow)
+        self._reload()
+
+    def _reload(self):
+        self.table.clear()
+        self.table.set_data_source(ListSource(self.rows))
+        self.table.refresh()
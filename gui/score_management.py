@@ -7,15 +7,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from database.grading import annotate_grades
+from gui.task_runner import TaskRunner
+from gui.export_dialog import ExportDialog
+from gui.bulk_import_dialog import BulkImportDialog
+from gui.virtual_tree import VirtualTreeview, KeysetQuerySource
+
 class ScoreManagementFrame(ttk.Frame):
     """成绩管理框架"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, task_runner=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
         self.create_widgets()
-        # 延迟刷新，等待数据库连接
-        self.after(100, self.refresh_data)
+        # 数据在标签页首次显示时由主窗口加载
     
     def create_widgets(self):
         """创建控件"""
@@ -26,54 +32,93 @@ class ScoreManagementFrame(ttk.Frame):
         ttk.Button(toolbar, text="添加", command=self.add_score).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="修改", command=self.edit_score).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="删除", command=self.delete_score).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="批量导入", command=self.import_data).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="导出", command=self.export_data).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="刷新", command=self.refresh_data).pack(side=tk.LEFT, padx=2)
         
-        # 表格
-        tree_frame = ttk.Frame(self)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        scrollbar = ttk.Scrollbar(tree_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # 加载状态
+        self.loading_label = ttk.Label(toolbar, text="")
+        self.loading_label.pack(side=tk.RIGHT, padx=10)
         
+        # 表格（虚拟化：只加载可见范围内的成绩）
         columns = ("学号", "姓名", "课程名", "成绩", "绩点", "是否通过", "学期")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", yscrollcommand=scrollbar.set)
-        scrollbar.config(command=self.tree.yview)
-        
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-        
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.table = VirtualTreeview(self, columns, self.task_runner,
+                                    row_formatter=self.format_row, column_width=100)
+        self.table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.table.set_data_source(KeysetQuerySource(
+            self.db_manager.count_scores,
+            self.db_manager.get_scores_range,
+            self.db_manager.get_scores_page,
+            lambda row: (row['SNo'], row['CNo'], row['Semester'])
+        ))
+        self.tree = self.table.tree
     
     def refresh_data(self):
-        """刷新数据"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
+        """刷新数据（在后台线程中按页查询）"""
         # 检查数据库连接
         if not self.db_manager.connection or not self.db_manager.cursor:
+            self.table.clear()
+            self.loading_label.config(text="")
             return
         
-        scores = self.db_manager.get_all_scores()
-        if scores:
-            for score in scores:
-                try:
-                    score_value = float(score.get('ScoreValue', 0)) if score.get('ScoreValue') is not None else 0
-                    # 通过函数计算绩点和是否通过
-                    gpa_point = self.db_manager.calculate_gpa(score_value)
-                    is_passed = "通过" if score_value >= 60 else "未通过"
-                    self.tree.insert("", tk.END, values=(
-                        score.get('SNo', ''),
-                        score.get('SName', ''),
-                        score.get('CName', ''),
-                        score_value,
-                        gpa_point,
-                        is_passed,
-                        score.get('Semester', '')
-                    ))
-                except Exception as e:
-                    print(f"处理成绩记录时出错: {e}, 记录: {score}")
-                    continue
+        self.loading_label.config(text="加载中...")
+        self.table.refresh(self.on_loaded, self.on_load_error)
+    
+    def on_loaded(self, total):
+        """数据加载完成"""
+        self.loading_label.config(text=f"共 {total} 条")
+        self.event_generate("<<DataLoaded>>")
+    
+    def format_row(self, score):
+        """将一行成绩转换为表格显示的值（只对可见行调用）"""
+        score_value = float(score.get('ScoreValue', 0)) if score.get('ScoreValue') is not None else 0
+        # 绩点和是否通过由查询直接算出（GradePoint / IsPassed 列）
+        if 'GradePoint' not in score:
+            annotate_grades([score], self.db_manager.get_grade_scale())
+        gpa_point = float(score['GradePoint'])
+        is_passed = "通过" if score['IsPassed'] else "未通过"
+        return (
+            score.get('SNo', ''),
+            score.get('SName', ''),
+            score.get('CName', ''),
+            score_value,
+            gpa_point,
+            is_passed,
+            score.get('Semester', '')
+        )
+    
+    def on_load_error(self, error):
+        """后台加载失败"""
+        self.loading_label.config(text="加载失败")
+        print(f"成绩数据加载失败: {error}")
+    
+    def apply_change(self, change):
+        """根据 DatabaseManager 的变更通知局部更新表格（在主线程中调用）"""
+        table, action = change['table'], change['action']
+        if table == 'Score':
+            key = change['key']
+            if action == 'delete':
+                self.table.remove_row(key)
+                self.on_loaded(self.table.total)
+            elif action == 'insert' or self.table.find_row(key)[0] is not None:
+                self.reload_score(key, action == 'insert')
+        elif table in ('Student', 'Course') and action != 'insert':
+            # 姓名/课程名/学分变化或级联删除影响多行成绩
+            self.refresh_data()
+    
+    def reload_score(self, key, inserted):
+        """在后台重新查询一条成绩，再插入或替换表格中的对应行"""
+        def on_success(row):
+            if row is None:
+                self.table.remove_row(key)
+            elif inserted:
+                self.table.insert_row(row)
+            else:
+                self.table.update_row(row)
+            self.on_loaded(self.table.total)
+        
+        self.task_runner.submit(("score_row",) + key, self.db_manager.get_score,
+                                on_success, self.on_load_error, *key)
     
     def add_score(self):
         """添加成绩"""
@@ -82,6 +127,14 @@ class ScoreManagementFrame(ttk.Frame):
             return
         dialog = ScoreDialog(self, self.db_manager)
         self.wait_window(dialog.dialog)
+    
+    def import_data(self):
+        """从 CSV/XLSX 批量导入成绩"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = BulkImportDialog(self, self.db_manager, self.task_runner, "scores")
+        self.wait_window(dialog.dialog)
         self.refresh_data()
     
     def edit_score(self):
@@ -94,14 +147,15 @@ class ScoreManagementFrame(ttk.Frame):
             messagebox.showwarning("警告", "请选择要修改的成绩")
             return
         
-        item = self.tree.item(selection[0])
-        values = item['values']
+        # 使用原始数据行：Treeview 的 values 会把数字样式的学号转换成整数
+        score = self.table.row_for_item(selection[0])
+        if score is None:
+            return
         
         dialog = ScoreDialog(self, self.db_manager,
-                           sno=values[0], cname=values[2],
-                           score=values[3], semester=values[6])
+                           sno=score['SNo'], cno=score['CNo'],
+                           score=score['ScoreValue'], semester=score['Semester'])
         self.wait_window(dialog.dialog)
-        self.refresh_data()
     
     def delete_score(self):
         """删除成绩"""
@@ -113,33 +167,31 @@ class ScoreManagementFrame(ttk.Frame):
             messagebox.showwarning("警告", "请选择要删除的成绩")
             return
         
-        item = self.tree.item(selection[0])
-        sno = item['values'][0]
-        cname = item['values'][2]
-        semester = item['values'][6]
-        
-        # 获取课程号
-        courses = self.db_manager.get_all_courses()
-        cno = None
-        for course in courses:
-            if course.get('CName') == cname:
-                cno = course.get('CNo')
-                break
-        
-        if cno and messagebox.askyesno("确认", f"确定要删除这条成绩记录吗？"):
-            if self.db_manager.delete_score(sno, cno, semester):
+        score = self.table.row_for_item(selection[0])
+        if score is None:
+            return
+        
+        if messagebox.askyesno("确认", f"确定要删除这条成绩记录吗？"):
+            if self.db_manager.delete_score(score['SNo'], score['CNo'], score['Semester']):
                 messagebox.showinfo("成功", "删除成功")
-                self.refresh_data()
             else:
                 messagebox.showerror("错误", "删除失败")
+    
+    def export_data(self):
+        """导出全部成绩（CSV / XLSX / Parquet）"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = ExportDialog(self, self.db_manager, self.task_runner, "scores")
+        self.wait_window(dialog.dialog)
 
 class ScoreDialog:
     """成绩信息对话框"""
     
-    def __init__(self, parent, db_manager, sno=None, cname="", score="", semester=""):
+    def __init__(self, parent, db_manager, sno=None, cno=None, score="", semester=""):
         self.db_manager = db_manager
         self.sno = sno
-        self.cname = cname
+        self.cno = cno
         self.semester = semester
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("添加成绩" if not sno else "修改成绩")
@@ -152,37 +204,33 @@ class ScoreDialog:
         y = (self.dialog.winfo_screenheight() // 2) - (300 // 2)
         self.dialog.geometry(f"400x300+{x}+{y}")
         
-        self.create_widgets(sno, cname, score, semester)
+        self.create_widgets(sno, cno, score, semester)
     
-    def create_widgets(self, sno, cname, score, semester):
+    def create_widgets(self, sno, cno, score, semester):
         """创建控件"""
         # 学号
         ttk.Label(self.dialog, text="学号:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
         self.sno_combo = ttk.Combobox(self.dialog, width=22, state="readonly")
         self.sno_combo.grid(row=0, column=1, padx=10, pady=10)
-        students = self.db_manager.get_all_students()
-        if students:
-            self.sno_combo['values'] = [f"{s.get('SNo')} - {s.get('SName')}" for s in students]
-            if sno:
-                for s in students:
-                    if s.get('SNo') == sno:
-                        self.sno_combo.set(f"{sno} - {s.get('SName')}")
-                        self.sno_combo.config(state='readonly')
-                        break
+        dimensions = self.db_manager.dimensions
+        self.sno_combo['values'] = dimensions.student_labels()
+        if sno:
+            student = dimensions.student(sno)
+            if student:
+                self.sno_combo.set(f"{sno} - {student.get('SName')}")
+                self.sno_combo.config(state='readonly')
         
         # 课程
         ttk.Label(self.dialog, text="课程:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
         self.course_combo = ttk.Combobox(self.dialog, width=22, state="readonly")
         self.course_combo.grid(row=1, column=1, padx=10, pady=10)
-        courses = self.db_manager.get_all_courses()
-        if courses:
-            self.course_combo['values'] = [f"{c.get('CNo')} - {c.get('CName')}" for c in courses]
-            if cname:
-                for c in courses:
-                    if c.get('CName') == cname:
-                        self.course_combo.set(f"{c.get('CNo')} - {cname}")
-                        self.course_combo.config(state='readonly')
-                        break
+        self.course_combo['values'] = dimensions.course_labels()
+        # 按课程号定位：课程名可能重复
+        if cno:
+            course = dimensions.course(cno)
+            if course:
+                self.course_combo.set(f"{cno} - {course.get('CName')}")
+                self.course_combo.config(state='readonly')
         
         # 成绩
         ttk.Label(self.dialog, text="成绩:").grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+启动耗时记录
+记录从进程启动到窗口首次绘制、界面创建完成、连接数据库、首个标签页数据加载完成
+各阶段的耗时，python main.py --startup-report 时打印。
+"""
+
+import time
+
+# 阶段名称 -> 报告中显示的说明
+STAGES = {
+    'first_paint': '窗口首次绘制',
+    'imports': '导入主界面模块',
+    'window_ready': '界面创建完成',
+    'connected': '数据库已连接',
+    'connect_failed': '数据库连接失败',
+    'first_data': '首个标签页加载完成',
+}
+
+class StartupTimer:
+    """按阶段记录启动耗时（同名阶段只记录第一次）"""
+
+    def __init__(self, start=None, verbose=False):
+        self.start = start if start is not None else time.perf_counter()
+        self.verbose = verbose
+        self.marks = []
+        self.finished = False
+
+    def mark(self, stage):
+        if stage not in (name for name, _ in self.marks):
+            self.marks.append((stage, time.perf_counter() - self.start))
+
+    def report(self):
+        lines = ["启动耗时（自进程启动）:"]
+        previous = 0.0
+        for stage, elapsed in self.marks:
+            lines.append(f"  {STAGES.get(stage, stage):<12} {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
+        return "\n".join(lines)
+
+    def finish(self):
+        """启动完成，verbose 时打印报告（只打印一次）"""
+        if self.finished:
+            return
+        self.finished = True
+        if self.verbose:
+            print(self.report())
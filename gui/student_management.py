@@ -7,15 +7,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from gui.task_runner import TaskRunner
+from gui.export_dialog import ExportDialog
+from gui.bulk_import_dialog import BulkImportDialog
+from gui.virtual_tree import VirtualTreeview, KeysetQuerySource
+
 class StudentManagementFrame(ttk.Frame):
     """学生管理框架"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, task_runner=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
         self.create_widgets()
-        # 延迟刷新，等待数据库连接
-        self.after(100, self.refresh_data)
+        # 数据在标签页首次显示时由主窗口加载
     
     def create_widgets(self):
         """创建控件"""
@@ -26,50 +31,92 @@ class StudentManagementFrame(ttk.Frame):
         ttk.Button(toolbar, text="添加", command=self.add_student).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="修改", command=self.edit_student).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="删除", command=self.delete_student).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="批量导入", command=self.import_data).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="导出", command=self.export_data).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="刷新", command=self.refresh_data).pack(side=tk.LEFT, padx=2)
         
-        # 表格
-        tree_frame = ttk.Frame(self)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # 滚动条
-        scrollbar = ttk.Scrollbar(tree_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # 加载状态
+        self.loading_label = ttk.Label(toolbar, text="")
+        self.loading_label.pack(side=tk.RIGHT, padx=10)
         
-        # 树形视图
+        # 表格（虚拟化：只加载可见范围内的学生）
         columns = ("学号", "姓名", "院系", "入学年份", "总学分", "GPA")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", yscrollcommand=scrollbar.set)
-        scrollbar.config(command=self.tree.yview)
-        
-        # 设置列
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=120)
-        
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.table = VirtualTreeview(self, columns, self.task_runner,
+                                    row_formatter=self.format_row, column_width=120)
+        self.table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.table.set_data_source(KeysetQuerySource(
+            self.db_manager.count_students,
+            self.db_manager.get_students_with_gpa_range,
+            self.db_manager.get_students_with_gpa_page,
+            lambda row: row['学号']
+        ))
+        self.tree = self.table.tree
     
     def refresh_data(self):
-        """刷新数据"""
-        # 清空现有数据
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
+        """刷新数据（在后台线程中按页查询）"""
         # 检查数据库连接
         if not self.db_manager.connection or not self.db_manager.cursor:
+            self.table.clear()
+            self.loading_label.config(text="")
             return
         
-        # 获取数据（通过视图获取，包含计算后的学分和GPA）
-        students = self.db_manager.get_all_students_with_gpa()
-        if students:
-            for student in students:
-                self.tree.insert("", tk.END, values=(
-                    student.get('学号', ''),
-                    student.get('姓名', ''),
-                    student.get('院系', ''),
-                    student.get('EnrollmentYear', 0),
-                    student.get('已获学分', 0),
-                    student.get('平均绩点', 0)
-                ))
+        self.loading_label.config(text="加载中...")
+        # 获取数据（包含计算后的学分和GPA）
+        self.table.refresh(self.on_loaded, self.on_load_error)
+    
+    def on_loaded(self, total):
+        """数据加载完成"""
+        self.loading_label.config(text=f"共 {total} 名学生")
+        self.event_generate("<<DataLoaded>>")
+    
+    def format_row(self, student):
+        """将一行学生数据转换为表格显示的值"""
+        return (
+            student.get('学号', ''),
+            student.get('姓名', ''),
+            student.get('院系', ''),
+            student.get('EnrollmentYear', 0),
+            student.get('已获学分', 0),
+            student.get('平均绩点', 0)
+        )
+    
+    def on_load_error(self, error):
+        """后台加载失败"""
+        self.loading_label.config(text="加载失败")
+        print(f"学生数据加载失败: {error}")
+    
+    def apply_change(self, change):
+        """根据 DatabaseManager 的变更通知局部更新表格（在主线程中调用）"""
+        table = change['table']
+        if table == 'Student':
+            sno = change['key']
+            if change['action'] == 'delete':
+                self.table.remove_row(sno)
+                self.on_loaded(self.table.total)
+            else:
+                self.reload_student(sno, change['action'] == 'insert')
+        elif table == 'Score':
+            # 成绩变化只影响该学生的总学分和GPA，学生行不在缓存中时无需处理
+            sno = change['key'][0]
+            if self.table.find_row(sno)[0] is not None:
+                self.reload_student(sno, False)
+        elif table == 'Course' and change['action'] != 'insert':
+            # 学分变化或级联删除成绩会影响所有选课学生
+            self.refresh_data()
+    
+    def reload_student(self, sno, inserted):
+        """在后台重新查询一名学生，再插入或替换表格中的对应行"""
+        def on_success(row):
+            if row is None:
+                self.table.remove_row(sno)
+            elif inserted:
+                self.table.insert_row(row)
+            else:
+                self.table.update_row(row)
+            self.on_loaded(self.table.total)
+        
+        self.task_runner.submit(("student_row", sno), self.db_manager.get_student_with_gpa,
+                                on_success, self.on_load_error, sno)
     
     def add_student(self):
         """添加学生"""
@@ -78,6 +125,14 @@ class StudentManagementFrame(ttk.Frame):
             return
         dialog = StudentDialog(self, self.db_manager)
         self.wait_window(dialog.dialog)
+    
+    def import_data(self):
+        """从 CSV/XLSX 批量导入学生"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = BulkImportDialog(self, self.db_manager, self.task_runner, "students")
+        self.wait_window(dialog.dialog)
         self.refresh_data()
     
     def edit_student(self):
@@ -90,14 +145,15 @@ class StudentManagementFrame(ttk.Frame):
             messagebox.showwarning("警告", "请选择要修改的学生")
             return
         
-        item = self.tree.item(selection[0])
-        values = item['values']
+        # 使用原始数据行：Treeview 的 values 会把数字样式的学号转换成整数
+        student = self.table.row_for_item(selection[0])
+        if student is None:
+            return
         
         dialog = StudentDialog(self, self.db_manager, 
-                              sno=values[0], sname=values[1], 
-                              dept=values[2], year=values[3])
+                              sno=student['学号'], sname=student['姓名'], 
+                              dept=student['院系'], year=student['EnrollmentYear'])
         self.wait_window(dialog.dialog)
-        self.refresh_data()
     
     def delete_student(self):
         """删除学生"""
@@ -109,16 +165,25 @@ class StudentManagementFrame(ttk.Frame):
             messagebox.showwarning("警告", "请选择要删除的学生")
             return
         
-        item = self.tree.item(selection[0])
-        sno = item['values'][0]
-        sname = item['values'][1]
+        student = self.table.row_for_item(selection[0])
+        if student is None:
+            return
+        sno = student['学号']
+        sname = student['姓名']
         
         if messagebox.askyesno("确认", f"确定要删除学生 {sname} ({sno}) 吗？\n这将同时删除该学生的所有成绩记录！"):
             if self.db_manager.delete_student(sno):
                 messagebox.showinfo("成功", "删除成功")
-                self.refresh_data()
             else:
                 messagebox.showerror("错误", "删除失败")
+    
+    def export_data(self):
+        """导出全部学生（CSV / XLSX / Parquet）"""
+        if not self.db_manager.connection or not self.db_manager.cursor:
+            messagebox.showwarning("警告", "请先连接数据库")
+            return
+        dialog = ExportDialog(self, self.db_manager, self.task_runner, "students")
+        self.wait_window(dialog.dialog)
 
 class StudentDialog:
     """学生信息对话框"""
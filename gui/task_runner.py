@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+后台任务执行器
+在工作线程中执行数据库调用，避免阻塞 Tk 主循环；
+结果放入队列，由主线程通过 root.after 轮询取回并回调。
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class TaskRunner:
+    """后台任务执行器
+
+    每个任务带一个 key（例如某个标签页的刷新），同一 key 再次提交时代数递增，
+    旧任务的结果到达后会被直接丢弃，从而保证界面只显示最新一次刷新的结果。
+    max_workers=0 时退化为同步执行（在调用线程中直接运行并回调）。
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=50):
+        self.root = root
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.executor = None
+        if max_workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aws-worker")
+        self._queue = queue.Queue()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._closed = False
+        if self.executor:
+            self._schedule_poll()
+
+    def submit(self, key, func, on_success=None, on_error=None, *args, **kwargs):
+        """提交后台任务，返回本次任务的代数
+
+        func(*args, **kwargs) 在工作线程中执行；
+        on_success(result) / on_error(exception) 在主线程中回调。
+        """
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+        if not self.executor:
+            # 同步模式
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._report_error(on_error, e)
+            else:
+                if on_success:
+                    on_success(result)
+            return generation
+
+        def run():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._queue.put((key, generation, False, e, on_success, on_error))
+            else:
+                self._queue.put((key, generation, True, result, on_success, on_error))
+
+        self.executor.submit(run)
+        return generation
+
+    def is_current(self, key, generation):
+        """判断某代任务是否仍是该 key 的最新任务"""
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def cancel(self, key):
+        """作废某个 key 上尚未返回的任务（结果到达后丢弃）"""
+        with self._lock:
+            if key in self._generations:
+                self._generations[key] += 1
+
+    def call_soon(self, func, *args):
+        """在主线程中执行 func(*args)，可在任意线程中调用"""
+        if not self.executor:
+            func(*args)
+            return
+        self._queue.put((None, None, True, args, func, None))
+
+    def shutdown(self):
+        """停止轮询并关闭线程池（不等待正在执行的任务）"""
+        self._closed = True
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+    def _schedule_poll(self):
+        if not self._closed:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """主线程：取回已完成的任务并回调"""
+        while True:
+            try:
+                key, generation, ok, value, on_success, on_error = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if key is None:
+                # call_soon 投递的回调
+                self._invoke(on_success, *value)
+                continue
+            if not self.is_current(key, generation):
+                # 已被更新的任务取代，丢弃过期结果
+                continue
+            if ok:
+                if on_success:
+                    self._invoke(on_success, value)
+            else:
+                self._report_error(on_error, value)
+        self._schedule_poll()
+
+    def _invoke(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"后台任务回调出错: {e}")
+
+    def _report_error(self, on_error, error):
+        if on_error:
+            self._invoke(on_error, error)
+        else:
+            print(f"后台任务出错: {error}")
@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+虚拟化表格控件
+Treeview 中只保留当前可见的若干行，数据按页从数据源拉取，
+滚动时复用同一批行项目，因此表格大小与数据总量无关。
+"""
+
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+
+from gui.task_runner import TaskRunner
+
+class PagedQuerySource:
+    """分页数据源：count() 返回总行数，fetch(offset, limit) 返回一段行（字典列表）
+
+    两个函数都会在后台线程中调用。
+    """
+
+    def __init__(self, count_func, fetch_func):
+        self.count_func = count_func
+        self.fetch_func = fetch_func
+
+    def count(self):
+        return self.count_func()
+
+    def fetch(self, offset, limit):
+        return self.fetch_func(offset, limit)
+
+class KeysetQuerySource(PagedQuerySource):
+    """键集分页数据源
+
+    记录每页末行的主键，顺序滚动时用 page_func(after, limit) 按主键接着取下一页；
+    只有直接跳到从未到达过的位置时，才退回 fetch_func(offset, limit) 的偏移查询。
+    """
+
+    def __init__(self, count_func, fetch_func, page_func, key_func):
+        super().__init__(count_func, fetch_func)
+        self.page_func = page_func
+        self.key_func = key_func
+        # 偏移量 -> 该位置之前一行的主键（偏移0之前为 None）
+        self._start_keys = {0: None}
+
+    def count(self):
+        # 重新计数意味着数据可能已变化，已记录的位置不再可靠
+        self._start_keys = {0: None}
+        return self.count_func()
+
+    def fetch(self, offset, limit):
+        start_keys = self._start_keys
+        if offset in start_keys:
+            rows = self.page_func(start_keys[offset], limit)['rows']
+        else:
+            rows = self.fetch_func(offset, limit)
+        if rows:
+            start_keys[offset + len(rows)] = self.key_func(rows[-1])
+        return rows
+
+    def row_changed(self, key, delta):
+        """插入（delta=1）或删除（delta=-1）主键为 key 的一行后，平移已记录的位置
+
+        删除的主键仍可作为"从它之后"的起点，因此记录不必丢弃。
+        """
+        shifted = {}
+        for offset, start_key in self._start_keys.items():
+            if start_key is not None and (start_key > key if delta > 0 else start_key >= key):
+                offset += delta
+            shifted[offset] = start_key
+        self._start_keys = shifted
+
+class ListSource(PagedQuerySource):
+    """内存中的行列表作为数据源（结果已全部查出，翻页不再访问数据库）"""
+
+    def __init__(self, rows, key_func=None):
+        self.rows = rows
+        self.key_func = key_func
+
+    def count(self):
+        return len(self.rows)
+
+    def fetch(self, offset, limit):
+        return self.rows[offset:offset + limit]
+
+class VirtualTreeview(ttk.Frame):
+    """虚拟化表格
+
+    - 只缓存可见窗口前后 prefetch_pages 页的数据，其余页面随滚动淘汰
+    - 滚动条按 当前位置/总行数 绘制，拖动到任意位置时只加载该位置附近的页
+    - 行项目 iid 为槽位编号（r0, r1, ...），通过 row_for_item 取回原始行
+    - 行的身份由数据源的 key_func（主键）确定，insert_row / update_row / remove_row
+      只修改已缓存的页并重绘可见行，不重新查询整个表
+    """
+
+    PLACEHOLDER = "..."
+
+    def __init__(self, parent, columns, task_runner=None, row_formatter=None,
+                 page_size=200, prefetch_pages=1, column_width=100):
+        super().__init__(parent)
+        self.columns = columns
+        self.task_runner = task_runner or TaskRunner(self, max_workers=0)
+        self.row_formatter = row_formatter or (lambda row: tuple(row.values()))
+        self.page_size = page_size
+        self.prefetch_pages = prefetch_pages
+        self.data_source = None
+
+        self.total = 0
+        self.first = 0
+        self.visible_rows = 20
+        self._pages = {}
+        self._epoch = 0
+        self._slot_rows = []
+        self._selected_index = None
+        self._task_key = ("virtual_tree", id(self))
+
+        self.scrollbar = ttk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self.visible_rows) or "break")
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self.visible_rows) or "break")
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    # ========== 数据 ==========
+    def set_data_source(self, data_source):
+        """设置数据源（不会立即加载，需调用 refresh）"""
+        self.data_source = data_source
+
+    def refresh(self, on_loaded=None, on_error=None):
+        """重新统计总行数并加载当前位置附近的数据
+
+        on_loaded(total) / on_error(exception) 在主线程中回调。
+        """
+        if not self.data_source:
+            return
+        self._epoch += 1
+        epoch = self._epoch
+        source = self.data_source
+        first, visible = self.first, self.visible_rows
+
+        def load():
+            total = source.count()
+            start = min(first, max(0, total - visible))
+            return total, self._fetch_pages(source, self._pages_for(start, visible, total))
+
+        def on_success(result):
+            if epoch != self._epoch:
+                return
+            total, pages = result
+            self.total = total
+            self._pages = pages
+            self._clamp_first()
+            self._redraw()
+            if on_loaded:
+                on_loaded(total)
+
+        self.task_runner.submit(self._task_key + ("refresh",), load, on_success, on_error)
+
+    def set_columns(self, columns, column_width=100):
+        """更换列定义（同时清空表格）"""
+        self.clear()
+        self.columns = columns
+        self.tree.configure(columns=columns, displaycolumns="#all")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width, anchor=tk.W)
+
+    def clear(self):
+        """清空表格与缓存"""
+        self._epoch += 1
+        self.total = 0
+        self.first = 0
+        self._pages = {}
+        self._selected_index = None
+        self._redraw()
+
+    def row_for_item(self, iid):
+        """返回某个行项目对应的原始数据行，尚未加载时返回 None"""
+        children = self.tree.get_children()
+        if iid not in children:
+            return None
+        slot = children.index(iid)
+        return self._slot_rows[slot] if slot < len(self._slot_rows) else None
+
+    def selected_row(self):
+        """当前选中行的原始数据，未选中或尚未加载时返回 None"""
+        selection = self.tree.selection()
+        return self.row_for_item(selection[0]) if selection else None
+
+    def _pages_for(self, first, visible, total):
+        """可见窗口及预取范围覆盖的页号"""
+        if total <= 0:
+            return []
+        margin = self.page_size * self.prefetch_pages
+        lo = max(0, first - margin)
+        hi = min(total, first + visible + margin)
+        return list(range(lo // self.page_size, (hi - 1) // self.page_size + 1))
+
+    def _fetch_pages(self, source, page_numbers):
+        """后台线程：逐页拉取数据"""
+        pages = {}
+        for page in page_numbers:
+            pages[page] = source.fetch(page * self.page_size, self.page_size)
+        return pages
+
+    def _ensure_window(self):
+        """淘汰窗口外的页，并在后台拉取窗口内缺失的页"""
+        needed = self._pages_for(self.first, self.visible_rows, self.total)
+        self._pages = {p: rows for p, rows in self._pages.items() if p in needed}
+        missing = [p for p in needed if p not in self._pages]
+        if not missing or not self.data_source:
+            return
+        epoch = self._epoch
+        source = self.data_source
+
+        def on_success(pages):
+            if epoch != self._epoch:
+                return
+            self._pages.update(pages)
+            self._redraw()
+
+        # 同一个 key 的新请求会使旧请求的结果作废，快速拖动时只保留最后一次
+        self.task_runner.submit(self._task_key + ("window",), self._fetch_pages,
+                                on_success, None, source, missing)
+
+    def _row_at(self, index):
+        rows = self._pages.get(index // self.page_size)
+        if rows is None:
+            return None
+        offset = index % self.page_size
+        return rows[offset] if offset < len(rows) else None
+
+    # ========== 局部更新 ==========
+    def _key(self, row):
+        return self.data_source.key_func(row)
+
+    def find_row(self, key):
+        """在已缓存的页中按主键查找，返回 (行号, 行)，未缓存时返回 (None, None)"""
+        for page, rows in self._pages.items():
+            for offset, row in enumerate(rows):
+                if self._key(row) == key:
+                    return page * self.page_size + offset, row
+        return None, None
+
+    def update_row(self, row):
+        """替换已缓存的同主键行（不在缓存中时忽略），返回是否找到"""
+        index, _ = self.find_row(self._key(row))
+        if index is None:
+            return False
+        self._pages[index // self.page_size][index % self.page_size] = row
+        slot = index - self.first
+        if 0 <= slot < len(self._slot_rows):
+            self._slot_rows[slot] = row
+            self.tree.item(f"r{slot}", values=self.row_formatter(row))
+        return True
+
+    def insert_row(self, row):
+        """按主键顺序插入一行（行号在缓存范围之外时只平移缓存和总数）
+
+        已缓存同主键的行时改为替换，重复收到同一条变更不会插入两次。
+        """
+        if not self.update_row(row):
+            self._splice(self._key(row), 1, row)
+
+    def remove_row(self, key):
+        """删除主键为 key 的行（主键落在已缓存的范围内却找不到时视为已删除）"""
+        if self.find_row(key)[0] is None and self._covers(key):
+            return
+        self._splice(key, -1)
+
+    def _covers(self, key):
+        for rows in self._pages.values():
+            if rows and self._key(rows[0]) <= key <= self._key(rows[-1]):
+                return True
+        return False
+
+    def _splice(self, key, delta, row=None):
+        """插入或删除一行后重新对齐已缓存的页
+
+        主键比较使用 Python 的排序规则，需与查询的 ORDER BY 一致（学号、课程号等
+        ASCII 主键满足这一点）；不完整的页会被丢弃，随后由 _ensure_window 重新拉取。
+        """
+        if not self.data_source:
+            return
+        page_size = self.page_size
+        old_total = self.total
+        new_total = max(0, old_total + delta)
+        anchor = self._row_at(self.first)
+        anchor_key = self._key(anchor) if anchor is not None else None
+        selected = self._row_at(self._selected_index) if self._selected_index is not None else None
+        selected_key = self._key(selected) if selected is not None else None
+
+        # 把已缓存的页合并成若干连续的行段，逐段应用插入/删除
+        runs = []
+        for page in sorted(self._pages):
+            rows = self._pages[page]
+            if runs and runs[-1][0] + len(runs[-1][1]) == page * page_size:
+                runs[-1][1].extend(rows)
+            else:
+                runs.append([page * page_size, list(rows)])
+
+        pages = {}
+        for start, rows in runs:
+            reaches_end = start + len(rows) >= old_total
+            keys = [self._key(r) for r in rows]
+            position = bisect_left(keys, key)
+            if delta < 0:
+                if position < len(keys) and keys[position] == key:
+                    del rows[position]
+                elif position == 0 and start > 0:
+                    start -= 1
+            elif position == 0 and start > 0:
+                # 新行位于本段之前（未缓存的部分），本段整体后移
+                start += 1
+            elif position < len(keys) or reaches_end:
+                rows.insert(position, row)
+            end = start + len(rows)
+            page = -(-start // page_size)
+            while page * page_size < end:
+                chunk = rows[page * page_size - start:(page + 1) * page_size - start]
+                if len(chunk) == page_size or page * page_size + len(chunk) == new_total:
+                    pages[page] = chunk
+                page += 1
+
+        self.total = new_total
+        self._pages = pages
+        row_changed = getattr(self.data_source, 'row_changed', None)
+        if row_changed:
+            row_changed(key, delta)
+
+        # 可见窗口和选中行跟随原来的数据行
+        if anchor_key is not None and key < anchor_key:
+            self.first += delta
+        if selected_key is not None:
+            if delta < 0 and selected_key == key:
+                self._selected_index = None
+            elif key < selected_key:
+                self._selected_index += delta
+        self._clamp_first()
+        self._redraw()
+        self._ensure_window()
+
+    # ========== 绘制 ==========
+    def _redraw(self):
+        """用当前窗口的数据重写可见行项目"""
+        children = list(self.tree.get_children())
+        slots = max(0, min(self.visible_rows, self.total - self.first))
+        placeholder = (self.PLACEHOLDER,) * len(self.columns)
+        self._slot_rows = []
+
+        for i in range(slots):
+            row = self._row_at(self.first + i)
+            self._slot_rows.append(row)
+            values = self.row_formatter(row) if row is not None else placeholder
+            if i < len(children):
+                self.tree.item(children[i], values=values)
+            else:
+                self.tree.insert("", tk.END, iid=f"r{i}", values=values)
+        if len(children) > slots:
+            self.tree.delete(*children[slots:])
+
+        # 选中状态跟随数据行，而不是跟随槽位
+        selected = self._selected_index
+        if selected is not None and self.first <= selected < self.first + slots:
+            self.tree.selection_set(f"r{selected - self.first}")
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if self.total > 0:
+            self.scrollbar.set(self.first / self.total, min(1.0, (self.first + slots) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ========== 滚动 ==========
+    def scroll_to(self, index):
+        """滚动到第 index 行（从0开始）"""
+        self.first = index
+        self._clamp_first()
+        self._redraw()
+        self._ensure_window()
+
+    def _scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+
+    def _clamp_first(self):
+        self.first = max(0, min(self.first, self.total - self.visible_rows))
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows
+            self._scroll_by(amount)
+
+    def _on_mousewheel(self, event):
+        if event.delta:
+            # Windows 每格 120，macOS 为较小的整数
+            step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+            self._scroll_by(step * 3)
+        return "break"
+
+    def _on_arrow(self, direction):
+        """方向键移动到可见窗口边缘时滚动窗口"""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        slot = self.tree.get_children().index(selection[0])
+        last_slot = len(self.tree.get_children()) - 1
+        if (direction < 0 and slot == 0) or (direction > 0 and slot == last_slot):
+            index = self.first + slot + direction
+            if 0 <= index < self.total:
+                self._selected_index = index
+                self._scroll_by(direction)
+            return "break"
+        return None
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            children = self.tree.get_children()
+            if selection[0] in children:
+                self._selected_index = self.first + children.index(selection[0])
+
+    def _on_configure(self, event):
+        style = ttk.Style()
+        try:
+            row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        except (ValueError, tk.TclError):
+            row_height = 20
+        # 减去表头高度
+        visible = max(1, (event.height - row_height - 4) // row_height)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self._clamp_first()
+            self._redraw()
+            self._ensure_window()
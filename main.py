@@ -3,25 +3,47 @@
 """
 大学生学业预警与成绩分析系统 - 图形化界面
 主程序入口
+
+    python main.py                     # 启动
+    python main.py --startup-report    # 启动并打印各阶段耗时
 """
 
+import time
+
+_START = time.perf_counter()
+
+import argparse
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import ttk
 import sys
 import os
 
 # 添加当前目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from gui.main_window import MainWindow
-from database.db_manager import DatabaseManager
+from gui.startup_timer import StartupTimer
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="大学生学业预警与成绩分析系统")
+    parser.add_argument('--startup-report', action='store_true', help="打印启动各阶段耗时")
+    args = parser.parse_args()
+    timer = StartupTimer(_START, verbose=args.startup_report)
+
+    # 先显示窗口，主界面模块和数据库驱动在窗口出现之后再导入
     root = tk.Tk()
-    app = MainWindow(root)
+    root.title("大学生学业预警与成绩分析系统")
+    root.geometry("1200x700")
+    splash = ttk.Label(root, text="正在启动...")
+    splash.pack(expand=True)
+    root.update()
+    timer.mark('first_paint')
+
+    from gui.main_window import MainWindow
+    timer.mark('imports')
+    splash.destroy()
+    app = MainWindow(root, startup_timer=timer)
     root.mainloop()
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+大学生学业预警与成绩分析系统 - 只读 HTTP/JSON 查询服务
+供其他校内系统读取 GPA、预警等数据，无需各自持有数据库账号、复制 SQL。
+
+    python server.py --password 您的密码                  # 监听 127.0.0.1:8080
+    python server.py --bind 0.0.0.0 --listen-port 8080 --pool-size 16
+
+    curl http://127.0.0.1:8080/warnings?dept=计算机学院&limit=50
+    curl http://127.0.0.1:8080/students/2021001/transcript
+
+基于 asyncio 处理连接，数据库调用放到线程池中执行，线程数与连接池大小相同；
+相同的请求在缓存有效期内直接返回缓存的响应，同时到达的相同请求只查询一次数据库。
+所有接口只读，只支持 GET。
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from functools import partial
+from decimal import Decimal
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# 添加当前目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+
+# 请求头最多读取的行数和单行长度，超出视为非法请求
+MAX_HEADER_LINES = 100
+MAX_LINE_BYTES = 8192
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 414: 'URI Too Long', 431: 'Request Header Fields Too Large',
+           500: 'Internal Server Error'}
+
+class HttpError(Exception):
+    """以指定状态码返回给客户端的错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+def encode_json(data):
+    return json.dumps(data, ensure_ascii=False, default=json_default).encode('utf-8')
+
+def parse_int(params, name, default, minimum=0, maximum=None):
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HttpError(400, f"参数 {name} 必须是整数")
+    if number < minimum:
+        raise HttpError(400, f"参数 {name} 不能小于 {minimum}")
+    return min(number, maximum) if maximum is not None else number
+
+def parse_after(params):
+    """单列主键（学号）的起始键：原样作为字符串，不做 JSON 解码（学号 1e5 不能变成 100000.0）"""
+    return params.get('after') or None
+
+def parse_after_key(params, size):
+    """多列主键的起始键：JSON 数组（即上一页返回的 next_after），返回元组"""
+    value = params.get('after')
+    if not value:
+        return None
+    try:
+        decoded = json.loads(value)
+    except ValueError:
+        decoded = None
+    if not isinstance(decoded, list) or len(decoded) != size:
+        raise HttpError(400, f"参数 after 必须是包含 {size} 个元素的 JSON 数组")
+    return tuple(decoded)
+
+def slice_rows(rows, params):
+    """对一次性查出的结果按 offset/limit 分页"""
+    offset = parse_int(params, 'offset', 0)
+    limit = parse_int(params, 'limit', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    page = rows[offset:offset + limit]
+    next_offset = offset + limit if offset + limit < len(rows) else None
+    return {'rows': page, 'total': len(rows), 'offset': offset, 'next_offset': next_offset}
+
+def filter_by(rows, params, name, key):
+    value = params.get(name)
+    if not value:
+        return rows
+    return [row for row in rows if str(row.get(key)) == value]
+
+class ResponseCache:
+    """已编码响应的 LRU 缓存，条目在 ttl 秒后过期"""
+
+    def __init__(self, ttl=2.0, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, response):
+        if self.ttl <= 0:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class QueryService:
+    """把 DatabaseManager 的读方法映射为 JSON 接口
+
+    db 为任何提供相同读方法的对象（DatabaseManager 或测试用的替身），
+    其方法在线程池中调用，必须可以被多个线程同时调用（DatabaseManager 需使用连接池）。
+    处理函数在 db.raising_errors() 中执行：数据库出错时返回 500 且不缓存，
+    而不是把出错时的 [] / None 当作空结果或“不存在”返回。
+    """
+
+    def __init__(self, db, workers=8, cache_ttl=2.0, cache_entries=512):
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        self.cache = ResponseCache(cache_ttl, cache_entries)
+        # 正在查询的请求：相同请求同时到达时共用一次查询
+        self.inflight = {}
+        self.requests = 0
+        # (路径段数, 首段) -> 处理函数；处理函数在线程池中执行，返回可 JSON 序列化的数据
+        self.routes = {
+            (1, 'health'): self.health,
+            (1, 'students'): self.students,
+            (2, 'students'): self.student,
+            (3, 'students'): self.transcript,
+            (1, 'scores'): self.scores,
+            (1, 'courses'): self.courses,
+            (1, 'warnings'): self.warnings,
+            (1, 'gpa-ranking'): self.gpa_ranking,
+            (1, 'credits'): self.credits,
+            (1, 'failed-courses'): self.failed_courses,
+            (1, 'failed-core-courses'): self.failed_core_courses,
+            (2, 'stats'): self.stats,
+        }
+
+    # ========== 接口 ==========
+    def health(self, parts, params):
+        return {'status': 'ok', 'requests': self.requests,
+                'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses}
+
+    def students(self, parts, params):
+        """GET /students?after=&page_size=  学生（含GPA、学分），按学号键集分页"""
+        page_size = parse_int(params, 'page_size', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+        return self.db.get_students_with_gpa_page(parse_after(params), page_size)
+
+    def student(self, parts, params):
+        """GET /students/{学号}"""
+        student = self.db.get_student_with_gpa(parts[1])
+        if not student:
+            raise HttpError(404, f"学号 {parts[1]} 不存在")
+        return student
+
+    def transcript(self, parts, params):
+        """GET /students/{学号}/transcript  学生信息、全部成绩（含绩点）、未通过课程"""
+        from database.grading import annotate_grades
+
+        if parts[2] != 'transcript':
+            raise HttpError(404, "接口不存在")
+        sno = parts[1]
+        student = self.db.get_student_with_gpa(sno)
+        if not student:
+            raise HttpError(404, f"学号 {sno} 不存在")
+        scores = self.db.get_student_scores(sno)
+        annotate_grades(scores, self.db.get_grade_scale())
+        return {
+            'student': student,
+            'scores': scores,
+            'failed_courses': self.db.get_failed_courses(sno),
+            'failed_core_courses': self.db.get_failed_core_courses(sno),
+        }
+
+    def scores(self, parts, params):
+        """GET /scores?after=&page_size=  成绩，按 (学号, 课程号, 学期) 键集分页"""
+        page_size = parse_int(params, 'page_size', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+        return self.db.get_scores_page(parse_after_key(params, 3), page_size)
+
+    def courses(self, parts, params):
+        """GET /courses"""
+        return slice_rows(self.db.get_all_courses(), params)
+
+    def warnings(self, parts, params):
+        """GET /warnings?dept=&offset=&limit=  预警学生名单"""
+        return slice_rows(filter_by(self.db.get_warning_list(), params, 'dept', '院系'), params)
+
+    def gpa_ranking(self, parts, params):
+        """GET /gpa-ranking?dept=&offset=&limit=  按平均绩点从高到低"""
+        return slice_rows(filter_by(self.db.get_student_gpa_view(), params, 'dept', '院系'), params)
+
+    def credits(self, parts, params):
+        """GET /credits?offset=&limit=  学分完成情况"""
+        return slice_rows(self.db.get_credits_completed(), params)
+
+    def failed_courses(self, parts, params):
+        """GET /failed-courses?after=&page_size=  所有未通过课程，键集分页"""
+        page_size = parse_int(params, 'page_size', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+        return self.db.get_failed_courses_page(parse_after_key(params, 3), page_size)
+
+    def failed_core_courses(self, parts, params):
+        """GET /failed-core-courses?sno=&offset=&limit=  核心课程不及格"""
+        return slice_rows(self.db.get_failed_core_courses(params.get('sno') or None), params)
+
+    def stats(self, parts, params):
+        """GET /stats/departments、/stats/semesters"""
+        if parts[1] == 'departments':
+            return self.db.get_department_statistics()
+        if parts[1] == 'semesters':
+            return self.db.get_semester_statistics()
+        raise HttpError(404, "接口不存在")
+
+    # ========== 请求处理 ==========
+    def call_handler(self, handler, parts, params):
+        """在线程池中执行：数据库错误以异常抛出"""
+        raising_errors = getattr(self.db, 'raising_errors', None)
+        with raising_errors() if raising_errors else nullcontext():
+            return handler(parts, params)
+
+    def route(self, path):
+        parts = [unquote(p) for p in path.strip('/').split('/') if p]
+        handler = self.routes.get((len(parts), parts[0])) if parts else None
+        if handler is None:
+            raise HttpError(404, "接口不存在")
+        return handler, parts
+
+    async def respond(self, method, target):
+        """返回 (状态码, 响应体, ETag)"""
+        if method != 'GET':
+            raise HttpError(405, "只支持 GET")
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        handler, parts = self.route(url.path)
+        key = (url.path, tuple(sorted(params.items())))
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        # 共用的查询在独立的任务中执行，每个请求（包括第一个）只等待它的 shield：
+        # 任何一个客户端断开只取消自己的等待，不会取消其他请求正在等待的查询
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.fetch(key, handler, parts, params))
+            task.add_done_callback(partial(self.fetch_done, key))
+            self.inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def fetch(self, key, handler, parts, params):
+        """执行一次查询并缓存响应"""
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self.executor, self.call_handler, handler, parts, params)
+        body = encode_json(data)
+        response = (200, body, '"' + hashlib.sha1(body).hexdigest() + '"')
+        self.cache.put(key, response)
+        return response
+
+    def fetch_done(self, key, task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        # 等待的客户端都已断开时由这里取走异常，避免 asyncio 报告未取回的异常
+        if not task.cancelled():
+            task.exception()
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的请求（支持 keep-alive）"""
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                self.requests += 1
+                try:
+                    status, body, etag = await self.respond(method, target)
+                except HttpError as e:
+                    status, body, etag = e.status, encode_json({'error': str(e)}), None
+                except Exception as e:
+                    print(f"查询服务处理 {target} 出错: {e}")
+                    status, body, etag = 500, encode_json({'error': "服务器内部错误"}), None
+                if etag and headers.get('if-none-match') == etag:
+                    status, body = 304, b''
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and (version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'))
+                self.write_response(writer, status, body, etag, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        except HttpError as e:
+            self.write_response(writer, e.status, encode_json({'error': str(e)}), None, False)
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_line(self, reader, timeout, status):
+        """读取一行；超过 MAX_LINE_BYTES（或流的缓冲上限）时以 status 拒绝请求"""
+        message = "请求行过长" if status == 414 else "请求头过长"
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+        except (asyncio.LimitOverrunError, ValueError):
+            # 超过 StreamReader 缓冲上限时 readline 抛出 ValueError
+            raise HttpError(status, message)
+        if len(line) > MAX_LINE_BYTES:
+            raise HttpError(status, message)
+        return line
+
+    async def read_request(self, reader, timeout=30):
+        """读取请求行和请求头，连接关闭时返回 None；请求体（GET 不应有）被跳过"""
+        line = await self.read_line(reader, timeout, 414)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(400, "请求行格式错误")
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await self.read_line(reader, timeout, 431)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(431, "请求头过多")
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HttpError(400, "Content-Length 格式错误")
+        if length:
+            await reader.readexactly(length)
+        return method, target, version, headers
+
+    def write_response(self, writer, status, body, etag, keep_alive):
+        lines = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if etag:
+            lines.append(f"ETag: {etag}")
+            lines.append(f"Cache-Control: max-age={int(self.cache.ttl)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"查询服务已启动: http://{host}:{port}/")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+def main(argv=None):
+    """命令行入口"""
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="只读 HTTP/JSON 查询服务")
+    parser.add_argument('--host', default='localhost', help="数据库主机")
+    parser.add_argument('--port', type=int, default=3306, help="数据库端口")
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default=os.environ.get('AWS_DB_PASSWORD', ''))
+    parser.add_argument('--database', default='AcademicWarningSystem')
+    parser.add_argument('--bind', default='127.0.0.1', help="服务监听地址")
+    parser.add_argument('--listen-port', type=int, default=8080, help="服务监听端口")
+    parser.add_argument('--pool-size', type=int, default=8, help="数据库连接池大小（同时执行的查询数）")
+    parser.add_argument('--cache-ttl', type=float, default=2.0, help="响应缓存有效期（秒），0 表示不缓存")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(pool_size=args.pool_size)
+    db.set_config(args.host, args.port, args.user, args.password, args.database)
+    if not db.connect():
+        print("数据库连接失败")
+        return 2
+
+    service = QueryService(db, workers=args.pool_size, cache_ttl=args.cache_ttl)
+    try:
+        asyncio.run(service.serve(args.bind, args.listen_port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        db.disconnect()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SQL脚本语句分割器测试（不需要数据库）
+
+运行：python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.sql_splitter import SQLSplitter, iter_statements, split_sql
+
+class SplitSQLTest(unittest.TestCase):
+
+    def test_simple_statements(self):
+        self.assertEqual(split_sql("SELECT 1;\nSELECT 2;\nSELECT 3"),
+                         ["SELECT 1", "SELECT 2", "SELECT 3"])
+
+    def test_delimiter(self):
+        script = (
+            "DELIMITER $$\n"
+            "CREATE PROCEDURE p()\n"
+            "BEGIN\n"
+            "    SELECT 1;\n"
+            "    SELECT 2;\n"
+            "END$$\n"
+            "DELIMITER ;\n"
+            "SELECT 3;\n"
+        )
+        self.assertEqual(split_sql(script), [
+            "CREATE PROCEDURE p()\nBEGIN\n    SELECT 1;\n    SELECT 2;\nEND",
+            "SELECT 3",
+        ])
+
+    def test_delimiter_followed_by_tab(self):
+        script = "delimiter\t//\nSELECT 1; SELECT 2//\nDELIMITER\t;\nSELECT 3;"
+        self.assertEqual(split_sql(script), ["SELECT 1; SELECT 2", "SELECT 3"])
+
+    def test_delimiter_keyword_prefix_is_not_a_command(self):
+        self.assertEqual(split_sql("DELIMITERS;\nSELECT 1;"), ["DELIMITERS", "SELECT 1"])
+
+    def test_doubled_quote_escape(self):
+        self.assertEqual(split_sql("INSERT INTO t VALUES ('it''s; fine');SELECT 1;"),
+                         ["INSERT INTO t VALUES ('it''s; fine')", "SELECT 1"])
+
+    def test_backslash_escape(self):
+        self.assertEqual(split_sql("SELECT 'a\\'; b';SELECT \"c\\\"; d\";"),
+                         ["SELECT 'a\\'; b'", "SELECT \"c\\\"; d\""])
+
+    def test_quote_spanning_lines(self):
+        self.assertEqual(split_sql("SELECT 'a;\nb';\nSELECT 1;"), ["SELECT 'a;\nb'", "SELECT 1"])
+
+    def test_double_dash_comment_needs_whitespace(self):
+        self.assertEqual(split_sql("SELECT 1 -- comment; not a statement\n;"), ["SELECT 1"])
+        # 后面没有空白时是两个减号
+        self.assertEqual(split_sql("SELECT 5--1;"), ["SELECT 5--1"])
+        self.assertEqual(split_sql("SELECT 1 --\n;"), ["SELECT 1"])
+
+    def test_hash_comment(self):
+        self.assertEqual(split_sql("# header; comment\nSELECT 1; # trailing; comment\nSELECT 2;"),
+                         ["SELECT 1", "SELECT 2"])
+
+    def test_comment_markers_inside_quotes(self):
+        self.assertEqual(split_sql("SELECT '-- x', '# y', '/* z */';"),
+                         ["SELECT '-- x', '# y', '/* z */'"])
+
+    def test_block_comment_is_kept(self):
+        self.assertEqual(split_sql("/* a; b */ SELECT 1;\n/*!40101 SET NAMES utf8 */;"),
+                         ["/* a; b */ SELECT 1", "/*!40101 SET NAMES utf8 */"])
+
+    def test_block_comment_spanning_lines(self):
+        self.assertEqual(split_sql("SELECT /* one;\ntwo; */ 1;"), ["SELECT /* one;\ntwo; */ 1"])
+
+class StatementTest(unittest.TestCase):
+
+    def test_keyword_line_and_index(self):
+        statements = list(iter_statements("\n-- comment\n/* c */ INSERT INTO t VALUES (1);\n\nselect 2;\n".splitlines(True)))
+        self.assertEqual([(s.index, s.line, s.keyword) for s in statements],
+                         [(0, 3, 'INSERT'), (1, 5, 'SELECT')])
+        self.assertTrue(statements[0].is_dml)
+        self.assertFalse(statements[1].is_dml)
+
+    def test_feed_returns_statements_ending_on_line(self):
+        splitter = SQLSplitter()
+        self.assertEqual([s.sql for s in splitter.feed("SELECT 1; SELECT\n")], ["SELECT 1"])
+        self.assertEqual([s.sql for s in splitter.feed("2;\n")], ["SELECT\n2"])
+        self.assertEqual(splitter.finish(), [])
+
+if __name__ == "__main__":
+    unittest.main()